@@ -1,11 +1,15 @@
 """AWS Cognito JWT verification utilities."""
 
+import threading
 import time
-from typing import Optional
-from urllib.request import urlopen
+from functools import lru_cache
+from typing import Dict, Optional
 import json
 
-from jose import jwt, JWTError
+import httpx
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+from jose.utils import base64url_decode
 from cachetools import TTLCache
 
 from config import COGNITO_USER_POOL_ID, COGNITO_REGION, COGNITO_CLIENT_ID, COGNITO_ENABLED
@@ -16,6 +20,10 @@ logger = get_logger(__name__)
 # Cache JWKS keys for 1 hour
 _jwks_cache: TTLCache = TTLCache(maxsize=1, ttl=3600)
 _JWKS_CACHE_KEY = "jwks"
+# Only one thread refetches an expired JWKS; the rest wait and read its result
+_jwks_lock = threading.Lock()
+# Reused across fetches so a refresh can ride an existing keep-alive connection
+_jwks_client = httpx.Client(timeout=10)
 
 
 def _get_jwks_url() -> str:
@@ -28,40 +36,62 @@ def _get_issuer() -> str:
     return f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{COGNITO_USER_POOL_ID}"
 
 
-def _fetch_jwks() -> dict:
-    """Fetch JWKS from Cognito, with caching."""
-    if _JWKS_CACHE_KEY in _jwks_cache:
-        return _jwks_cache[_JWKS_CACHE_KEY]
+def _fetch_jwks() -> Dict[str, Key]:
+    """Fetch JWKS from Cognito and return prepared RS256 keys by kid, with caching.
+
+    Keys are parsed once per fetch, not on every token verification.
+    """
+    keys = _jwks_cache.get(_JWKS_CACHE_KEY)
+    if keys is not None:
+        return keys
+
+    with _jwks_lock:
+        # Another thread may have refreshed the cache while we waited
+        keys = _jwks_cache.get(_JWKS_CACHE_KEY)
+        if keys is not None:
+            return keys
+        try:
+            jwks_url = _get_jwks_url()
+            logger.debug(f"Fetching JWKS from {jwks_url}")
+            response = _jwks_client.get(jwks_url)
+            response.raise_for_status()
+            jwks = response.json()
+            keys = {
+                key["kid"]: jwk.construct(key, algorithm="RS256")
+                for key in jwks.get("keys", [])
+                if "kid" in key
+            }
+            _jwks_cache[_JWKS_CACHE_KEY] = keys
+            logger.debug(f"Cached {len(keys)} JWKS keys")
+            return keys
+        except Exception as e:
+            logger.error(f"Failed to fetch JWKS: {e}")
+            raise
 
-    try:
-        jwks_url = _get_jwks_url()
-        logger.debug(f"Fetching JWKS from {jwks_url}")
-        with urlopen(jwks_url, timeout=10) as response:
-            jwks = json.loads(response.read().decode("utf-8"))
-            _jwks_cache[_JWKS_CACHE_KEY] = jwks
-            logger.debug(f"Cached {len(jwks.get('keys', []))} JWKS keys")
-            return jwks
-    except Exception as e:
-        logger.error(f"Failed to fetch JWKS: {e}")
-        raise
 
+@lru_cache(maxsize=32)
+def _kid_from_header(header_segment: str) -> Optional[str]:
+    """Return the kid of an encoded JWT header.
 
-def _get_signing_key(token: str) -> Optional[dict]:
-    """Get the signing key for the token from JWKS."""
+    Tokens signed with the same key share the same header segment, so repeat
+    lookups skip the base64 and JSON decoding.
+    """
+    headers = json.loads(base64url_decode(header_segment.encode("ascii")))
+    return headers.get("kid")
+
+
+def _get_signing_key(token: str) -> Optional[Key]:
+    """Get the prepared signing key for the token from JWKS."""
     try:
-        headers = jwt.get_unverified_headers(token)
-        kid = headers.get("kid")
+        kid = _kid_from_header(token.split(".", 1)[0])
         if not kid:
             logger.warning("Token missing 'kid' header")
             return None
 
-        jwks = _fetch_jwks()
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                return key
-
-        logger.warning(f"No matching key found for kid: {kid}")
-        return None
+        key = _fetch_jwks().get(kid)
+        if key is None:
+            logger.warning(f"No matching key found for kid: {kid}")
+        return key
     except Exception as e:
         logger.error(f"Error getting signing key: {e}")
         return None
@@ -1,11 +1,20 @@
 """Corpus permission checking and authorization utilities."""
 
-import sqlite3
 from typing import Optional
 
 from fastapi import HTTPException, status
 
-from api.corpus_db import _get_conn
+from api.corpus_db import _get_pool
+
+# Corpus metadata and the user's explicit permission in one round trip. Both
+# permission helpers share this text, so each pooled connection prepares it once
+# and serves every later check from its statement cache.
+_PERMISSION_SQL = """
+    SELECT c.owner_id, c.is_public, c.is_approved, p.permission_type
+    FROM corpuses c
+    LEFT JOIN corpus_permissions p ON p.corpus_id = c.id AND p.user_id = ?
+    WHERE c.id = ?
+"""
 
 
 def check_corpus_permission(
@@ -29,32 +38,24 @@ def check_corpus_permission(
         HTTPException: 404 if corpus not found
         HTTPException: 403 if permission denied
     """
-    conn = _get_conn()
-
-    # Check if corpus exists and get its metadata
-    cur = conn.execute(
-        "SELECT owner_id, is_public, is_approved FROM corpuses WHERE id = ?",
-        (corpus_id,)
-    )
-    row = cur.fetchone()
+    with _get_pool().reader() as conn:
+        cur = conn.execute(_PERMISSION_SQL, (user_id, corpus_id))
+        row = cur.fetchone()
 
     if not row:
-        conn.close()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Corpus {corpus_id} not found"
         )
 
-    owner_id, is_public, is_approved = row
+    owner_id, is_public, is_approved, user_perm = row
 
     # Owner has all permissions
     if owner_id == user_id:
-        conn.close()
         return True
 
     # Check if corpus requires approval
     if not is_approved and required_permission != "owner":
-        conn.close()
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Corpus not yet approved by admin"
@@ -62,28 +63,15 @@ def check_corpus_permission(
 
     # Public approved corpuses allow read access to all
     if is_public and is_approved and required_permission == "read":
-        conn.close()
         return True
 
-    # Check explicit permissions in corpus_permissions table
-    cur = conn.execute(
-        """
-        SELECT permission_type FROM corpus_permissions
-        WHERE corpus_id = ? AND user_id = ?
-        """,
-        (corpus_id, user_id)
-    )
-    perm_row = cur.fetchone()
-    conn.close()
-
-    if not perm_row:
+    # Check explicit permissions from corpus_permissions
+    if not user_perm:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail=f"No access to corpus {corpus_id}"
         )
 
-    user_perm = perm_row[0]
-
     # Permission hierarchy check
     hierarchy = {"read": 1, "write": 2, "admin": 3, "owner": 4}
     user_level = hierarchy.get(user_perm, 0)
@@ -109,28 +97,20 @@ def get_user_corpus_permission(corpus_id: int, user_id: int) -> Optional[str]:
     Returns:
         str: Permission level ("owner", "admin", "write", "read") or None if no access
     """
-    conn = _get_conn()
+    with _get_pool().reader() as conn:
+        cur = conn.execute(_PERMISSION_SQL, (user_id, corpus_id))
+        row = cur.fetchone()
 
-    # Check if user is owner
-    cur = conn.execute(
-        "SELECT owner_id FROM corpuses WHERE id = ?",
-        (corpus_id,)
-    )
-    row = cur.fetchone()
+    if not row:
+        return None
 
-    if row and row[0] == user_id:
-        conn.close()
-        return "owner"
+    owner_id, _, _, user_perm = row
 
-    # Check explicit permission
-    cur = conn.execute(
-        "SELECT permission_type FROM corpus_permissions WHERE corpus_id = ? AND user_id = ?",
-        (corpus_id, user_id)
-    )
-    perm_row = cur.fetchone()
-    conn.close()
+    # Owner outranks any explicit permission
+    if owner_id == user_id:
+        return "owner"
 
-    return perm_row[0] if perm_row else None
+    return user_perm
 
 
 def check_user_owns_corpus(corpus_id: int, user_id: int) -> bool:
@@ -147,14 +127,12 @@ def check_user_owns_corpus(corpus_id: int, user_id: int) -> bool:
         HTTPException: 404 if corpus not found
         HTTPException: 403 if user is not owner
     """
-    conn = _get_conn()
-
-    cur = conn.execute(
-        "SELECT owner_id FROM corpuses WHERE id = ?",
-        (corpus_id,)
-    )
-    row = cur.fetchone()
-    conn.close()
+    with _get_pool().reader() as conn:
+        cur = conn.execute(
+            "SELECT owner_id FROM corpuses WHERE id = ?",
+            (corpus_id,)
+        )
+        row = cur.fetchone()
 
     if not row:
         raise HTTPException(
@@ -1,147 +1,315 @@
 """Corpus database management and operations."""
 
+import atexit
+import queue
 import sqlite3
-from datetime import datetime, timezone
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Iterator, Optional
 
-from config import USER_DB_PATH
+from config import SQLITE_READERS, USER_DB_PATH
 
 # Share database with users
 DB_PATH = USER_DB_PATH
 
+# Bump whenever SCHEMA_SQL changes so existing databases pick the change up
+SCHEMA_VERSION = 3
 
-def _get_conn():
-    """Get database connection."""
-    return sqlite3.connect(DB_PATH)
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS corpuses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT UNIQUE NOT NULL,
+    display_name TEXT NOT NULL,
+    description TEXT,
+    category TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
+    is_public BOOLEAN NOT NULL DEFAULT 0,
+    is_approved BOOLEAN NOT NULL DEFAULT 0,
+    owner_id INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL,
+    FOREIGN KEY(owner_id) REFERENCES users(id)
+);
 
+CREATE TABLE IF NOT EXISTS corpus_permissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    corpus_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    permission_type TEXT NOT NULL,
+    granted_by INTEGER NOT NULL,
+    granted_at INTEGER NOT NULL,
+    FOREIGN KEY(corpus_id) REFERENCES corpuses(id) ON DELETE CASCADE,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY(granted_by) REFERENCES users(id),
+    UNIQUE(corpus_id, user_id)
+);
 
-def _current_timestamp() -> int:
-    """Get current UTC timestamp."""
-    return int(datetime.now(timezone.utc).timestamp())
+CREATE TABLE IF NOT EXISTS subscriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    corpus_id INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'active',
+    tier TEXT,
+    started_at INTEGER NOT NULL,
+    expires_at INTEGER,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY(corpus_id) REFERENCES corpuses(id) ON DELETE CASCADE,
+    UNIQUE(user_id, corpus_id)
+);
 
+CREATE TABLE IF NOT EXISTS usage_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    corpus_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    query_count INTEGER DEFAULT 0,
+    timestamp INTEGER NOT NULL,
+    metadata TEXT,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY(corpus_id) REFERENCES corpuses(id) ON DELETE CASCADE
+);
 
-def init_corpus_tables():
-    """Create corpus-related tables if they don't exist."""
-    # Ensure the database directory exists
-    db_dir = Path(DB_PATH).parent
-    db_dir.mkdir(parents=True, exist_ok=True)
+CREATE TABLE IF NOT EXISTS corpus_versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    corpus_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    description TEXT,
+    created_by INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,
+    chunk_count INTEGER DEFAULT 0,
+    file_count INTEGER DEFAULT 0,
+    FOREIGN KEY(corpus_id) REFERENCES corpuses(id) ON DELETE CASCADE,
+    FOREIGN KEY(created_by) REFERENCES users(id),
+    UNIQUE(corpus_id, version)
+);
 
-    conn = _get_conn()
-    cur = conn.cursor()
+-- Lookups by corpus_id (alone or with user_id) use the UNIQUE(corpus_id, user_id)
+-- index; a separate corpus_id index would only add write cost
+DROP INDEX IF EXISTS idx_corpus_permissions_corpus_id;
 
-    # Create corpuses table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS corpuses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT UNIQUE NOT NULL,
-            display_name TEXT NOT NULL,
-            description TEXT,
-            category TEXT,
-            version INTEGER NOT NULL DEFAULT 1,
-            is_public BOOLEAN NOT NULL DEFAULT 0,
-            is_approved BOOLEAN NOT NULL DEFAULT 0,
-            owner_id INTEGER NOT NULL,
-            created_at INTEGER NOT NULL,
-            updated_at INTEGER NOT NULL,
-            FOREIGN KEY(owner_id) REFERENCES users(id)
-        )
-        """
-    )
+-- Superseded by the covering idx_usage_logs_corpus_ts and idx_usage_logs_user_ts below
+DROP INDEX IF EXISTS idx_usage_logs_corpus_id;
+DROP INDEX IF EXISTS idx_usage_logs_user_id;
+"""
 
-    # Create corpus_permissions table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS corpus_permissions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            corpus_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            permission_type TEXT NOT NULL,
-            granted_by INTEGER NOT NULL,
-            granted_at INTEGER NOT NULL,
-            FOREIGN KEY(corpus_id) REFERENCES corpuses(id) ON DELETE CASCADE,
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
-            FOREIGN KEY(granted_by) REFERENCES users(id),
-            UNIQUE(corpus_id, user_id)
-        )
-        """
-    )
+# Secondary indexes by table. Bulk loads into a large table are much faster
+# without them: drop_indexes, insert, then create_indexes and ANALYZE once.
+_INDEX_DDL: Dict[str, Dict[str, str]] = {
+    "corpuses": {
+        "idx_corpuses_owner_id": "CREATE INDEX IF NOT EXISTS idx_corpuses_owner_id ON corpuses(owner_id)",
+        "idx_corpuses_category": "CREATE INDEX IF NOT EXISTS idx_corpuses_category ON corpuses(category)",
+        "idx_corpuses_is_approved": "CREATE INDEX IF NOT EXISTS idx_corpuses_is_approved ON corpuses(is_approved)",
+    },
+    "corpus_permissions": {
+        "idx_corpus_permissions_user_id": (
+            "CREATE INDEX IF NOT EXISTS idx_corpus_permissions_user_id ON corpus_permissions(user_id)"
+        ),
+    },
+    "subscriptions": {
+        "idx_subscriptions_user_id": "CREATE INDEX IF NOT EXISTS idx_subscriptions_user_id ON subscriptions(user_id)",
+        "idx_subscriptions_corpus_id": (
+            "CREATE INDEX IF NOT EXISTS idx_subscriptions_corpus_id ON subscriptions(corpus_id)"
+        ),
+        "idx_subscriptions_status": "CREATE INDEX IF NOT EXISTS idx_subscriptions_status ON subscriptions(status)",
+    },
+    "usage_logs": {
+        # Recent logs for a user, newest first
+        "idx_usage_logs_user_ts": (
+            "CREATE INDEX IF NOT EXISTS idx_usage_logs_user_ts ON usage_logs(user_id, timestamp)"
+        ),
+        # Covers the per-user usage aggregates, with or without a corpus filter
+        "idx_usage_logs_user_corpus": (
+            "CREATE INDEX IF NOT EXISTS idx_usage_logs_user_corpus "
+            "ON usage_logs(user_id, corpus_id, query_count, timestamp)"
+        ),
+        # Covers the per-corpus usage aggregates (counts, SUM(query_count), MAX(timestamp),
+        # distinct users) so they never touch the table
+        "idx_usage_logs_corpus_ts": (
+            "CREATE INDEX IF NOT EXISTS idx_usage_logs_corpus_ts "
+            "ON usage_logs(corpus_id, timestamp, user_id, query_count)"
+        ),
+        "idx_usage_logs_timestamp": "CREATE INDEX IF NOT EXISTS idx_usage_logs_timestamp ON usage_logs(timestamp)",
+    },
+    "corpus_versions": {
+        "idx_corpus_versions_corpus_id": (
+            "CREATE INDEX IF NOT EXISTS idx_corpus_versions_corpus_id ON corpus_versions(corpus_id)"
+        ),
+    },
+}
 
-    # Create subscriptions table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS subscriptions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            corpus_id INTEGER NOT NULL,
-            status TEXT NOT NULL DEFAULT 'active',
-            tier TEXT,
-            started_at INTEGER NOT NULL,
-            expires_at INTEGER,
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
-            FOREIGN KEY(corpus_id) REFERENCES corpuses(id) ON DELETE CASCADE,
-            UNIQUE(user_id, corpus_id)
-        )
-        """
-    )
+SCHEMA_SQL += "".join(
+    f"{ddl};\n" for indexes in _INDEX_DDL.values() for ddl in indexes.values()
+)
 
-    # Create usage_logs table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS usage_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            corpus_id INTEGER NOT NULL,
-            action TEXT NOT NULL,
-            query_count INTEGER DEFAULT 0,
-            timestamp INTEGER NOT NULL,
-            metadata TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE,
-            FOREIGN KEY(corpus_id) REFERENCES corpuses(id) ON DELETE CASCADE
-        )
-        """
-    )
 
-    # Create corpus_versions table
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS corpus_versions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            corpus_id INTEGER NOT NULL,
-            version INTEGER NOT NULL,
-            description TEXT,
-            created_by INTEGER NOT NULL,
-            created_at INTEGER NOT NULL,
-            chunk_count INTEGER DEFAULT 0,
-            file_count INTEGER DEFAULT 0,
-            FOREIGN KEY(corpus_id) REFERENCES corpuses(id) ON DELETE CASCADE,
-            FOREIGN KEY(created_by) REFERENCES users(id),
-            UNIQUE(corpus_id, version)
+class _ConnPool:
+    """One writer connection and up to ``readers`` read-only connections to a database.
+
+    Opening a connection per request costs an open of the database, its WAL and
+    shared-memory files plus a fresh schema parse. The pool keeps connections open
+    instead: readers come from a bounded queue and, under WAL, never block behind
+    the writer, while writes are serialized on the single writer connection.
+    Idle readers are reused most-recently-returned first, so the busiest few
+    keep warm page caches while the rest stay unopened.
+    """
+
+    def __init__(self, path: str, readers: int):
+        self.path = path
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=readers)
+        self._readers_left = readers
+        self._open_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # Opened first so the file exists and is in WAL mode before any reader
+        self._writer = self._connect(path, isolation_level=None)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+
+    @staticmethod
+    def _connect(database: str, **kwargs) -> sqlite3.Connection:
+        # Connections move between threads but are only ever used by one at a time
+        # Timestamps are stored and returned as integer epochs; detect_types stays
+        # off so rows are never run through column type converters
+        conn = sqlite3.connect(
+            database, timeout=5.0, detect_types=0, check_same_thread=False, **kwargs
         )
+        # synchronous=NORMAL is durable under WAL and skips the per-commit fsync
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        # Serve reads straight from a 256MB memory map instead of copying pages
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a read-only connection, waiting if all of them are in use."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._open_lock:
+                if self._readers_left > 0:
+                    self._readers_left -= 1
+                    conn = self._connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True)
+            if conn is None:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Run the block as one write transaction, committed on success.
+
+        ``BEGIN IMMEDIATE`` takes the write lock up front, so a transaction that
+        reads before it writes cannot fail midway upgrading its lock.
         """
-    )
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                # SQLite may already have rolled back (I/O error, interrupt); a
+                # failed COMMIT must not leave the shared writer mid-transaction
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        """Close the writer and every idle reader."""
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def executescript(self, sql: str) -> None:
+        """Run a multi-statement script on the writer connection as one transaction."""
+        with self._write_lock:
+            try:
+                self._writer.executescript(f"BEGIN IMMEDIATE;\n{sql}\nCOMMIT;")
+            except BaseException:
+                if self._writer.in_transaction:
+                    self._writer.execute("ROLLBACK")
+                raise
+
+
+_pools: Dict[str, _ConnPool] = {}
+_pools_lock = threading.Lock()
+
+
+@atexit.register
+def _close_all() -> None:
+    """Close every pool's connections (also run at interpreter exit)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _get_pool(path: Optional[str] = None) -> _ConnPool:
+    """Return the connection pool for ``path``, by default the current ``DB_PATH``."""
+    path = str(DB_PATH if path is None else path)
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = _pools[path] = _ConnPool(path, SQLITE_READERS)
+    return pool
+
 
-    # Create indexes for better query performance
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_corpuses_owner_id ON corpuses(owner_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_corpuses_category ON corpuses(category)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_corpuses_is_approved ON corpuses(is_approved)")
+def drop_indexes(conn: sqlite3.Connection, table: str) -> None:
+    """Drop ``table``'s secondary indexes ahead of a bulk load.
 
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_corpus_permissions_corpus_id ON corpus_permissions(corpus_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_corpus_permissions_user_id ON corpus_permissions(user_id)")
+    Backfills should run inside one write transaction::
 
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_user_id ON subscriptions(user_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_corpus_id ON subscriptions(corpus_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_status ON subscriptions(status)")
+        with _get_pool().writer() as conn:
+            drop_indexes(conn, "usage_logs")
+            conn.executemany("INSERT INTO usage_logs ...", rows)
+            create_indexes(conn, "usage_logs")
+            conn.execute("ANALYZE usage_logs")
+    """
+    for name in _INDEX_DDL[table]:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
 
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_user_id ON usage_logs(user_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_corpus_id ON usage_logs(corpus_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_usage_logs_timestamp ON usage_logs(timestamp)")
 
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_corpus_versions_corpus_id ON corpus_versions(corpus_id)")
+def create_indexes(conn: sqlite3.Connection, table: str) -> None:
+    """(Re)create ``table``'s secondary indexes, e.g. after a bulk load."""
+    for ddl in _INDEX_DDL[table].values():
+        conn.execute(ddl)
+
+
+def _current_timestamp() -> int:
+    """Get current UTC timestamp."""
+    return int(time.time())
+
+
+def init_corpus_tables():
+    """Create corpus-related tables if they don't exist.
+
+    The whole schema runs as one script in one transaction, followed by ANALYZE
+    so the planner has statistics for the indexes. Databases that are already
+    at ``SCHEMA_VERSION`` skip it entirely.
+    """
+    # Ensure the database directory exists
+    db_dir = Path(DB_PATH).parent
+    db_dir.mkdir(parents=True, exist_ok=True)
 
-    conn.commit()
-    conn.close()
+    pool = _get_pool()
+    with pool.reader() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+    pool.executescript(f"{SCHEMA_SQL}\nANALYZE;\nPRAGMA user_version = {SCHEMA_VERSION};")
 
 
-# Initialize tables on import
-init_corpus_tables()
+# Called from the API's startup hook rather than at import, so importing this
+# module has no side effects and tests can point DB_PATH elsewhere first
+ensure_schema = init_corpus_tables
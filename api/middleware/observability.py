@@ -0,0 +1,160 @@
+"""Request logging and MCP error code middleware."""
+
+import logging
+import time
+
+from fastapi import status
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.models.mcp_errors import to_mcp_error_code
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# The fallback 500 never varies, so its code and body are rendered once
+_INTERNAL_ERROR_CODE = to_mcp_error_code(500, "Internal server error")
+_INTERNAL_ERROR_BODY = JSONResponse(
+    {"detail": "Internal server error", "error_code": _INTERNAL_ERROR_CODE.value}
+).body
+
+
+class ObservabilityMiddleware:
+    """Middleware that logs every HTTP request and tags error responses.
+
+    Requests and responses are logged for security auditing and debugging,
+    and 4xx/5xx responses get an X-MCP-Error-Code header so AI agents can
+    make intelligent retry decisions.
+
+    It is a plain ASGI middleware: details come straight from the scope, and
+    the status and header are handled on the ``http.response.start`` message
+    as it passes through, so responses are never buffered or re-wrapped. The
+    error detail used to pick a specific code is left in the request state by
+    the exception handlers in ``api.middleware.mcp_error_handler`` rather than
+    parsed back out of the response body.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Log request/response details and add MCP error codes to error responses."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+
+        # Extract request details
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+
+        # Nothing would be written, not even the server error line: skip the
+        # logging bookkeeping
+        log_enabled = logger.isEnabledFor(logging.ERROR)
+        masked_key = "none"
+        if log_enabled:
+            headers = Headers(scope=scope)
+            api_key = headers.get("X-API-Key")
+            if api_key and len(api_key) > 4:
+                masked_key = api_key[-4:].rjust(7, "*")
+
+            # Log incoming request (arguments are only formatted if INFO is enabled)
+            logger.info(
+                "→ %s %s | IP: %s | API Key: %s | Content-Type: %s",
+                method, path, client_ip, masked_key, headers.get("Content-Type", "none"),
+            )
+
+        status_code = 500
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+
+                # If response is an error (4xx or 5xx), add MCP error code header
+                if status_code >= 400:
+                    # Rate limits, bare 401s and the like have no recorded detail
+                    detail = scope.get("state", {}).get("mcp_detail", "")
+                    error_code = to_mcp_error_code(status_code, detail)
+                    MutableHeaders(scope=message).append("X-MCP-Error-Code", error_code.value)
+
+                    logger.debug(
+                        "Added MCP error code %s to %s response", error_code.value, status_code
+                    )
+            await send(message)
+            if (
+                log_enabled
+                and message["type"] == "http.response.body"
+                and not message.get("more_body", False)
+            ):
+                self._log_response(method, path, status_code, start_time, client_ip, masked_key)
+
+        # Process request
+        try:
+            await self.app(scope, receive, send_wrapper)
+
+        except Exception as e:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            logger.error(
+                "Request failed: %s %s | Error: %s | Duration: %.2fms | IP: %s",
+                method, path, e, duration_ms, client_ip,
+                exc_info=True
+            )
+
+            # Too late to replace a response that is already on the wire
+            if response_started:
+                raise
+
+            # Otherwise return 500 with MCP error code
+            response = Response(
+                content=_INTERNAL_ERROR_BODY,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                media_type="application/json",
+                headers={"X-MCP-Error-Code": _INTERNAL_ERROR_CODE.value},
+            )
+            await response(scope, receive, send)
+
+    @staticmethod
+    def _log_response(
+        method: str,
+        path: str,
+        status_code: int,
+        start_time: float,
+        client_ip: str,
+        masked_key: str,
+    ) -> None:
+        """Log the completed response once its last body chunk has been sent."""
+        duration_ms = (time.perf_counter() - start_time) * 1000
+
+        # Log response
+        logger.info(
+            "← %s %s | Status: %s | Duration: %.2fms | IP: %s",
+            method, path, status_code, duration_ms, client_ip,
+        )
+
+        # Log authentication failures
+        if status_code == 401:
+            logger.warning(
+                "Authentication failed: %s %s | IP: %s | API Key: %s",
+                method, path, client_ip, masked_key,
+            )
+
+        # Log rate limiting
+        elif status_code == 429:
+            logger.warning(
+                "Rate limit exceeded: %s %s | IP: %s | API Key: %s",
+                method, path, client_ip, masked_key,
+            )
+
+        # Log server errors
+        elif status_code >= 500:
+            logger.error(
+                "Server error: %s %s | Status: %s | IP: %s",
+                method, path, status_code, client_ip,
+            )
@@ -1,8 +1,57 @@
 """Pydantic request models for corpus management."""
 
-from typing import Optional
-
-from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+# OpenAPI examples, built once at import and shared by the schema generator
+_CREATE_CORPUS_EXAMPLES = [
+    {
+        "name": "legal_corpus_2024",
+        "display_name": "Legal Documents 2024",
+        "description": "Collection of legal documents and case law from 2024",
+        "category": "legal",
+        "is_public": True,
+    },
+]
+
+_UPDATE_CORPUS_EXAMPLES = [
+    {
+        "display_name": "Legal Documents 2024 - Updated",
+        "description": "Updated collection with Q1 2024 additions",
+        "category": "legal",
+    },
+]
+
+_GRANT_PERMISSION_EXAMPLES = [
+    {
+        "username": "alice",
+        "permission_type": "read",
+    },
+]
+
+_CREATE_SUBSCRIPTION_EXAMPLES = [
+    {
+        "tier": "free",
+    },
+    {
+        "tier": "premium",
+        "duration_days": 365,
+    },
+]
+
+_CORPUS_QUERY_EXAMPLES = [
+    {
+        "query": "What are the key legal precedents?",
+        "n_results": 5,
+    },
+]
+
+_CREATE_VERSION_EXAMPLES = [
+    {
+        "description": "Added Q1 2024 legal documents",
+    },
+]
 
 
 class CreateCorpusRequest(BaseModel):
@@ -40,18 +89,7 @@ class CreateCorpusRequest(BaseModel):
         description="Whether corpus is publicly accessible (requires admin approval)",
     )
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "name": "legal_corpus_2024",
-                    "display_name": "Legal Documents 2024",
-                    "description": "Collection of legal documents and case law from 2024",
-                    "category": "legal",
-                    "is_public": True,
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": _CREATE_CORPUS_EXAMPLES})
 
 
 class UpdateCorpusRequest(BaseModel):
@@ -78,16 +116,7 @@ class UpdateCorpusRequest(BaseModel):
         description="Updated public visibility",
     )
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "display_name": "Legal Documents 2024 - Updated",
-                    "description": "Updated collection with Q1 2024 additions",
-                    "category": "legal",
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": _UPDATE_CORPUS_EXAMPLES})
 
 
 class GrantPermissionRequest(BaseModel):
@@ -100,30 +129,20 @@ class GrantPermissionRequest(BaseModel):
         description="Username to grant access to",
         examples=["alice"],
     )
-    permission_type: str = Field(
+    permission_type: Literal["read", "write", "admin"] = Field(
         ...,
-        pattern=r"^(read|write|admin)$",
         description="Permission level: read, write, or admin",
         examples=["read"],
     )
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "username": "alice",
-                    "permission_type": "read",
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": _GRANT_PERMISSION_EXAMPLES})
 
 
 class CreateSubscriptionRequest(BaseModel):
     """Request model for subscribing to a corpus."""
 
-    tier: str = Field(
+    tier: Literal["free", "basic", "premium"] = Field(
         default="free",
-        pattern=r"^(free|basic|premium)$",
         description="Subscription tier",
         examples=["free"],
     )
@@ -135,18 +154,7 @@ class CreateSubscriptionRequest(BaseModel):
         examples=[365],
     )
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "tier": "free",
-                },
-                {
-                    "tier": "premium",
-                    "duration_days": 365,
-                },
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": _CREATE_SUBSCRIPTION_EXAMPLES})
 
 
 class CorpusQueryRequest(BaseModel):
@@ -166,15 +174,7 @@ class CorpusQueryRequest(BaseModel):
         examples=[5],
     )
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "query": "What are the key legal precedents?",
-                    "n_results": 5,
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": _CORPUS_QUERY_EXAMPLES})
 
 
 class CreateVersionRequest(BaseModel):
@@ -187,11 +187,4 @@ class CreateVersionRequest(BaseModel):
         examples=["Added Q1 2024 legal documents"],
     )
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "description": "Added Q1 2024 legal documents",
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": _CREATE_VERSION_EXAMPLES})
@@ -2,10 +2,54 @@
 
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
-
-
-class CorpusMetadata(BaseModel):
+from pydantic import ConfigDict, Field
+
+from .responses import ResponseModel
+
+# Shared OpenAPI examples; the list and detail responses embed the same records
+_CORPUS_EXAMPLE = {
+    "id": 1,
+    "name": "legal_corpus_2024",
+    "display_name": "Legal Documents 2024",
+    "description": "Collection of legal documents and case law from 2024",
+    "category": "legal",
+    "version": 2,
+    "is_public": True,
+    "is_approved": True,
+    "owner_username": "alice",
+    "owner_email": "alice@example.com",
+    "created_at": 1704067200,
+    "updated_at": 1704153600,
+    "chunk_count": 1500,
+    "file_count": 45,
+}
+
+_PERMISSION_EXAMPLE = {
+    "username": "bob",
+    "permission_type": "read",
+    "granted_at": 1704067200,
+}
+
+_VERSION_EXAMPLE = {
+    "version": 2,
+    "description": "Added Q1 2024 legal documents",
+    "created_by": "alice",
+    "created_at": 1704153600,
+    "chunk_count": 1500,
+    "file_count": 45,
+}
+
+_SUBSCRIPTION_EXAMPLE = {
+    "user_id": 2,
+    "corpus_id": 1,
+    "status": "active",
+    "tier": "premium",
+    "started_at": 1704067200,
+    "expires_at": 1735689600,
+}
+
+
+class CorpusMetadata(ResponseModel):
     """Metadata for a single corpus."""
 
     id: int = Field(..., description="Corpus ID", ge=1)
@@ -23,49 +67,20 @@ class CorpusMetadata(BaseModel):
     chunk_count: int = Field(default=0, description="Number of chunks", ge=0)
     file_count: int = Field(default=0, description="Number of files", ge=0)
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "id": 1,
-                    "name": "legal_corpus_2024",
-                    "display_name": "Legal Documents 2024",
-                    "description": "Collection of legal documents and case law from 2024",
-                    "category": "legal",
-                    "version": 2,
-                    "is_public": True,
-                    "is_approved": True,
-                    "owner_username": "alice",
-                    "owner_email": "alice@example.com",
-                    "created_at": 1704067200,
-                    "updated_at": 1704153600,
-                    "chunk_count": 1500,
-                    "file_count": 45,
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": [_CORPUS_EXAMPLE]})
 
 
-class CorpusPermission(BaseModel):
+class CorpusPermission(ResponseModel):
     """Corpus permission details."""
 
     username: str = Field(..., description="Username with permission")
     permission_type: str = Field(..., description="Permission level (owner/admin/write/read)")
     granted_at: int = Field(..., description="Permission grant timestamp (Unix epoch)")
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "username": "bob",
-                    "permission_type": "read",
-                    "granted_at": 1704067200,
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": [_PERMISSION_EXAMPLE]})
 
 
-class CorpusVersionInfo(BaseModel):
+class CorpusVersionInfo(ResponseModel):
     """Corpus version information."""
 
     version: int = Field(..., description="Version number", ge=1)
@@ -75,22 +90,10 @@ class CorpusVersionInfo(BaseModel):
     chunk_count: int = Field(default=0, description="Chunk count at version", ge=0)
     file_count: int = Field(default=0, description="File count at version", ge=0)
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "version": 2,
-                    "description": "Added Q1 2024 legal documents",
-                    "created_by": "alice",
-                    "created_at": 1704153600,
-                    "chunk_count": 1500,
-                    "file_count": 45,
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": [_VERSION_EXAMPLE]})
 
 
-class SubscriptionInfo(BaseModel):
+class SubscriptionInfo(ResponseModel):
     """Subscription details."""
 
     user_id: int = Field(..., description="User ID", ge=1)
@@ -100,53 +103,18 @@ class SubscriptionInfo(BaseModel):
     started_at: int = Field(..., description="Start timestamp (Unix epoch)")
     expires_at: Optional[int] = Field(None, description="Expiry timestamp (Unix epoch, None for lifetime)")
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "user_id": 2,
-                    "corpus_id": 1,
-                    "status": "active",
-                    "tier": "premium",
-                    "started_at": 1704067200,
-                    "expires_at": 1735689600,
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": [_SUBSCRIPTION_EXAMPLE]})
 
 
-class ListCorpusesResponse(BaseModel):
+class ListCorpusesResponse(ResponseModel):
     """Response for listing accessible corpuses."""
 
     corpuses: List[CorpusMetadata]
 
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "corpuses": [
-                        {
-                            "id": 1,
-                            "name": "legal_corpus_2024",
-                            "display_name": "Legal Documents 2024",
-                            "description": "Collection of legal documents",
-                            "category": "legal",
-                            "version": 2,
-                            "is_public": True,
-                            "is_approved": True,
-                            "owner_username": "alice",
-                            "created_at": 1704067200,
-                            "updated_at": 1704153600,
-                            "chunk_count": 1500,
-                            "file_count": 45,
-                        }
-                    ]
-                }
-            ]
-        }
+    model_config = ConfigDict(json_schema_extra={"examples": [{"corpuses": [_CORPUS_EXAMPLE]}]})
 
 
-class CorpusDetailResponse(BaseModel):
+class CorpusDetailResponse(ResponseModel):
     """Detailed corpus information including permissions and versions."""
 
     corpus: CorpusMetadata
@@ -157,57 +125,29 @@ class CorpusDetailResponse(BaseModel):
         description="Current user's permission level (owner/admin/write/read)",
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
-                    "corpus": {
-                        "id": 1,
-                        "name": "legal_corpus_2024",
-                        "display_name": "Legal Documents 2024",
-                        "description": "Collection of legal documents",
-                        "category": "legal",
-                        "version": 2,
-                        "is_public": True,
-                        "is_approved": True,
-                        "owner_username": "alice",
-                        "created_at": 1704067200,
-                        "updated_at": 1704153600,
-                        "chunk_count": 1500,
-                        "file_count": 45,
-                    },
-                    "permissions": [
-                        {
-                            "username": "bob",
-                            "permission_type": "read",
-                            "granted_at": 1704067200,
-                        }
-                    ],
-                    "versions": [
-                        {
-                            "version": 2,
-                            "description": "Added Q1 2024 documents",
-                            "created_by": "alice",
-                            "created_at": 1704153600,
-                            "chunk_count": 1500,
-                            "file_count": 45,
-                        }
-                    ],
+                    "corpus": _CORPUS_EXAMPLE,
+                    "permissions": [_PERMISSION_EXAMPLE],
+                    "versions": [_VERSION_EXAMPLE],
                     "user_permission": "owner",
                 }
             ]
         }
+    )
 
 
-class CreateCorpusResponse(BaseModel):
+class CreateCorpusResponse(ResponseModel):
     """Response after creating a corpus."""
 
     message: str = Field(..., description="Success message")
     corpus_id: int = Field(..., description="Created corpus ID", ge=1)
     corpus_name: str = Field(..., description="Created corpus name")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "message": "Corpus 'Legal Documents 2024' created successfully. Awaiting admin approval.",
@@ -216,17 +156,18 @@ class CreateCorpusResponse(BaseModel):
                 }
             ]
         }
+    )
 
 
-class PermissionGrantedResponse(BaseModel):
+class PermissionGrantedResponse(ResponseModel):
     """Response after granting permission."""
 
     message: str = Field(..., description="Success message")
     username: str = Field(..., description="Username permission was granted to")
     permission_type: str = Field(..., description="Permission level granted")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "message": "Granted read permission to bob",
@@ -235,33 +176,28 @@ class PermissionGrantedResponse(BaseModel):
                 }
             ]
         }
+    )
 
 
-class SubscriptionResponse(BaseModel):
+class SubscriptionResponse(ResponseModel):
     """Response after subscription action."""
 
     message: str = Field(..., description="Success message")
     subscription: SubscriptionInfo
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "message": "Successfully subscribed to corpus",
-                    "subscription": {
-                        "user_id": 2,
-                        "corpus_id": 1,
-                        "status": "active",
-                        "tier": "free",
-                        "started_at": 1704067200,
-                        "expires_at": None,
-                    },
+                    "subscription": _SUBSCRIPTION_EXAMPLE,
                 }
             ]
         }
+    )
 
 
-class UsageStatsResponse(BaseModel):
+class UsageStatsResponse(ResponseModel):
     """Response for usage statistics."""
 
     total_actions: int = Field(default=0, description="Total number of actions", ge=0)
@@ -269,8 +205,8 @@ class UsageStatsResponse(BaseModel):
     last_access: Optional[int] = Field(None, description="Last access timestamp (Unix epoch)")
     unique_users: Optional[int] = Field(None, description="Unique users (corpus stats only)", ge=0)
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "total_actions": 150,
@@ -280,3 +216,4 @@ class UsageStatsResponse(BaseModel):
                 }
             ]
         }
+    )
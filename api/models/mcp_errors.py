@@ -1,9 +1,13 @@
 """MCP error codes and models for deterministic error handling."""
 
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import ConfigDict
+
+from .responses import ResponseModel
 
 
 class MCPErrorCode(str, Enum):
@@ -61,17 +65,19 @@ class MCPErrorCode(str, Enum):
     UNKNOWN_ERROR = "error.unknown"
 
 
-class MCPErrorResponse(BaseModel):
+class MCPErrorResponse(ResponseModel):
     """MCP-compatible error response with retry guidance."""
 
     error_code: MCPErrorCode
     detail: str
     http_status: int
     retry_after: Optional[int] = None  # Seconds to wait before retry
-    context: Optional[dict] = None  # Additional error context
+    # Additional error context. Left as a plain dict: pydantic copies it shallowly,
+    # while a typed Dict[str, ...] would validate every key and value
+    context: Optional[dict] = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "error_code": "rate_limit.exceeded",
                 "detail": "Rate limit exceeded. Please slow down and try again.",
@@ -80,6 +86,12 @@ class MCPErrorResponse(BaseModel):
                 "context": {"limit": "30/minute", "reset_at": 1640000000},
             }
         }
+    )
+
+
+# Details longer than this are usually one-off exception text; classifying them
+# directly keeps them from evicting the short, recurring messages from the cache
+_MAX_CACHED_DETAIL_LENGTH = 256
 
 
 def to_mcp_error_code(status_code: int, detail: str) -> MCPErrorCode:
@@ -94,184 +106,233 @@ def to_mcp_error_code(status_code: int, detail: str) -> MCPErrorCode:
 
     This function uses pattern matching on the detail message to determine
     the specific error code, enabling AI agents to understand the exact
-    failure reason and respond appropriately.
+    failure reason and respond appropriately. Results for short details are
+    cached, since the same handful of messages recur on every failing request.
     """
-    detail_lower = detail.lower()
-
-    # 401 Unauthorized
-    if status_code == 401:
-        if "missing" in detail_lower and "api" in detail_lower:
-            return MCPErrorCode.MISSING_API_KEY
-        elif "expired" in detail_lower:
-            return MCPErrorCode.EXPIRED_API_KEY
-        else:
-            return MCPErrorCode.INVALID_API_KEY
-
-    # 403 Forbidden
-    elif status_code == 403:
-        if "admin" in detail_lower:
-            return MCPErrorCode.ADMIN_REQUIRED
-        elif "approved" in detail_lower:
-            return MCPErrorCode.CORPUS_NOT_APPROVED
-        else:
-            return MCPErrorCode.INSUFFICIENT_PERMISSIONS
-
-    # 404 Not Found
-    elif status_code == 404:
-        if "collection" in detail_lower:
-            return MCPErrorCode.COLLECTION_NOT_FOUND
-        elif "corpus" in detail_lower:
-            return MCPErrorCode.CORPUS_NOT_FOUND
-        elif "user" in detail_lower:
-            return MCPErrorCode.USER_NOT_FOUND
-        elif "version" in detail_lower:
-            return MCPErrorCode.VERSION_NOT_FOUND
-        else:
-            return MCPErrorCode.COLLECTION_NOT_FOUND  # Default for 404
-
-    # 413 Payload Too Large
-    elif status_code == 413:
-        return MCPErrorCode.FILE_TOO_LARGE
-
-    # 415 Unsupported Media Type
-    elif status_code == 415:
-        if "mime" in detail_lower:
-            return MCPErrorCode.INVALID_MIME_TYPE
-        else:
-            return MCPErrorCode.UNSUPPORTED_FILE_TYPE
-
-    # 422 Unprocessable Entity
-    elif status_code == 422:
-        if "collection" in detail_lower and "name" in detail_lower:
-            return MCPErrorCode.INVALID_COLLECTION_NAME
-        elif "filename" in detail_lower:
-            return MCPErrorCode.INVALID_FILENAME
-        elif "username" in detail_lower:
-            return MCPErrorCode.INVALID_USERNAME
-        elif "query" in detail_lower and ("empty" in detail_lower or "cannot be" in detail_lower):
-            return MCPErrorCode.EMPTY_QUERY
-        elif "query" in detail_lower and "length" in detail_lower:
-            return MCPErrorCode.INVALID_QUERY_LENGTH
-        elif "corpus" in detail_lower and "id" in detail_lower:
-            return MCPErrorCode.INVALID_CORPUS_ID
-        elif "n_results" in detail_lower or "results" in detail_lower:
-            return MCPErrorCode.INVALID_N_RESULTS
-        elif "no valid files" in detail_lower:
-            return MCPErrorCode.NO_VALID_FILES
-        else:
-            # Generic validation error if we can't determine specific type
-            return MCPErrorCode.INVALID_COLLECTION_NAME
-
-    # 429 Too Many Requests
-    elif status_code == 429:
-        if "embedding" in detail_lower or "openai" in detail_lower:
-            return MCPErrorCode.EMBEDDING_RATE_LIMIT
-        else:
-            return MCPErrorCode.RATE_LIMIT_EXCEEDED
-
-    # 500 Internal Server Error
-    elif status_code == 500:
-        if "database" in detail_lower or "sqlite" in detail_lower:
-            return MCPErrorCode.DATABASE_ERROR
-        elif "chroma" in detail_lower:
-            return MCPErrorCode.CHROMADB_ERROR
-        elif "openai" in detail_lower or "embedding" in detail_lower:
-            return MCPErrorCode.OPENAI_API_ERROR
-        else:
-            return MCPErrorCode.INTERNAL_ERROR
-
-    # Unknown/unhandled status code
+    if len(detail) > _MAX_CACHED_DETAIL_LENGTH:
+        return _classify_error(status_code, detail)
+    return _classify_error_cached(status_code, detail)
+
+
+def _classify_401(detail_lower: str) -> MCPErrorCode:
+    """401 Unauthorized."""
+    if "missing" in detail_lower and "api" in detail_lower:
+        return MCPErrorCode.MISSING_API_KEY
+    elif "expired" in detail_lower:
+        return MCPErrorCode.EXPIRED_API_KEY
+    else:
+        return MCPErrorCode.INVALID_API_KEY
+
+
+def _classify_403(detail_lower: str) -> MCPErrorCode:
+    """403 Forbidden."""
+    if "admin" in detail_lower:
+        return MCPErrorCode.ADMIN_REQUIRED
+    elif "approved" in detail_lower:
+        return MCPErrorCode.CORPUS_NOT_APPROVED
+    else:
+        return MCPErrorCode.INSUFFICIENT_PERMISSIONS
+
+
+def _classify_404(detail_lower: str) -> MCPErrorCode:
+    """404 Not Found."""
+    if "collection" in detail_lower:
+        return MCPErrorCode.COLLECTION_NOT_FOUND
+    elif "corpus" in detail_lower:
+        return MCPErrorCode.CORPUS_NOT_FOUND
+    elif "user" in detail_lower:
+        return MCPErrorCode.USER_NOT_FOUND
+    elif "version" in detail_lower:
+        return MCPErrorCode.VERSION_NOT_FOUND
+    else:
+        return MCPErrorCode.COLLECTION_NOT_FOUND  # Default for 404
+
+
+def _classify_413(detail_lower: str) -> MCPErrorCode:
+    """413 Payload Too Large."""
+    return MCPErrorCode.FILE_TOO_LARGE
+
+
+def _classify_415(detail_lower: str) -> MCPErrorCode:
+    """415 Unsupported Media Type."""
+    if "mime" in detail_lower:
+        return MCPErrorCode.INVALID_MIME_TYPE
+    else:
+        return MCPErrorCode.UNSUPPORTED_FILE_TYPE
+
+
+def _classify_422(detail_lower: str) -> MCPErrorCode:
+    """422 Unprocessable Entity."""
+    if "collection" in detail_lower and "name" in detail_lower:
+        return MCPErrorCode.INVALID_COLLECTION_NAME
+    elif "filename" in detail_lower:
+        return MCPErrorCode.INVALID_FILENAME
+    elif "username" in detail_lower:
+        return MCPErrorCode.INVALID_USERNAME
+    elif "query" in detail_lower and ("empty" in detail_lower or "cannot be" in detail_lower):
+        return MCPErrorCode.EMPTY_QUERY
+    elif "query" in detail_lower and "length" in detail_lower:
+        return MCPErrorCode.INVALID_QUERY_LENGTH
+    elif "corpus" in detail_lower and "id" in detail_lower:
+        return MCPErrorCode.INVALID_CORPUS_ID
+    elif "n_results" in detail_lower or "results" in detail_lower:
+        return MCPErrorCode.INVALID_N_RESULTS
+    elif "no valid files" in detail_lower:
+        return MCPErrorCode.NO_VALID_FILES
     else:
+        # Generic validation error if we can't determine specific type
+        return MCPErrorCode.INVALID_COLLECTION_NAME
+
+
+def _classify_429(detail_lower: str) -> MCPErrorCode:
+    """429 Too Many Requests."""
+    if "embedding" in detail_lower or "openai" in detail_lower:
+        return MCPErrorCode.EMBEDDING_RATE_LIMIT
+    else:
+        return MCPErrorCode.RATE_LIMIT_EXCEEDED
+
+
+def _classify_500(detail_lower: str) -> MCPErrorCode:
+    """500 Internal Server Error."""
+    if "database" in detail_lower or "sqlite" in detail_lower:
+        return MCPErrorCode.DATABASE_ERROR
+    elif "chroma" in detail_lower:
+        return MCPErrorCode.CHROMADB_ERROR
+    elif "openai" in detail_lower or "embedding" in detail_lower:
+        return MCPErrorCode.OPENAI_API_ERROR
+    else:
+        return MCPErrorCode.INTERNAL_ERROR
+
+
+_CLASSIFIERS: Dict[int, Callable[[str], MCPErrorCode]] = {
+    401: _classify_401,
+    403: _classify_403,
+    404: _classify_404,
+    413: _classify_413,
+    415: _classify_415,
+    422: _classify_422,
+    429: _classify_429,
+    500: _classify_500,
+}
+
+
+def _classify_error(status_code: int, detail: str) -> MCPErrorCode:
+    """Match the detail message against the keywords for its status code."""
+    classify = _CLASSIFIERS.get(status_code)
+    if classify is None:
+        # Unknown/unhandled status code
         return MCPErrorCode.UNKNOWN_ERROR
+    # Templated details are often lowercase already; reuse them instead of copying
+    return classify(detail if detail.islower() else detail.lower())
+
+
+_classify_error_cached = lru_cache(maxsize=1024)(_classify_error)
 
 
-def get_retry_guidance(error_code: MCPErrorCode) -> dict:
+_AUTH_ERRORS = frozenset({
+    MCPErrorCode.MISSING_API_KEY,
+    MCPErrorCode.INVALID_API_KEY,
+    MCPErrorCode.EXPIRED_API_KEY,
+})
+
+_AUTHORIZATION_ERRORS = frozenset({
+    MCPErrorCode.INSUFFICIENT_PERMISSIONS,
+    MCPErrorCode.CORPUS_NOT_APPROVED,
+    MCPErrorCode.ADMIN_REQUIRED,
+})
+
+_BUCKET_GUIDANCE = {
+    # Auth errors - retry with fixed credentials
+    "auth": MappingProxyType({
+        "should_retry": True,
+        "retry_after": 0,
+        "backoff_strategy": "none",
+        "max_retries": 1,
+        "guidance": "Retry with valid API key",
+    }),
+    # Authorization errors - don't retry, need different permissions
+    "authz": MappingProxyType({
+        "should_retry": False,
+        "retry_after": None,
+        "backoff_strategy": "none",
+        "max_retries": 0,
+        "guidance": "Request different permissions or resource",
+    }),
+    # Validation and file errors - fix parameters and retry once
+    "validation": MappingProxyType({
+        "should_retry": True,
+        "retry_after": 0,
+        "backoff_strategy": "none",
+        "max_retries": 1,
+        "guidance": "Fix parameters and retry",
+    }),
+    # Rate limiting - exponential backoff
+    "rate_limit": MappingProxyType({
+        "should_retry": True,
+        "retry_after": 60,
+        "backoff_strategy": "exponential",
+        "max_retries": 3,
+        "guidance": "Wait and retry with exponential backoff",
+    }),
+    # Resource not found - don't retry, resource doesn't exist
+    "resource": MappingProxyType({
+        "should_retry": False,
+        "retry_after": None,
+        "backoff_strategy": "none",
+        "max_retries": 0,
+        "guidance": "Resource not found, check parameters",
+    }),
+    # Server errors - exponential backoff
+    "server": MappingProxyType({
+        "should_retry": True,
+        "retry_after": 5,
+        "backoff_strategy": "exponential",
+        "max_retries": 5,
+        "guidance": "Retry with exponential backoff",
+    }),
+    # Unknown error - conservative retry
+    "unknown": MappingProxyType({
+        "should_retry": True,
+        "retry_after": 10,
+        "backoff_strategy": "linear",
+        "max_retries": 2,
+        "guidance": "Retry with caution",
+    }),
+}
+
+
+def _classify(error_code: MCPErrorCode) -> str:
+    """Return the retry bucket an error code belongs to."""
+    if error_code in _AUTH_ERRORS:
+        return "auth"
+    if error_code in _AUTHORIZATION_ERRORS:
+        return "authz"
+    category = error_code.value.split(".", 1)[0]
+    if category == "file":
+        return "validation"
+    return category if category in _BUCKET_GUIDANCE else "unknown"
+
+
+# The enum is closed, so every code is classified once at import
+_BUCKET = {error_code: _classify(error_code) for error_code in MCPErrorCode}
+# Keyed by the plain string value: members hash and compare as their value, so
+# lookups by member still hit, and codes read back from headers need no conversion
+_RETRY_GUIDANCE: Dict[str, Mapping[str, Any]] = {
+    error_code.value: _BUCKET_GUIDANCE[bucket] for error_code, bucket in _BUCKET.items()
+}
+
+
+def get_retry_guidance(error_code: Union[MCPErrorCode, str]) -> Mapping[str, Any]:
     """Get retry guidance for a given error code.
 
     Args:
-        error_code: MCP error code
+        error_code: MCP error code, as a member or its string value
 
     Returns:
-        dict: Retry guidance with keys:
+        Mapping: Read-only retry guidance with keys:
             - should_retry: bool - Whether the request should be retried
             - retry_after: Optional[int] - Seconds to wait before retry
             - backoff_strategy: str - "none", "linear", "exponential"
             - max_retries: int - Maximum number of retry attempts
     """
-    # Auth errors - retry with fixed credentials
-    if error_code in {
-        MCPErrorCode.MISSING_API_KEY,
-        MCPErrorCode.INVALID_API_KEY,
-        MCPErrorCode.EXPIRED_API_KEY,
-    }:
-        return {
-            "should_retry": True,
-            "retry_after": 0,
-            "backoff_strategy": "none",
-            "max_retries": 1,
-            "guidance": "Retry with valid API key",
-        }
-
-    # Authorization errors - don't retry, need different permissions
-    elif error_code in {
-        MCPErrorCode.INSUFFICIENT_PERMISSIONS,
-        MCPErrorCode.CORPUS_NOT_APPROVED,
-        MCPErrorCode.ADMIN_REQUIRED,
-    }:
-        return {
-            "should_retry": False,
-            "retry_after": None,
-            "backoff_strategy": "none",
-            "max_retries": 0,
-            "guidance": "Request different permissions or resource",
-        }
-
-    # Validation errors - fix parameters and retry once
-    elif error_code.value.startswith("validation.") or error_code.value.startswith("file."):
-        return {
-            "should_retry": True,
-            "retry_after": 0,
-            "backoff_strategy": "none",
-            "max_retries": 1,
-            "guidance": "Fix parameters and retry",
-        }
-
-    # Rate limiting - exponential backoff
-    elif error_code.value.startswith("rate_limit."):
-        return {
-            "should_retry": True,
-            "retry_after": 60,
-            "backoff_strategy": "exponential",
-            "max_retries": 3,
-            "guidance": "Wait and retry with exponential backoff",
-        }
-
-    # Resource not found - don't retry, resource doesn't exist
-    elif error_code.value.startswith("resource."):
-        return {
-            "should_retry": False,
-            "retry_after": None,
-            "backoff_strategy": "none",
-            "max_retries": 0,
-            "guidance": "Resource not found, check parameters",
-        }
-
-    # Server errors - exponential backoff
-    elif error_code.value.startswith("server."):
-        return {
-            "should_retry": True,
-            "retry_after": 5,
-            "backoff_strategy": "exponential",
-            "max_retries": 5,
-            "guidance": "Retry with exponential backoff",
-        }
-
-    # Unknown error - conservative retry
-    else:
-        return {
-            "should_retry": True,
-            "retry_after": 10,
-            "backoff_strategy": "linear",
-            "max_retries": 2,
-            "guidance": "Retry with caution",
-        }
+    return _RETRY_GUIDANCE.get(error_code, _BUCKET_GUIDANCE["unknown"])
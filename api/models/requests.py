@@ -2,7 +2,7 @@
 
 from typing import List, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class QueryRequest(BaseModel):
@@ -25,8 +25,8 @@ class QueryRequest(BaseModel):
         examples=[["research_papers", "documentation"]],
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "query": "What is machine learning?",
@@ -38,6 +38,7 @@ class QueryRequest(BaseModel):
                 },
             ]
         }
+    )
 
 
 class UserCredentials(BaseModel):
@@ -62,13 +63,16 @@ class UserCredentials(BaseModel):
     @classmethod
     def truncate_password(cls, v: str) -> str:
         """Truncate password to 72 bytes for bcrypt compatibility."""
+        # ASCII is one byte per character, so slicing needs no encode round trip
+        if v.isascii():
+            return v[:72]
         encoded = v.encode("utf-8")
         if len(encoded) > 72:
             return encoded[:72].decode("utf-8", errors="ignore")
         return v
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "username": "john_doe",
@@ -76,3 +80,4 @@ class UserCredentials(BaseModel):
                 }
             ]
         }
+    )
@@ -1,39 +1,47 @@
 """Pydantic response models for API endpoints."""
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class ErrorResponse(BaseModel):
+class ResponseModel(BaseModel):
+    """Base for response models, which are never modified once built."""
+
+    model_config = ConfigDict(frozen=True)
+
+
+class ErrorResponse(ResponseModel):
     """Standard error response format with optional MCP error code."""
 
     detail: str = Field(..., description="Error message")
     error_code: Optional[str] = Field(None, description="MCP error code for retry logic")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {"detail": "Invalid API key", "error_code": "auth.invalid_api_key"},
                 {"detail": "Collection not found", "error_code": "resource.collection_not_found"},
             ]
         }
+    )
 
 
-class AuthResponse(BaseModel):
+class AuthResponse(ResponseModel):
     """Response for login/register/create-api-key endpoints."""
 
     api_key: str = Field(..., description="API key for authentication")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {"api_key": "a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6"}
             ]
         }
+    )
 
 
-class UploadResponse(BaseModel):
+class UploadResponse(ResponseModel):
     """Response for create-index and update-index endpoints."""
 
     message: str = Field(..., description="Success message")
@@ -41,8 +49,8 @@ class UploadResponse(BaseModel):
         ..., description="Number of chunks indexed", ge=0
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "message": "Created index and ingested 42 chunks into 'research'",
@@ -50,17 +58,18 @@ class UploadResponse(BaseModel):
                 }
             ]
         }
+    )
 
 
-class CollectionMetadata(BaseModel):
+class CollectionMetadata(ResponseModel):
     """Metadata for a single collection."""
 
     name: str = Field(..., description="Collection name")
     files: List[str] = Field(..., description="List of source files")
     num_chunks: int = Field(..., description="Total number of chunks", ge=0)
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "name": "research_papers",
@@ -69,15 +78,16 @@ class CollectionMetadata(BaseModel):
                 }
             ]
         }
+    )
 
 
-class ListCollectionsResponse(BaseModel):
+class ListCollectionsResponse(ResponseModel):
     """Response for list-indexes endpoint."""
 
     collections: List[CollectionMetadata]
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "collections": [
@@ -95,16 +105,17 @@ class ListCollectionsResponse(BaseModel):
                 }
             ]
         }
+    )
 
 
-class QueryResponse(BaseModel):
+class QueryResponse(ResponseModel):
     """Response for query endpoint."""
 
     context: str = Field(..., description="Compiled context from query results")
-    raw_results: dict = Field(..., description="Raw ChromaDB query results")
+    raw_results: Dict[str, Any] = Field(..., description="Raw ChromaDB query results")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {
                     "context": "Machine learning is a subset of AI...\n\nDeep learning uses neural networks...",
@@ -117,25 +128,26 @@ class QueryResponse(BaseModel):
                 }
             ]
         }
+    )
 
 
-class DeleteResponse(BaseModel):
+class DeleteResponse(ResponseModel):
     """Response for delete-index endpoint."""
 
     message: str = Field(..., description="Confirmation message")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "examples": [
                 {"message": "Collection 'research_papers' deleted successfully"}
             ]
         }
+    )
 
 
-class StatusResponse(BaseModel):
+class StatusResponse(ResponseModel):
     """Response for status endpoint."""
 
     status: str = Field(..., description="API status", pattern="^ok$")
 
-    class Config:
-        json_schema_extra = {"examples": [{"status": "ok"}]}
+    model_config = ConfigDict(json_schema_extra={"examples": [{"status": "ok"}]})
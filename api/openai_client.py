@@ -0,0 +1,246 @@
+"""Throttled, retrying access to the OpenAI embeddings API for async callers."""
+
+import asyncio
+import hashlib
+import random
+import time
+import weakref
+from typing import Dict, List, Optional
+
+import numpy as np
+from openai import APIConnectionError, BadRequestError, InternalServerError, RateLimitError
+
+from config import (
+    EMBEDDING_BATCH_MAX_CHARS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CONCURRENCY,
+    MAX_EMBEDDING_RETRIES,
+    OPENAI_RPM,
+)
+from logging_config import get_logger
+from vector_store.embed_cache import get_cached_embeddings, store_embeddings
+from vector_store.embedder import aget_openai_embeddings_batch
+
+logger = get_logger(__name__)
+
+# Longest we ever back off between attempts
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def _loop_local(registry: weakref.WeakKeyDictionary, factory):
+    """Return ``registry``'s primitive for the running loop, creating it on first use.
+
+    asyncio locks and semaphores bind to the first loop that waits on them, and
+    this process can run more than one loop (e.g. the test client, CLI tools).
+    """
+    loop = asyncio.get_running_loop()
+    primitive = registry.get(loop)
+    if primitive is None:
+        primitive = registry[loop] = factory()
+    return primitive
+
+
+class AsyncLimiter:
+    """Token bucket allowing ``max_rate`` acquisitions per ``time_period`` seconds.
+
+    Use as ``async with limiter:``; callers wait until a token is available, which
+    keeps sustained throughput just below the configured ceiling instead of
+    bursting into 429s. When the API does push back, ``backoff`` halves the refill
+    rate and each ``recover`` moves it a tenth of the way back to ``max_rate``.
+    """
+
+    # The refill rate never drops below this fraction of max_rate
+    MIN_RATE_FRACTION = 1 / 16
+
+    def __init__(self, max_rate: float, time_period: float = 60.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self.rate = float(max_rate)
+        self._tokens = float(max_rate)
+        self._updated = time.monotonic()
+        # The bucket is process-wide; the lock queuing waiters is per event loop
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it."""
+        lock = _loop_local(self._locks, asyncio.Lock)
+        async with lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.rate / self.time_period
+                self._tokens = min(float(self.max_rate), self._tokens + refill)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.time_period / self.rate)
+
+    def backoff(self) -> None:
+        """Halve the refill rate after a rate-limit error."""
+        self.rate = max(self.max_rate * self.MIN_RATE_FRACTION, self.rate / 2)
+
+    def recover(self) -> None:
+        """Ease the refill rate back toward ``max_rate`` after a successful request."""
+        if self.rate < self.max_rate:
+            self.rate += (self.max_rate - self.rate) * 0.1
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+# Shared across all requests in this process
+limiter = AsyncLimiter(OPENAI_RPM, 60)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _concurrency() -> asyncio.Semaphore:
+    """Return the in-flight request semaphore for the running event loop."""
+    return _loop_local(_semaphores, lambda: asyncio.Semaphore(EMBEDDING_CONCURRENCY))
+
+
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Return the server-provided ``Retry-After`` delay, if any."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _batches(texts: List[str]) -> List[List[str]]:
+    """Group texts into requests bounded by input count and total characters."""
+    batches: List[List[str]] = []
+    current: List[str] = []
+    current_chars = 0
+    for text in texts:
+        if current and (
+            len(current) >= EMBEDDING_BATCH_SIZE
+            or current_chars + len(text) > EMBEDDING_BATCH_MAX_CHARS
+        ):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(text)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _embed_batch_with_retry(batch: List[str], attempts: int) -> np.ndarray:
+    for attempt in range(attempts):
+        try:
+            async with limiter, _concurrency():
+                vectors = await aget_openai_embeddings_batch(batch)
+            limiter.recover()
+            return vectors
+        except BadRequestError as e:
+            # The request exceeded a token limit: split it rather than failing the upload
+            if len(batch) > 1 and "token" in str(e).lower():
+                mid = len(batch) // 2
+                logger.warning(f"Embedding batch of {len(batch)} too large, splitting in half")
+                first = await _embed_batch_with_retry(batch[:mid], attempts)
+                second = await _embed_batch_with_retry(batch[mid:], attempts)
+                return np.concatenate([first, second])
+            raise
+        except (RateLimitError, APIConnectionError, InternalServerError) as e:
+            if isinstance(e, RateLimitError):
+                limiter.backoff()
+            if attempt == attempts - 1:
+                logger.error(f"Embedding request failed after {attempts} attempts: {e}")
+                raise
+            # Honor Retry-After when the API sends it; otherwise exponential backoff
+            # with jitter so concurrent uploads don't retry in lockstep
+            wait_time = _retry_after_seconds(e)
+            if wait_time is None:
+                wait_time = 2 ** attempt + random.uniform(0, 1)
+            wait_time = min(MAX_BACKOFF_SECONDS, wait_time)
+            logger.warning(
+                f"{type(e).__name__} from OpenAI, retrying in {wait_time:.1f}s "
+                f"(attempt {attempt + 1}/{attempts})"
+            )
+            await asyncio.sleep(wait_time)
+
+
+async def embeddings_with_retry(
+    texts: List[str], attempts: int = MAX_EMBEDDING_RETRIES
+) -> np.ndarray:
+    """Embed ``texts`` under the shared rate limit, retrying transient failures.
+
+    Texts already in the persistent embedding cache are not sent at all. The rest
+    are grouped into requests of at most ``EMBEDDING_BATCH_SIZE`` inputs and
+    ``EMBEDDING_BATCH_MAX_CHARS`` characters, so each request costs one limiter
+    token and a retry only repeats the batch that failed. Returns an
+    ``(len(texts), D)`` float32 array.
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    vectors = await asyncio.to_thread(get_cached_embeddings, texts)
+    misses = [i for i, vec in enumerate(vectors) if vec is None]
+    if misses:
+        miss_texts = [texts[i] for i in misses]
+        # Sub-batches go out concurrently (bounded by the shared semaphore and rate
+        # limiter) so their round trips overlap; gather keeps them in input order
+        fresh = np.concatenate(
+            await asyncio.gather(
+                *[_embed_batch_with_retry(batch, attempts) for batch in _batches(miss_texts)]
+            )
+        )
+        await asyncio.to_thread(store_embeddings, miss_texts, fresh)
+        if len(misses) == len(texts):
+            return fresh
+        for i, vec in zip(misses, fresh):
+            vectors[i] = vec
+    return np.stack(vectors)
+
+
+class EmbeddingDeduper:
+    """Embed each distinct text once across the concurrent tasks of one request.
+
+    Boilerplate such as headers, footers and license text recurs verbatim across
+    files. The first task to see a text embeds it; any other task in the same
+    request waits on that result instead of paying for another embedding.
+    """
+
+    def __init__(self):
+        self._pending: Dict[bytes, asyncio.Future] = {}
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        """Return an ``(len(texts), D)`` float32 array, embedding only unseen texts."""
+        keys = [hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest() for text in texts]
+
+        loop = asyncio.get_running_loop()
+        owned: Dict[bytes, int] = {}
+        new_texts: List[str] = []
+        for key, text in zip(keys, texts):
+            if key not in self._pending:
+                self._pending[key] = loop.create_future()
+                owned[key] = len(new_texts)
+                new_texts.append(text)
+
+        if new_texts:
+            try:
+                vectors = await embeddings_with_retry(new_texts)
+            except BaseException as e:
+                for key in owned:
+                    self._pending[key].set_exception(e)
+                    # Mark as retrieved: other tasks may never await this future
+                    self._pending[key].exception()
+                raise
+            for key, row in owned.items():
+                self._pending[key].set_result(vectors[row])
+
+        if len(owned) < len(keys):
+            logger.debug(f"Reused embeddings for {len(keys) - len(owned)} duplicate chunks")
+        rows = [await self._pending[key] for key in keys]
+        return np.stack(rows) if rows else np.empty((0, 0), dtype=np.float32)
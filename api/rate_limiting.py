@@ -3,6 +3,11 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from config import DEFAULT_RATE_LIMIT
+from config import DEFAULT_RATE_LIMIT, RATE_LIMIT_STORAGE_URI, RATE_LIMIT_STRATEGY
 
-limiter = Limiter(key_func=get_remote_address, default_limits=[DEFAULT_RATE_LIMIT])
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=[DEFAULT_RATE_LIMIT],
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy=RATE_LIMIT_STRATEGY,
+)
@@ -1,14 +1,127 @@
 """Usage tracking for billing and analytics."""
 
+import atexit
 import json
-import sqlite3
+import queue
+import threading
+import time
 from typing import Optional
 
-from api.corpus_db import _current_timestamp, _get_conn
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from api.corpus_db import _current_timestamp, _get_pool
+from config import USAGE_LOG_BATCH_SIZE, USAGE_LOG_FLUSH_MS, USAGE_LOG_QUEUE_SIZE
 from logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Metadata is stored as JSON text either way; orjson just encodes and decodes it faster
+if ORJSON_AVAILABLE:
+    def _dump_metadata(metadata: dict) -> str:
+        return orjson.dumps(metadata).decode()
+
+    _load_metadata = orjson.loads
+else:
+    _dump_metadata = json.dumps
+    _load_metadata = json.loads
+
+# Kept as one constant so every call hits the same cached prepared statement
+_INSERT_USAGE_SQL = """
+    INSERT INTO usage_logs (
+        user_id, corpus_id, action, query_count, timestamp, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Keys for the columns selected by get_recent_usage_logs, in order
+_RECENT_LOG_KEYS = (
+    "id", "user_id", "corpus_id", "action", "query_count",
+    "timestamp", "metadata", "username", "corpus_name",
+)
+
+
+def _recent_logs_sql(by_user: bool, by_corpus: bool) -> str:
+    """Build the recent-logs query for one combination of filters."""
+    filters = ["ul.user_id = ?"] * by_user + ["ul.corpus_id = ?"] * by_corpus
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+    return f"""
+        SELECT
+            ul.id, ul.user_id, ul.corpus_id, ul.action,
+            ul.query_count, ul.timestamp, ul.metadata,
+            u.username, c.name as corpus_name
+        FROM usage_logs ul
+        JOIN users u ON ul.user_id = u.id
+        JOIN corpuses c ON ul.corpus_id = c.id
+        {where}
+        ORDER BY ul.timestamp DESC LIMIT ?
+    """
+
+
+# One fixed statement per filter combination, keyed by (by_user, by_corpus), so
+# each is parsed once and then served from the connection's statement cache
+_RECENT_LOGS_SQL = {
+    (by_user, by_corpus): _recent_logs_sql(by_user, by_corpus)
+    for by_user in (False, True)
+    for by_corpus in (False, True)
+}
+
+# Rows waiting for the background writer, which starts on first use
+_usage_queue: "queue.Queue[tuple]" = queue.Queue(maxsize=USAGE_LOG_QUEUE_SIZE)
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+
+
+def _write_usage_rows(rows: list[tuple]) -> None:
+    """Insert a batch of queued usage rows in a single transaction."""
+    try:
+        with _get_pool().writer() as conn:
+            conn.executemany(_INSERT_USAGE_SQL, rows)
+        logger.debug("Logged %s usage rows", len(rows))
+    except Exception as e:
+        logger.error(f"Failed to log usage: {e}")
+
+
+def _flush_usage_forever() -> None:
+    """Drain the usage queue, one transaction per batch."""
+    while True:
+        rows = [_usage_queue.get()]
+        deadline = time.monotonic() + USAGE_LOG_FLUSH_MS / 1000
+        while len(rows) < USAGE_LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                rows.append(_usage_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        _write_usage_rows(rows)
+        for _ in rows:
+            _usage_queue.task_done()
+
+
+def _ensure_flusher() -> None:
+    """Start the background writer the first time usage is logged."""
+    global _flusher
+    if _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(
+                target=_flush_usage_forever, name="usage-log-flusher", daemon=True
+            )
+            _flusher.start()
+
+
+@atexit.register
+def flush_usage_logs() -> None:
+    """Block until every queued usage row has been written."""
+    if _flusher is not None:
+        _usage_queue.join()
+
 
 def log_corpus_usage(
     user_id: int,
@@ -28,35 +141,30 @@ def log_corpus_usage(
 
     Note:
         This function is designed to never fail - errors are logged but not raised
-        to avoid disrupting the main application flow.
+        to avoid disrupting the main application flow. Rows are queued and
+        written in batches by a background thread; call flush_usage_logs()
+        to wait for them.
     """
-    conn = _get_conn()
-
     try:
-        conn.execute(
-            """
-            INSERT INTO usage_logs (
-                user_id, corpus_id, action, query_count, timestamp, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """,
+        _ensure_flusher()
+        _usage_queue.put_nowait(
             (
                 user_id,
                 corpus_id,
                 action,
                 query_count,
                 _current_timestamp(),
-                json.dumps(metadata) if metadata else None,
-            ),
+                _dump_metadata(metadata) if metadata else None,
+            )
         )
-        conn.commit()
-        logger.debug(
-            f"Logged usage: user={user_id}, corpus={corpus_id}, action={action}, count={query_count}"
+    except queue.Full:
+        logger.warning(
+            "Usage log queue full, dropping: user=%s, corpus=%s, action=%s",
+            user_id, corpus_id, action,
         )
     except Exception as e:
         logger.error(f"Failed to log usage: {e}")
         # Don't raise - usage logging should never block main operations
-    finally:
-        conn.close()
 
 
 def get_user_usage_stats(user_id: int, corpus_id: Optional[int] = None) -> dict:
@@ -72,40 +180,39 @@ def get_user_usage_stats(user_id: int, corpus_id: Optional[int] = None) -> dict:
             - total_queries: Total number of queries
             - last_access: Timestamp of last access (or None)
     """
-    conn = _get_conn()
-
     try:
-        if corpus_id:
-            cur = conn.execute(
-                """
-                SELECT
-                    COUNT(*) as total_actions,
-                    SUM(query_count) as total_queries,
-                    MAX(timestamp) as last_access
-                FROM usage_logs
-                WHERE user_id = ? AND corpus_id = ?
-                """,
-                (user_id, corpus_id),
-            )
-        else:
-            cur = conn.execute(
-                """
-                SELECT
-                    COUNT(*) as total_actions,
-                    SUM(query_count) as total_queries,
-                    MAX(timestamp) as last_access
-                FROM usage_logs
-                WHERE user_id = ?
-                """,
-                (user_id,),
-            )
+        with _get_pool().reader() as conn:
+            if corpus_id:
+                cur = conn.execute(
+                    """
+                    SELECT
+                        COUNT(*) as total_actions,
+                        SUM(query_count) as total_queries,
+                        MAX(timestamp) as last_access
+                    FROM usage_logs
+                    WHERE user_id = ? AND corpus_id = ?
+                    """,
+                    (user_id, corpus_id),
+                )
+            else:
+                cur = conn.execute(
+                    """
+                    SELECT
+                        COUNT(*) as total_actions,
+                        SUM(query_count) as total_queries,
+                        MAX(timestamp) as last_access
+                    FROM usage_logs
+                    WHERE user_id = ?
+                    """,
+                    (user_id,),
+                )
 
-        row = cur.fetchone()
-        return {
-            "total_actions": row[0] or 0,
-            "total_queries": row[1] or 0,
-            "last_access": row[2],
-        }
+            row = cur.fetchone()
+            return {
+                "total_actions": row[0] or 0,
+                "total_queries": row[1] or 0,
+                "last_access": row[2],
+            }
     except Exception as e:
         logger.error(f"Failed to get user usage stats: {e}")
         return {
@@ -113,8 +220,6 @@ def get_user_usage_stats(user_id: int, corpus_id: Optional[int] = None) -> dict:
             "total_queries": 0,
             "last_access": None,
         }
-    finally:
-        conn.close()
 
 
 def get_corpus_usage_stats(corpus_id: int) -> dict:
@@ -130,29 +235,28 @@ def get_corpus_usage_stats(corpus_id: int) -> dict:
             - total_queries: Total number of queries
             - last_access: Timestamp of last access (or None)
     """
-    conn = _get_conn()
-
     try:
-        cur = conn.execute(
-            """
-            SELECT
-                COUNT(DISTINCT user_id) as unique_users,
-                COUNT(*) as total_actions,
-                SUM(query_count) as total_queries,
-                MAX(timestamp) as last_access
-            FROM usage_logs
-            WHERE corpus_id = ?
-            """,
-            (corpus_id,),
-        )
+        with _get_pool().reader() as conn:
+            cur = conn.execute(
+                """
+                SELECT
+                    COUNT(DISTINCT user_id) as unique_users,
+                    COUNT(*) as total_actions,
+                    SUM(query_count) as total_queries,
+                    MAX(timestamp) as last_access
+                FROM usage_logs
+                WHERE corpus_id = ?
+                """,
+                (corpus_id,),
+            )
 
-        row = cur.fetchone()
-        return {
-            "unique_users": row[0] or 0,
-            "total_actions": row[1] or 0,
-            "total_queries": row[2] or 0,
-            "last_access": row[3],
-        }
+            row = cur.fetchone()
+            return {
+                "unique_users": row[0] or 0,
+                "total_actions": row[1] or 0,
+                "total_queries": row[2] or 0,
+                "last_access": row[3],
+            }
     except Exception as e:
         logger.error(f"Failed to get corpus usage stats: {e}")
         return {
@@ -161,8 +265,6 @@ def get_corpus_usage_stats(corpus_id: int) -> dict:
             "total_queries": 0,
             "last_access": None,
         }
-    finally:
-        conn.close()
 
 
 def get_recent_usage_logs(
@@ -180,51 +282,19 @@ def get_recent_usage_logs(
     Returns:
         list[dict]: List of usage log entries
     """
-    conn = _get_conn()
-
     try:
-        query = """
-            SELECT
-                ul.id, ul.user_id, ul.corpus_id, ul.action,
-                ul.query_count, ul.timestamp, ul.metadata,
-                u.username, c.name as corpus_name
-            FROM usage_logs ul
-            JOIN users u ON ul.user_id = u.id
-            JOIN corpuses c ON ul.corpus_id = c.id
-            WHERE 1=1
-        """
-        params = []
-
-        if user_id:
-            query += " AND ul.user_id = ?"
-            params.append(user_id)
-
-        if corpus_id:
-            query += " AND ul.corpus_id = ?"
-            params.append(corpus_id)
-
-        query += " ORDER BY ul.timestamp DESC LIMIT ?"
-        params.append(limit)
-
-        cur = conn.execute(query, params)
-
-        logs = []
-        for row in cur.fetchall():
-            logs.append({
-                "id": row[0],
-                "user_id": row[1],
-                "corpus_id": row[2],
-                "action": row[3],
-                "query_count": row[4],
-                "timestamp": row[5],
-                "metadata": json.loads(row[6]) if row[6] else None,
-                "username": row[7],
-                "corpus_name": row[8],
-            })
-
-        return logs
+        with _get_pool().reader() as conn:
+            sql = _RECENT_LOGS_SQL[bool(user_id), bool(corpus_id)]
+            params = [value for value in (user_id, corpus_id) if value]
+            params.append(limit)
+
+            logs = []
+            for row in conn.execute(sql, params):
+                log = dict(zip(_RECENT_LOG_KEYS, row))
+                log["metadata"] = _load_metadata(log["metadata"]) if log["metadata"] else None
+                logs.append(log)
+
+            return logs
     except Exception as e:
         logger.error(f"Failed to get recent usage logs: {e}")
         return []
-    finally:
-        conn.close()
@@ -1,46 +1,114 @@
 """User management and API key generation utilities."""
 
+import asyncio
 import hashlib
 import secrets
 import sqlite3
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException, Request
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
 from config import (
+    API_KEY_PURGE_INTERVAL_SECONDS,
     API_KEY_TTL_DAYS,
     AUTH_RATE_LIMIT,
+    BCRYPT_ROUNDS,
     PASSWORD_MIN_LENGTH,
     REQUIRE_COMPLEX_PASSWORD,
     USER_DB_PATH,
     VECTOR_DB_PATH,
 )
 
+from logging_config import get_logger
+
+from .corpus_db import _ConnPool, _current_timestamp, _get_pool
 from .rate_limiting import limiter
 from .validation import validate_username
 
+logger = get_logger(__name__)
+
 # Database location for user accounts and API keys
 DB_PATH = USER_DB_PATH
 API_KEY_TTL_SECONDS = API_KEY_TTL_DAYS * 24 * 60 * 60
 
+# Short-lived caches in front of the per-request credential lookups, keyed by
+# database path so a swapped DB_PATH never serves stale users
+_api_key_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+_cognito_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+_auth_cache_lock = threading.Lock()
+# Vector DB directories this process has already created, by (base path, username).
+# No lock: racing first sightings both run an idempotent mkdir and store the same path
+_user_dirs: dict[tuple[str, str], str] = {}
+
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__ident="2b",
     # Note: bcrypt 4.x+ raises errors for passwords > 72 bytes
     # We handle truncation manually in _hash_password() and _verify_password()
 )
 
 
-def _get_conn():
-    return sqlite3.connect(DB_PATH)
+def _pool() -> _ConnPool:
+    """Return the connection pool for the current ``DB_PATH``.
+
+    Users live in the same database as the corpus tables, so this is the same
+    pool of long-lived connections ``api.corpus_db`` uses. Reads borrow a
+    read-only connection; writes run as one transaction on the writer.
+    """
+    return _get_pool(DB_PATH)
+
+
+# Statements are run one by one: executescript would commit the open transaction first
+_TABLE_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        cognito_sub TEXT,
+        email TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS api_keys (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        key_hash BLOB UNIQUE NOT NULL,
+        user_id INTEGER NOT NULL,
+        created_at INTEGER,
+        expires_at INTEGER,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+    """,
+)
+
+# Create indexes for better query performance
+_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS idx_api_keys_user_id ON api_keys(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_api_keys_expires_at ON api_keys(expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_users_cognito_sub ON users(cognito_sub)",
+)
+
 
+def _ensure_user_dir(username: str) -> str:
+    """Return the user's vector DB directory, creating it the first time it is seen."""
+    from vector_store import vector_index
 
-def _current_timestamp() -> int:
-    return int(datetime.now(timezone.utc).timestamp())
+    key = (str(vector_index.VECTOR_DB_PATH), username)
+    path = _user_dirs.get(key)
+    if path is None:
+        # Use safe path construction
+        user_path = Path(vector_index.get_user_db_path(username))
+        user_path.mkdir(parents=True, exist_ok=True)
+        path = _user_dirs[key] = str(user_path)
+    return path
 
 
 def _ensure_api_key_schema(conn: sqlite3.Connection) -> None:
@@ -55,13 +123,23 @@ def _ensure_api_key_schema(conn: sqlite3.Connection) -> None:
         conn.execute("ALTER TABLE api_keys ADD COLUMN name TEXT DEFAULT 'API Key'")
     if "key_preview" not in columns:
         conn.execute("ALTER TABLE api_keys ADD COLUMN key_preview TEXT")
+    # Backfills touch only the rows still missing a value, not every key on each start
     conn.execute(
-        "UPDATE api_keys SET created_at = COALESCE(created_at, strftime('%s','now'))"
+        "UPDATE api_keys SET created_at = strftime('%s','now') WHERE created_at IS NULL"
     )
     conn.execute(
-        "UPDATE api_keys SET expires_at = COALESCE(expires_at, created_at + ?)",
+        "UPDATE api_keys SET expires_at = created_at + ? WHERE expires_at IS NULL",
         (API_KEY_TTL_SECONDS,),
     )
+    # Older databases stored hex digests as TEXT. TEXT sorts before every BLOB,
+    # so this range over the key_hash index finds just the rows still to convert
+    legacy = conn.execute(
+        "SELECT id, key_hash FROM api_keys WHERE key_hash < x''"
+    ).fetchall()
+    conn.executemany(
+        "UPDATE api_keys SET key_hash = ? WHERE id = ?",
+        [(bytes.fromhex(key_hash), key_id) for key_id, key_hash in legacy],
+    )
     # Set default name for existing keys without one
     conn.execute(
         "UPDATE api_keys SET name = 'Legacy Key' WHERE name IS NULL"
@@ -75,6 +153,22 @@ def _purge_expired_api_keys(conn: sqlite3.Connection) -> None:
     )
 
 
+def purge_expired_api_keys() -> None:
+    """Delete expired API keys, off the request path."""
+    with _pool().writer() as conn:
+        _purge_expired_api_keys(conn)
+
+
+async def purge_expired_api_keys_forever() -> None:
+    """Purge expired API keys every ``API_KEY_PURGE_INTERVAL_SECONDS``."""
+    while True:
+        await asyncio.sleep(API_KEY_PURGE_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(purge_expired_api_keys)
+        except sqlite3.Error:
+            logger.exception("Failed to purge expired API keys")
+
+
 def _ensure_cognito_schema(conn: sqlite3.Connection) -> None:
     """Add cognito_sub and email columns if they don't exist."""
     cur = conn.execute("PRAGMA table_info(users)")
@@ -97,42 +191,16 @@ def init_db():
     db_dir = Path(DB_PATH).parent
     db_dir.mkdir(parents=True, exist_ok=True)
 
-    conn = _get_conn()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            cognito_sub TEXT,
-            email TEXT
-        )
-        """
-    )
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS api_keys (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            key_hash TEXT UNIQUE NOT NULL,
-            user_id INTEGER NOT NULL,
-            created_at INTEGER,
-            expires_at INTEGER,
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        )
-        """
-    )
-    _ensure_api_key_schema(conn)
-    _ensure_cognito_schema(conn)
-    _purge_expired_api_keys(conn)
-
-    # Create indexes for better query performance
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_api_keys_user_id ON api_keys(user_id)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_api_keys_expires_at ON api_keys(expires_at)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_users_cognito_sub ON users(cognito_sub)")
-
-    conn.commit()
-    conn.close()
+    # One transaction for the whole bootstrap, so a start-up commits once
+    with _pool().writer() as conn:
+        for ddl in _TABLE_DDL:
+            conn.execute(ddl)
+        _ensure_api_key_schema(conn)
+        _ensure_cognito_schema(conn)
+        _purge_expired_api_keys(conn)
+        # Indexes last: some cover columns the migrations above add to old databases
+        for ddl in _INDEX_DDL:
+            conn.execute(ddl)
 
 
 # Ensure DB exists on import
@@ -148,6 +216,9 @@ class UserCredentials(BaseModel):
 
 def _truncate_password(password: str, max_bytes: int = 72) -> str:
     """Truncate password to max_bytes while preserving UTF-8 validity."""
+    # ASCII is one byte per character, so slicing needs no encode round trip
+    if password.isascii():
+        return password[:max_bytes]
     encoded = password.encode('utf-8')
     if len(encoded) <= max_bytes:
         return password
@@ -174,8 +245,17 @@ def _verify_password(password: str, password_hash: str) -> bool:
         raise
 
 
-def _hash_api_key(api_key: str) -> str:
-    return hashlib.sha256(api_key.encode()).hexdigest()
+def _hash_api_key(api_key: str) -> bytes:
+    """Return the raw SHA-256 digest stored in ``api_keys.key_hash``.
+
+    Only digests are stored. A lookup is one probe of the UNIQUE index on
+    ``key_hash``, so there is no raw key to compare and nothing to scan.
+    The 32-byte BLOB keeps that index at half the size of a hex string.
+    """
+    # A 32-character key is a single SHA-256 block, and with the CPU's SHA
+    # extensions SHA-256 beats BLAKE2b on it; changing either the hash or the
+    # key format would also strand every key already issued
+    return hashlib.sha256(api_key.encode()).digest()
 
 
 def _validate_password_strength(password: str) -> None:
@@ -194,10 +274,19 @@ def _validate_password_strength(password: str) -> None:
         )
 
     if REQUIRE_COMPLEX_PASSWORD:
-        has_lower = any(c.islower() for c in password)
-        has_upper = any(c.isupper() for c in password)
-        has_digit = any(c.isdigit() for c in password)
-        has_symbol = any(not c.isalnum() for c in password)
+        # One pass over the password, stopping once every class has been seen
+        has_lower = has_upper = has_digit = has_symbol = False
+        for ch in password:
+            if ch.islower():
+                has_lower = True
+            elif ch.isupper():
+                has_upper = True
+            elif ch.isdigit():
+                has_digit = True
+            elif not ch.isalnum():
+                has_symbol = True
+            if has_lower and has_upper and has_digit and has_symbol:
+                break
         if not (has_lower and has_upper and has_digit and has_symbol):
             raise HTTPException(
                 status_code=400,
@@ -213,7 +302,10 @@ def _generate_key_preview(api_key: str) -> str:
 
 
 def _create_api_key(conn: sqlite3.Connection, user_id: int, name: str = "API Key") -> tuple[str, int]:
-    """Create a new API key and return (api_key, key_id)."""
+    """Create a new API key and return (api_key, key_id).
+
+    Runs inside the caller's write transaction, which commits it.
+    """
     api_key = secrets.token_hex(16)
     timestamp = _current_timestamp()
     expires_at = timestamp + API_KEY_TTL_SECONDS
@@ -222,7 +314,6 @@ def _create_api_key(conn: sqlite3.Connection, user_id: int, name: str = "API Key
         "INSERT INTO api_keys (key_hash, user_id, created_at, expires_at, name, key_preview) VALUES (?, ?, ?, ?, ?, ?)",
         (_hash_api_key(api_key), user_id, timestamp, expires_at, name, key_preview),
     )
-    conn.commit()
     return api_key, cursor.lastrowid
 
 
@@ -231,33 +322,27 @@ def register_user(username: str, password: str) -> str:
     # SECURITY: Validate username BEFORE any database operations
     username = validate_username(username)
     _validate_password_strength(password)
-    conn = _get_conn()
-    user_id = None
+    # Hash before taking the write lock; bcrypt is deliberately slow
+    password_hash = _hash_password(password)
     try:
-        cursor = conn.execute(
-            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-            (username, _hash_password(password)),
-        )
-        user_id = cursor.lastrowid
-        conn.commit()
+        with _pool().writer() as conn:
+            cursor = conn.execute(
+                "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+                (username, password_hash),
+            )
+            # Create API key for the new user
+            api_key, _ = _create_api_key(conn, cursor.lastrowid)
     except sqlite3.IntegrityError:
-        conn.close()
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    # Create API key for the new user
-    api_key, _ = _create_api_key(conn, user_id)
-    conn.close()
-
     # Create vector DB directory for the user with safe path construction
-    from vector_store.vector_index import get_user_db_path
-    user_path = Path(get_user_db_path(username))
-    user_path.mkdir(parents=True, exist_ok=True)
+    _ensure_user_dir(username)
 
     return api_key
 
 
-def login_user(username: str, password: str) -> str:
-    """Validate user credentials and return a new API key."""
+def _authenticate_and_issue_key(username: str, password: str) -> str:
+    """Verify a user's credentials and issue them a new API key."""
     # SECURITY: Validate username format (but don't raise 422 for non-existent users)
     # This prevents timing attacks and information leakage
     try:
@@ -266,40 +351,26 @@ def login_user(username: str, password: str) -> str:
         # Invalid format - return generic error
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    conn = _get_conn()
-    cur = conn.execute(
-        "SELECT id, password_hash FROM users WHERE username=?", (username,)
-    )
-    row = cur.fetchone()
+    with _pool().reader() as conn:
+        row = conn.execute(
+            "SELECT id, password_hash FROM users WHERE username=?", (username,)
+        ).fetchone()
     if not row or not _verify_password(password, row[1]):
-        conn.close()
         raise HTTPException(status_code=401, detail="Invalid credentials")
     user_id = row[0]
-    api_key, _ = _create_api_key(conn, user_id)
-    conn.close()
+    with _pool().writer() as conn:
+        api_key, _ = _create_api_key(conn, user_id)
     return api_key
 
 
+def login_user(username: str, password: str) -> str:
+    """Validate user credentials and return a new API key."""
+    return _authenticate_and_issue_key(username, password)
+
+
 def create_api_key_for_user(username: str, password: str) -> str:
     """Generate a new API key for a user after verifying credentials."""
-    # SECURITY: Validate username
-    try:
-        username = validate_username(username)
-    except HTTPException:
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-
-    conn = _get_conn()
-    cur = conn.execute(
-        "SELECT id, password_hash FROM users WHERE username=?", (username,)
-    )
-    row = cur.fetchone()
-    if not row or not _verify_password(password, row[1]):
-        conn.close()
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    user_id = row[0]
-    api_key, _ = _create_api_key(conn, user_id)
-    conn.close()
-    return api_key
+    return _authenticate_and_issue_key(username, password)
 
 
 @router.post("/register")
@@ -330,48 +401,53 @@ def get_user_by_api_key(api_key: Optional[str]) -> Optional[dict]:
     """Return user details for a given API key or ``None`` if not found."""
     if not api_key:
         return None
-    conn = _get_conn()
-    cur = conn.execute(
-        """
-        SELECT api_keys.id, api_keys.expires_at, users.id, users.username
-        FROM api_keys
-        JOIN users ON api_keys.user_id = users.id
-        WHERE api_keys.key_hash = ?
-        """,
-        (_hash_api_key(api_key),),
-    )
-    row = cur.fetchone()
+    key_hash = _hash_api_key(api_key)
+    cache_key = (DB_PATH, key_hash)
+    now = _current_timestamp()
+    with _auth_cache_lock:
+        cached = _api_key_cache.get(cache_key)
+    if cached is not None:
+        api_key_id, expires_at, user = cached
+        # Expiry is still checked exactly; only the lookup is cached
+        if expires_at is None or expires_at >= now:
+            return dict(user)
+
+    # Expired keys simply don't match; purge_expired_api_keys deletes them later
+    with _pool().reader() as conn:
+        row = conn.execute(
+            """
+            SELECT api_keys.id, api_keys.expires_at, users.id, users.username
+            FROM api_keys
+            JOIN users ON api_keys.user_id = users.id
+            WHERE api_keys.key_hash = ?
+              AND (api_keys.expires_at IS NULL OR api_keys.expires_at >= ?)
+            """,
+            (key_hash, now),
+        ).fetchone()
     if not row:
-        conn.close()
+        if cached is not None:
+            with _auth_cache_lock:
+                _api_key_cache.pop(cache_key, None)
         return None
     api_key_id, expires_at, user_id, username = row
-    if expires_at is not None and expires_at < _current_timestamp():
-        conn.execute("DELETE FROM api_keys WHERE id = ?", (api_key_id,))
-        conn.commit()
-        conn.close()
-        return None
-    conn.close()
-    # Use safe path construction
-    from vector_store.vector_index import get_user_db_path
-    user_path = Path(get_user_db_path(username))
-    user_path.mkdir(parents=True, exist_ok=True)
-    return {"id": user_id, "username": username, "db_path": str(user_path)}
+    user = {"id": user_id, "username": username, "db_path": _ensure_user_dir(username)}
+    with _auth_cache_lock:
+        _api_key_cache[cache_key] = (api_key_id, expires_at, user)
+    return dict(user)
 
 
 def list_api_keys_for_user(user_id: int) -> list[dict]:
     """List all API keys for a user (without exposing full keys)."""
-    conn = _get_conn()
-    cur = conn.execute(
-        """
-        SELECT id, name, key_preview, created_at, expires_at
-        FROM api_keys
-        WHERE user_id = ? AND (expires_at IS NULL OR expires_at > ?)
-        ORDER BY created_at DESC
-        """,
-        (user_id, _current_timestamp()),
-    )
-    rows = cur.fetchall()
-    conn.close()
+    with _pool().reader() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, name, key_preview, created_at, expires_at
+            FROM api_keys
+            WHERE user_id = ? AND (expires_at IS NULL OR expires_at > ?)
+            ORDER BY created_at DESC
+            """,
+            (user_id, _current_timestamp()),
+        ).fetchall()
 
     return [
         {
@@ -387,16 +463,14 @@ def list_api_keys_for_user(user_id: int) -> list[dict]:
 
 def create_named_api_key_for_user(user_id: int, name: str = "API Key") -> dict:
     """Create a new named API key for a user (authenticated via Cognito)."""
-    conn = _get_conn()
-    api_key, key_id = _create_api_key(conn, user_id, name)
+    with _pool().writer() as conn:
+        api_key, key_id = _create_api_key(conn, user_id, name)
 
-    # Get the key details
-    cur = conn.execute(
-        "SELECT created_at, expires_at FROM api_keys WHERE id = ?",
-        (key_id,),
-    )
-    row = cur.fetchone()
-    conn.close()
+        # Get the key details
+        row = conn.execute(
+            "SELECT created_at, expires_at FROM api_keys WHERE id = ?",
+            (key_id,),
+        ).fetchone()
 
     return {
         "api_key": api_key,  # Full key - shown only once
@@ -410,23 +484,31 @@ def create_named_api_key_for_user(user_id: int, name: str = "API Key") -> dict:
 
 def revoke_api_key_for_user(user_id: int, key_id: int) -> bool:
     """Revoke (delete) an API key for a user. Returns True if key was deleted."""
-    conn = _get_conn()
-    # Verify the key belongs to this user before deleting
-    cur = conn.execute(
-        "SELECT id FROM api_keys WHERE id = ? AND user_id = ?",
-        (key_id, user_id),
-    )
-    row = cur.fetchone()
-    if not row:
-        conn.close()
+    with _pool().writer() as conn:
+        # Only delete the key if it belongs to this user
+        deleted = conn.execute(
+            "DELETE FROM api_keys WHERE id = ? AND user_id = ?",
+            (key_id, user_id),
+        ).rowcount
+    if not deleted:
         return False
 
-    conn.execute("DELETE FROM api_keys WHERE id = ?", (key_id,))
-    conn.commit()
-    conn.close()
+    _forget_api_key(key_id)
     return True
 
 
+def _forget_api_key(key_id: int) -> None:
+    """Drop a revoked key from the lookup cache so it stops working immediately."""
+    with _auth_cache_lock:
+        stale = [
+            cache_key
+            for cache_key, (cached_id, _, _) in _api_key_cache.items()
+            if cache_key[0] == DB_PATH and cached_id == key_id
+        ]
+        for cache_key in stale:
+            del _api_key_cache[cache_key]
+
+
 def get_or_create_cognito_user(cognito_sub: str, username: str, email: str = "") -> dict:
     """
     Get or create a user from Cognito authentication.
@@ -442,43 +524,81 @@ def get_or_create_cognito_user(cognito_sub: str, username: str, email: str = "")
     Returns:
         dict with user_id, username, and db_path
     """
-    from vector_store.vector_index import get_user_db_path
+    # Cognito already verified the token; skip the DB unless the email changed
+    cache_key = (DB_PATH, cognito_sub)
+    with _auth_cache_lock:
+        cached = _cognito_user_cache.get(cache_key)
+    if cached is not None:
+        cached_email, user = cached
+        if not email or email == cached_email:
+            return dict(user)
+
+    user = _get_or_create_cognito_user(cognito_sub, username, email)
+    with _auth_cache_lock:
+        _cognito_user_cache[cache_key] = (email, user)
+    return dict(user)
+
+
+def _unused_username(conn: sqlite3.Connection, base_username: str) -> str:
+    """Return ``base_username``, or ``base_username_N`` past the highest suffix in use."""
+    taken = conn.execute(
+        "SELECT 1 FROM users WHERE username = ?", (base_username,)
+    ).fetchone()
+    if not taken:
+        return base_username
+    # '`' sorts right after '_', so the range covers exactly "<base>_..." and
+    # is answered from the UNIQUE(username) index
+    start = len(base_username) + 2
+    next_suffix = conn.execute(
+        """
+        SELECT COALESCE(MAX(CAST(substr(username, ?) AS INTEGER)), 0) + 1
+        FROM users
+        WHERE username > ? AND username < ?
+          AND substr(username, ?) NOT GLOB '*[^0-9]*'
+        """,
+        (start, f"{base_username}_", f"{base_username}`", start),
+    ).fetchone()[0]
+    return f"{base_username}_{next_suffix}"
 
-    conn = _get_conn()
 
+def _get_or_create_cognito_user(cognito_sub: str, username: str, email: str) -> dict:
+    """Database half of :func:`get_or_create_cognito_user`."""
     # First, try to find existing user by cognito_sub
-    cur = conn.execute(
-        "SELECT id, username, email FROM users WHERE cognito_sub = ?",
-        (cognito_sub,),
-    )
-    row = cur.fetchone()
+    with _pool().reader() as conn:
+        row = conn.execute(
+            "SELECT id, username, email FROM users WHERE cognito_sub = ?",
+            (cognito_sub,),
+        ).fetchone()
 
     if row:
         user_id, db_username, stored_email = row
         # Update email if it has changed (Cognito is source of truth)
         if email and email != stored_email:
-            conn.execute(
-                "UPDATE users SET email = ? WHERE id = ?",
-                (email, user_id),
-            )
-            conn.commit()
-        conn.close()
-        user_path = Path(get_user_db_path(db_username))
-        user_path.mkdir(parents=True, exist_ok=True)
-        return {"id": user_id, "username": db_username, "db_path": str(user_path)}
+            with _pool().writer() as conn:
+                conn.execute(
+                    "UPDATE users SET email = ? WHERE id = ?",
+                    (email, user_id),
+                )
+        return {"id": user_id, "username": db_username, "db_path": _ensure_user_dir(db_username)}
 
     # User doesn't exist, create them
     # Generate a random password hash since Cognito handles authentication
     random_password = secrets.token_hex(32)
     password_hash = _hash_password(random_password)
 
-    # Ensure username is unique by appending cognito_sub suffix if needed
-    base_username = username
-    unique_username = base_username
-    suffix = 1
-
-    while True:
-        try:
+    # BEGIN IMMEDIATE holds the write lock from here on, so neither the user
+    # nor the chosen username can be taken between these queries and the INSERT
+    with _pool().writer() as conn:
+        # A concurrent first sign-in for the same account may have won the race
+        row = conn.execute(
+            "SELECT id, username FROM users WHERE cognito_sub = ?",
+            (cognito_sub,),
+        ).fetchone()
+        if row:
+            user_id, unique_username = row
+        else:
+            # Ensure username is unique by appending a numeric suffix if needed
+            unique_username = _unused_username(conn, username)
             cursor = conn.execute(
                 """
                 INSERT INTO users (username, password_hash, cognito_sub, email)
@@ -487,27 +607,6 @@ def get_or_create_cognito_user(cognito_sub: str, username: str, email: str = "")
                 (unique_username, password_hash, cognito_sub, email),
             )
             user_id = cursor.lastrowid
-            conn.commit()
-            break
-        except sqlite3.IntegrityError as e:
-            if "username" in str(e).lower():
-                # Username exists, try with suffix
-                unique_username = f"{base_username}_{suffix}"
-                suffix += 1
-                if suffix > 100:  # Safety limit
-                    conn.close()
-                    raise HTTPException(
-                        status_code=500,
-                        detail="Could not create unique username for Cognito user"
-                    )
-            else:
-                conn.close()
-                raise
-
-    conn.close()
 
     # Create vector DB directory for the user
-    user_path = Path(get_user_db_path(unique_username))
-    user_path.mkdir(parents=True, exist_ok=True)
-
-    return {"id": user_id, "username": unique_username, "db_path": str(user_path)}
+    return {"id": user_id, "username": unique_username, "db_path": _ensure_user_dir(unique_username)}
@@ -5,7 +5,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from api.admin_auth import get_admin_user
-from api.corpus_db import _current_timestamp, _get_conn
+from api.corpus_db import _current_timestamp, _get_pool
 from api.models.corpus_responses import CorpusMetadata
 from api.rate_limiting import limiter
 from api.usage_tracking import get_corpus_usage_stats, get_user_usage_stats
@@ -37,49 +37,48 @@ async def list_pending_corpuses(
     Raises:
         HTTPException: 403 if user is not admin
     """
-    conn = _get_conn()
-
     try:
-        cur = conn.execute(
-            """
-            SELECT
-                c.id, c.name, c.display_name, c.description, c.category,
-                c.version, c.is_public, c.is_approved, c.created_at, c.updated_at,
-                u.username
-            FROM corpuses c
-            JOIN users u ON c.owner_id = u.id
-            WHERE c.is_public = 1 AND c.is_approved = 0
-            ORDER BY c.created_at ASC
-            """
-        )
+        with _get_pool().reader() as conn:
+            cur = conn.execute(
+                """
+                SELECT
+                    c.id, c.name, c.display_name, c.description, c.category,
+                    c.version, c.is_public, c.is_approved, c.created_at, c.updated_at,
+                    u.username
+                FROM corpuses c
+                JOIN users u ON c.owner_id = u.id
+                WHERE c.is_public = 1 AND c.is_approved = 0
+                ORDER BY c.created_at ASC
+                """
+            )
 
-        pending_corpuses = []
-        for row in cur.fetchall():
-            # Get chunk and file count (not stored in corpuses table)
-            # For now, default to 0 - could query ChromaDB if needed
-            pending_corpuses.append(
-                CorpusMetadata(
-                    id=row[0],
-                    name=row[1],
-                    display_name=row[2],
-                    description=row[3],
-                    category=row[4],
-                    version=row[5],
-                    is_public=bool(row[6]),
-                    is_approved=bool(row[7]),
-                    created_at=row[8],
-                    updated_at=row[9],
-                    owner_username=row[10],
-                    chunk_count=0,  # Could fetch from ChromaDB if needed
-                    file_count=0,   # Could fetch from ChromaDB if needed
+            pending_corpuses = []
+            for row in cur.fetchall():
+                # Get chunk and file count (not stored in corpuses table)
+                # For now, default to 0 - could query ChromaDB if needed
+                pending_corpuses.append(
+                    CorpusMetadata(
+                        id=row[0],
+                        name=row[1],
+                        display_name=row[2],
+                        description=row[3],
+                        category=row[4],
+                        version=row[5],
+                        is_public=bool(row[6]),
+                        is_approved=bool(row[7]),
+                        created_at=row[8],
+                        updated_at=row[9],
+                        owner_username=row[10],
+                        chunk_count=0,  # Could fetch from ChromaDB if needed
+                        file_count=0,   # Could fetch from ChromaDB if needed
+                    )
                 )
-            )
 
-        logger.info(
-            f"Admin {admin_user['username']} listed {len(pending_corpuses)} pending corpuses"
-        )
+            logger.info(
+                f"Admin {admin_user['username']} listed {len(pending_corpuses)} pending corpuses"
+            )
 
-        return pending_corpuses
+            return pending_corpuses
 
     except Exception as e:
         logger.error(f"Error listing pending corpuses: {e}")
@@ -87,8 +86,6 @@ async def list_pending_corpuses(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error listing pending corpuses: {str(e)}",
         )
-    finally:
-        conn.close()
 
 
 @router.post("/corpuses/{corpus_id}/approve")
@@ -114,62 +111,54 @@ async def approve_corpus(
         HTTPException: 403 if user is not admin
         HTTPException: 404 if corpus not found
     """
-    conn = _get_conn()
-
     try:
-        # Check if corpus exists
-        cur = conn.execute(
-            "SELECT name, is_approved FROM corpuses WHERE id = ?",
-            (corpus_id,)
-        )
-        row = cur.fetchone()
+        with _get_pool().writer() as conn:
+            # Check if corpus exists
+            cur = conn.execute(
+                "SELECT name, is_approved FROM corpuses WHERE id = ?",
+                (corpus_id,)
+            )
+            row = cur.fetchone()
+
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Corpus {corpus_id} not found"
+                )
+
+            corpus_name, is_approved = row
 
-        if not row:
-            conn.close()
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Corpus {corpus_id} not found"
+            if is_approved:
+                return {
+                    "message": f"Corpus '{corpus_name}' (ID: {corpus_id}) is already approved",
+                    "corpus_id": corpus_id,
+                    "corpus_name": corpus_name,
+                }
+
+            # Approve the corpus
+            conn.execute(
+                "UPDATE corpuses SET is_approved = 1, updated_at = ? WHERE id = ?",
+                (_current_timestamp(), corpus_id)
             )
 
-        corpus_name, is_approved = row
+            logger.info(
+                f"Admin {admin_user['username']} approved corpus {corpus_id} ('{corpus_name}')"
+            )
 
-        if is_approved:
-            conn.close()
             return {
-                "message": f"Corpus '{corpus_name}' (ID: {corpus_id}) is already approved",
+                "message": f"Corpus '{corpus_name}' (ID: {corpus_id}) approved successfully",
                 "corpus_id": corpus_id,
                 "corpus_name": corpus_name,
             }
 
-        # Approve the corpus
-        conn.execute(
-            "UPDATE corpuses SET is_approved = 1, updated_at = ? WHERE id = ?",
-            (_current_timestamp(), corpus_id)
-        )
-        conn.commit()
-
-        logger.info(
-            f"Admin {admin_user['username']} approved corpus {corpus_id} ('{corpus_name}')"
-        )
-
-        return {
-            "message": f"Corpus '{corpus_name}' (ID: {corpus_id}) approved successfully",
-            "corpus_id": corpus_id,
-            "corpus_name": corpus_name,
-        }
-
     except HTTPException:
-        conn.close()
         raise
     except Exception as e:
-        conn.close()
         logger.error(f"Error approving corpus {corpus_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error approving corpus: {str(e)}",
         )
-    finally:
-        conn.close()
 
 
 @router.post("/corpuses/{corpus_id}/reject")
@@ -194,62 +183,54 @@ async def reject_corpus(
         HTTPException: 403 if user is not admin
         HTTPException: 404 if corpus not found
     """
-    conn = _get_conn()
-
     try:
-        # Check if corpus exists
-        cur = conn.execute(
-            "SELECT name, is_approved FROM corpuses WHERE id = ?",
-            (corpus_id,)
-        )
-        row = cur.fetchone()
+        with _get_pool().writer() as conn:
+            # Check if corpus exists
+            cur = conn.execute(
+                "SELECT name, is_approved FROM corpuses WHERE id = ?",
+                (corpus_id,)
+            )
+            row = cur.fetchone()
+
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Corpus {corpus_id} not found"
+                )
+
+            corpus_name, is_approved = row
 
-        if not row:
-            conn.close()
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Corpus {corpus_id} not found"
+            if not is_approved:
+                return {
+                    "message": f"Corpus '{corpus_name}' (ID: {corpus_id}) is already unapproved",
+                    "corpus_id": corpus_id,
+                    "corpus_name": corpus_name,
+                }
+
+            # Reject the corpus
+            conn.execute(
+                "UPDATE corpuses SET is_approved = 0, updated_at = ? WHERE id = ?",
+                (_current_timestamp(), corpus_id)
             )
 
-        corpus_name, is_approved = row
+            logger.info(
+                f"Admin {admin_user['username']} rejected corpus {corpus_id} ('{corpus_name}')"
+            )
 
-        if not is_approved:
-            conn.close()
             return {
-                "message": f"Corpus '{corpus_name}' (ID: {corpus_id}) is already unapproved",
+                "message": f"Corpus '{corpus_name}' (ID: {corpus_id}) rejected successfully",
                 "corpus_id": corpus_id,
                 "corpus_name": corpus_name,
             }
 
-        # Reject the corpus
-        conn.execute(
-            "UPDATE corpuses SET is_approved = 0, updated_at = ? WHERE id = ?",
-            (_current_timestamp(), corpus_id)
-        )
-        conn.commit()
-
-        logger.info(
-            f"Admin {admin_user['username']} rejected corpus {corpus_id} ('{corpus_name}')"
-        )
-
-        return {
-            "message": f"Corpus '{corpus_name}' (ID: {corpus_id}) rejected successfully",
-            "corpus_id": corpus_id,
-            "corpus_name": corpus_name,
-        }
-
     except HTTPException:
-        conn.close()
         raise
     except Exception as e:
-        conn.close()
         logger.error(f"Error rejecting corpus {corpus_id}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error rejecting corpus: {str(e)}",
         )
-    finally:
-        conn.close()
 
 
 @router.get("/usage/corpus/{corpus_id}")
@@ -280,22 +261,19 @@ async def get_corpus_usage(
         HTTPException: 403 if user is not admin
         HTTPException: 404 if corpus not found
     """
-    conn = _get_conn()
-
     try:
-        # Verify corpus exists
-        cur = conn.execute("SELECT name FROM corpuses WHERE id = ?", (corpus_id,))
-        row = cur.fetchone()
-
-        if not row:
-            conn.close()
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Corpus {corpus_id} not found"
-            )
+        with _get_pool().reader() as conn:
+            # Verify corpus exists
+            cur = conn.execute("SELECT name FROM corpuses WHERE id = ?", (corpus_id,))
+            row = cur.fetchone()
+
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Corpus {corpus_id} not found"
+                )
 
-        corpus_name = row[0]
-        conn.close()
+            corpus_name = row[0]
 
         # Get usage stats from usage_tracking module
         stats = get_corpus_usage_stats(corpus_id)
@@ -347,22 +325,19 @@ async def get_user_usage(
         HTTPException: 403 if user is not admin
         HTTPException: 404 if user not found
     """
-    conn = _get_conn()
-
     try:
-        # Verify user exists
-        cur = conn.execute("SELECT username FROM users WHERE id = ?", (user_id,))
-        row = cur.fetchone()
-
-        if not row:
-            conn.close()
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User {user_id} not found"
-            )
+        with _get_pool().reader() as conn:
+            # Verify user exists
+            cur = conn.execute("SELECT username FROM users WHERE id = ?", (user_id,))
+            row = cur.fetchone()
+
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"User {user_id} not found"
+                )
 
-        username = row[0]
-        conn.close()
+            username = row[0]
 
         # Get usage stats from usage_tracking module
         stats = get_user_usage_stats(user_id)
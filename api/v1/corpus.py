@@ -1,5 +1,6 @@
 """Corpus management endpoints for API v1."""
 
+import asyncio
 import sqlite3
 from pathlib import Path
 from typing import List
@@ -8,7 +9,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from api.auth import get_current_user
 from api.corpus_auth import check_corpus_permission, get_user_corpus_permission
-from api.corpus_db import _current_timestamp, _get_conn
+from api.corpus_db import _current_timestamp, _get_pool
 from api.models.corpus_requests import (
     CorpusQueryRequest,
     CreateCorpusRequest,
@@ -29,6 +30,7 @@ from api.models.corpus_responses import (
     SubscriptionResponse,
 )
 from api.models.responses import QueryResponse
+from api.openai_client import embeddings_with_retry
 from api.usage_tracking import log_corpus_usage
 from api.rate_limiting import limiter
 from api.validation import validate_collection_name, validate_username
@@ -38,7 +40,7 @@ from vector_store.vector_index import (
     compile_context,
     get_corpus_db_path,
     get_or_create_collection,
-    query_index,
+    query_index_vec,
 )
 
 logger = get_logger(__name__)
@@ -61,84 +63,78 @@ async def create_corpus(
     # Validate corpus name using same validation as collection names
     corpus_name = validate_collection_name(corpus_request.name)
 
-    conn = _get_conn()
     timestamp = _current_timestamp()
 
     try:
-        # Insert corpus
-        cur = conn.execute(
-            """
-            INSERT INTO corpuses (
-                name, display_name, description, category,
-                version, is_public, is_approved, owner_id,
-                created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                corpus_name,
-                corpus_request.display_name,
-                corpus_request.description,
-                corpus_request.category,
-                1,  # Initial version
-                corpus_request.is_public,
-                False,  # Requires admin approval
-                current_user["id"],
-                timestamp,
-                timestamp,
-            ),
-        )
-        corpus_id = cur.lastrowid
-
-        # Grant owner permission
-        conn.execute(
-            """
-            INSERT INTO corpus_permissions (
-                corpus_id, user_id, permission_type, granted_by, granted_at
-            ) VALUES (?, ?, ?, ?, ?)
-            """,
-            (corpus_id, current_user["id"], "owner", current_user["id"], timestamp),
-        )
-
-        # Create initial version record
-        conn.execute(
-            """
-            INSERT INTO corpus_versions (
-                corpus_id, version, description, created_by, created_at
-            ) VALUES (?, ?, ?, ?, ?)
-            """,
-            (corpus_id, 1, "Initial version", current_user["id"], timestamp),
-        )
-
-        conn.commit()
-
-        # Create corpus directory
-        corpus_path = get_corpus_db_path(corpus_id)
-        Path(corpus_path).mkdir(parents=True, exist_ok=True)
-
-        logger.info(
-            f"Created corpus {corpus_id} ({corpus_name}) by user {current_user['username']}"
-        )
-
-        approval_msg = (
-            "Awaiting admin approval."
-            if corpus_request.is_public
-            else "Corpus created successfully."
-        )
+        with _get_pool().writer() as conn:
+            # Insert corpus
+            cur = conn.execute(
+                """
+                INSERT INTO corpuses (
+                    name, display_name, description, category,
+                    version, is_public, is_approved, owner_id,
+                    created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    corpus_name,
+                    corpus_request.display_name,
+                    corpus_request.description,
+                    corpus_request.category,
+                    1,  # Initial version
+                    corpus_request.is_public,
+                    False,  # Requires admin approval
+                    current_user["id"],
+                    timestamp,
+                    timestamp,
+                ),
+            )
+            corpus_id = cur.lastrowid
 
-        return CreateCorpusResponse(
-            message=f"Corpus '{corpus_request.display_name}' created successfully. {approval_msg}",
-            corpus_id=corpus_id,
-            corpus_name=corpus_name,
-        )
+            # Grant owner permission
+            conn.execute(
+                """
+                INSERT INTO corpus_permissions (
+                    corpus_id, user_id, permission_type, granted_by, granted_at
+                ) VALUES (?, ?, ?, ?, ?)
+                """,
+                (corpus_id, current_user["id"], "owner", current_user["id"], timestamp),
+            )
 
+            # Create initial version record
+            conn.execute(
+                """
+                INSERT INTO corpus_versions (
+                    corpus_id, version, description, created_by, created_at
+                ) VALUES (?, ?, ?, ?, ?)
+                """,
+                (corpus_id, 1, "Initial version", current_user["id"], timestamp),
+            )
     except sqlite3.IntegrityError:
-        conn.close()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail=f"Corpus name '{corpus_name}' already exists",
         )
-    finally:
-        conn.close()
+
+    # Create corpus directory
+    corpus_path = get_corpus_db_path(corpus_id)
+    Path(corpus_path).mkdir(parents=True, exist_ok=True)
+
+    logger.info(
+        f"Created corpus {corpus_id} ({corpus_name}) by user {current_user['username']}"
+    )
+
+    approval_msg = (
+        "Awaiting admin approval."
+        if corpus_request.is_public
+        else "Corpus created successfully."
+    )
+
+    return CreateCorpusResponse(
+        message=f"Corpus '{corpus_request.display_name}' created successfully. {approval_msg}",
+        corpus_id=corpus_id,
+        corpus_name=corpus_name,
+    )
 
 
 @router.get("/", response_model=ListCorpusesResponse)
@@ -154,47 +150,44 @@ async def list_corpuses(
     - Corpuses owned by user
     - Corpuses with explicit permissions
     """
-    conn = _get_conn()
-
-    # Get all corpuses where user has access
-    cur = conn.execute(
-        """
-        SELECT DISTINCT c.id, c.name, c.display_name, c.description, c.category,
-               c.version, c.is_public, c.is_approved, c.owner_id,
-               c.created_at, c.updated_at, u.username as owner_username,
-               u.email as owner_email
-        FROM corpuses c
-        JOIN users u ON c.owner_id = u.id
-        LEFT JOIN corpus_permissions cp ON c.id = cp.corpus_id
-        WHERE
-            c.owner_id = ?  -- User owns it
-            OR (c.is_public = 1 AND c.is_approved = 1)  -- Public and approved
-            OR cp.user_id = ?  -- Explicit permission
-        ORDER BY c.updated_at DESC
-        """,
-        (current_user["id"], current_user["id"]),
-    )
-
-    corpuses = []
-    for row in cur.fetchall():
-        corpuses.append(
-            CorpusMetadata(
-                id=row[0],
-                name=row[1],
-                display_name=row[2],
-                description=row[3],
-                category=row[4],
-                version=row[5],
-                is_public=bool(row[6]),
-                is_approved=bool(row[7]),
-                owner_username=row[11],
-                owner_email=row[12],
-                created_at=row[9],
-                updated_at=row[10],
-            )
+    with _get_pool().reader() as conn:
+        # Get all corpuses where user has access
+        cur = conn.execute(
+            """
+            SELECT DISTINCT c.id, c.name, c.display_name, c.description, c.category,
+                   c.version, c.is_public, c.is_approved, c.owner_id,
+                   c.created_at, c.updated_at, u.username as owner_username,
+                   u.email as owner_email
+            FROM corpuses c
+            JOIN users u ON c.owner_id = u.id
+            LEFT JOIN corpus_permissions cp ON c.id = cp.corpus_id
+            WHERE
+                c.owner_id = ?  -- User owns it
+                OR (c.is_public = 1 AND c.is_approved = 1)  -- Public and approved
+                OR cp.user_id = ?  -- Explicit permission
+            ORDER BY c.updated_at DESC
+            """,
+            (current_user["id"], current_user["id"]),
         )
 
-    conn.close()
+        corpuses = []
+        for row in cur.fetchall():
+            corpuses.append(
+                CorpusMetadata(
+                    id=row[0],
+                    name=row[1],
+                    display_name=row[2],
+                    description=row[3],
+                    category=row[4],
+                    version=row[5],
+                    is_public=bool(row[6]),
+                    is_approved=bool(row[7]),
+                    owner_username=row[11],
+                    owner_email=row[12],
+                    created_at=row[9],
+                    updated_at=row[10],
+                )
+            )
 
     logger.info(f"Listed {len(corpuses)} corpuses for user {current_user['username']}")
 
@@ -212,86 +205,83 @@ async def get_corpus(
     # Check read permission
     check_corpus_permission(corpus_id, current_user["id"], "read")
 
-    conn = _get_conn()
-
-    # Get corpus metadata
-    cur = conn.execute(
-        """
-        SELECT c.id, c.name, c.display_name, c.description, c.category,
-               c.version, c.is_public, c.is_approved, c.owner_id,
-               c.created_at, c.updated_at, u.username as owner_username,
-               u.email as owner_email
-        FROM corpuses c
-        JOIN users u ON c.owner_id = u.id
-        WHERE c.id = ?
-        """,
-        (corpus_id,),
-    )
-    row = cur.fetchone()
-
-    if not row:
-        conn.close()
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Corpus {corpus_id} not found",
+    with _get_pool().reader() as conn:
+        # Get corpus metadata
+        cur = conn.execute(
+            """
+            SELECT c.id, c.name, c.display_name, c.description, c.category,
+                   c.version, c.is_public, c.is_approved, c.owner_id,
+                   c.created_at, c.updated_at, u.username as owner_username,
+                   u.email as owner_email
+            FROM corpuses c
+            JOIN users u ON c.owner_id = u.id
+            WHERE c.id = ?
+            """,
+            (corpus_id,),
         )
+        row = cur.fetchone()
 
-    corpus = CorpusMetadata(
-        id=row[0],
-        name=row[1],
-        display_name=row[2],
-        description=row[3],
-        category=row[4],
-        version=row[5],
-        is_public=bool(row[6]),
-        is_approved=bool(row[7]),
-        owner_username=row[11],
-        owner_email=row[12],
-        created_at=row[9],
-        updated_at=row[10],
-    )
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Corpus {corpus_id} not found",
+            )
 
-    # Get permissions
-    cur = conn.execute(
-        """
-        SELECT u.username, cp.permission_type, cp.granted_at
-        FROM corpus_permissions cp
-        JOIN users u ON cp.user_id = u.id
-        WHERE cp.corpus_id = ?
-        ORDER BY cp.granted_at DESC
-        """,
-        (corpus_id,),
-    )
-    permissions = [
-        CorpusPermission(username=row[0], permission_type=row[1], granted_at=row[2])
-        for row in cur.fetchall()
-    ]
-
-    # Get versions
-    cur = conn.execute(
-        """
-        SELECT cv.version, cv.description, u.username, cv.created_at,
-               cv.chunk_count, cv.file_count
-        FROM corpus_versions cv
-        JOIN users u ON cv.created_by = u.id
-        WHERE cv.corpus_id = ?
-        ORDER BY cv.version DESC
-        """,
-        (corpus_id,),
-    )
-    versions = [
-        CorpusVersionInfo(
-            version=row[0],
-            description=row[1],
-            created_by=row[2],
-            created_at=row[3],
-            chunk_count=row[4],
-            file_count=row[5],
+        corpus = CorpusMetadata(
+            id=row[0],
+            name=row[1],
+            display_name=row[2],
+            description=row[3],
+            category=row[4],
+            version=row[5],
+            is_public=bool(row[6]),
+            is_approved=bool(row[7]),
+            owner_username=row[11],
+            owner_email=row[12],
+            created_at=row[9],
+            updated_at=row[10],
+        )
+
+        # Get permissions
+        cur = conn.execute(
+            """
+            SELECT u.username, cp.permission_type, cp.granted_at
+            FROM corpus_permissions cp
+            JOIN users u ON cp.user_id = u.id
+            WHERE cp.corpus_id = ?
+            ORDER BY cp.granted_at DESC
+            """,
+            (corpus_id,),
         )
-        for row in cur.fetchall()
-    ]
+        permissions = [
+            CorpusPermission(username=row[0], permission_type=row[1], granted_at=row[2])
+            for row in cur.fetchall()
+        ]
+
+        # Get versions
+        cur = conn.execute(
+            """
+            SELECT cv.version, cv.description, u.username, cv.created_at,
+                   cv.chunk_count, cv.file_count
+            FROM corpus_versions cv
+            JOIN users u ON cv.created_by = u.id
+            WHERE cv.corpus_id = ?
+            ORDER BY cv.version DESC
+            """,
+            (corpus_id,),
+        )
+        versions = [
+            CorpusVersionInfo(
+                version=row[0],
+                description=row[1],
+                created_by=row[2],
+                created_at=row[3],
+                chunk_count=row[4],
+                file_count=row[5],
+            )
+            for row in cur.fetchall()
+        ]
 
-    conn.close()
 
     # Get user's permission level
     user_perm = get_user_corpus_permission(corpus_id, current_user["id"])
@@ -321,55 +311,52 @@ async def update_corpus(
     # Check admin permission
     check_corpus_permission(corpus_id, current_user["id"], "admin")
 
-    conn = _get_conn()
+    with _get_pool().writer() as conn:
+        # Build update query dynamically
+        updates = []
+        params = []
 
-    # Build update query dynamically
-    updates = []
-    params = []
+        if update_request.display_name is not None:
+            updates.append("display_name = ?")
+            params.append(update_request.display_name)
 
-    if update_request.display_name is not None:
-        updates.append("display_name = ?")
-        params.append(update_request.display_name)
+        if update_request.description is not None:
+            updates.append("description = ?")
+            params.append(update_request.description)
 
-    if update_request.description is not None:
-        updates.append("description = ?")
-        params.append(update_request.description)
+        if update_request.category is not None:
+            updates.append("category = ?")
+            params.append(update_request.category)
 
-    if update_request.category is not None:
-        updates.append("category = ?")
-        params.append(update_request.category)
+        if update_request.is_public is not None:
+            updates.append("is_public = ?")
+            params.append(update_request.is_public)
 
-    if update_request.is_public is not None:
-        updates.append("is_public = ?")
-        params.append(update_request.is_public)
+        updates.append("updated_at = ?")
+        params.append(_current_timestamp())
 
-    updates.append("updated_at = ?")
-    params.append(_current_timestamp())
+        params.append(corpus_id)
 
-    params.append(corpus_id)
+        if updates:
+            conn.execute(
+                f"UPDATE corpuses SET {', '.join(updates)} WHERE id = ?",
+                params,
+            )
 
-    if updates:
-        conn.execute(
-            f"UPDATE corpuses SET {', '.join(updates)} WHERE id = ?",
-            params,
+        # Return updated corpus
+        cur = conn.execute(
+            """
+            SELECT c.id, c.name, c.display_name, c.description, c.category,
+                   c.version, c.is_public, c.is_approved, c.owner_id,
+                   c.created_at, c.updated_at, u.username as owner_username,
+                   u.email as owner_email
+            FROM corpuses c
+            JOIN users u ON c.owner_id = u.id
+            WHERE c.id = ?
+            """,
+            (corpus_id,),
         )
-        conn.commit()
-
-    # Return updated corpus
-    cur = conn.execute(
-        """
-        SELECT c.id, c.name, c.display_name, c.description, c.category,
-               c.version, c.is_public, c.is_approved, c.owner_id,
-               c.created_at, c.updated_at, u.username as owner_username,
-               u.email as owner_email
-        FROM corpuses c
-        JOIN users u ON c.owner_id = u.id
-        WHERE c.id = ?
-        """,
-        (corpus_id,),
-    )
-    row = cur.fetchone()
-    conn.close()
+        row = cur.fetchone()
 
     logger.info(f"Updated corpus {corpus_id} by user {current_user['username']}")
 
@@ -403,12 +390,9 @@ async def delete_corpus(
     # Check owner permission
     check_corpus_permission(corpus_id, current_user["id"], "owner")
 
-    conn = _get_conn()
-
-    # Delete corpus (cascades to permissions, subscriptions, etc.)
-    conn.execute("DELETE FROM corpuses WHERE id = ?", (corpus_id,))
-    conn.commit()
-    conn.close()
+    with _get_pool().writer() as conn:
+        # Delete corpus (cascades to permissions, subscriptions, etc.)
+        conn.execute("DELETE FROM corpuses WHERE id = ?", (corpus_id,))
 
     logger.info(f"Deleted corpus {corpus_id} by user {current_user['username']}")
 
@@ -437,23 +421,20 @@ async def grant_permission(
     # Validate username
     username = validate_username(permission_request.username)
 
-    conn = _get_conn()
-
-    # Get target user ID
-    cur = conn.execute("SELECT id FROM users WHERE username = ?", (username,))
-    user_row = cur.fetchone()
+    with _get_pool().writer() as conn:
+        # Get target user ID
+        cur = conn.execute("SELECT id FROM users WHERE username = ?", (username,))
+        user_row = cur.fetchone()
 
-    if not user_row:
-        conn.close()
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User '{username}' not found",
-        )
+        if not user_row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User '{username}' not found",
+            )
 
-    target_user_id = user_row[0]
+        target_user_id = user_row[0]
 
-    # Insert or update permission
-    try:
+        # Insert or update permission
         conn.execute(
             """
             INSERT INTO corpus_permissions (
@@ -472,9 +453,6 @@ async def grant_permission(
                 _current_timestamp(),
             ),
         )
-        conn.commit()
-    finally:
-        conn.close()
 
     logger.info(
         f"Granted {permission_request.permission_type} permission on corpus {corpus_id} "
@@ -506,40 +484,35 @@ async def revoke_permission(
     # Validate username
     username = validate_username(username)
 
-    conn = _get_conn()
+    with _get_pool().writer() as conn:
+        # Get target user ID
+        cur = conn.execute("SELECT id FROM users WHERE username = ?", (username,))
+        user_row = cur.fetchone()
 
-    # Get target user ID
-    cur = conn.execute("SELECT id FROM users WHERE username = ?", (username,))
-    user_row = cur.fetchone()
+        if not user_row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User '{username}' not found",
+            )
 
-    if not user_row:
-        conn.close()
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User '{username}' not found",
-        )
+        target_user_id = user_row[0]
 
-    target_user_id = user_row[0]
+        # Cannot revoke owner permission
+        cur = conn.execute("SELECT owner_id FROM corpuses WHERE id = ?", (corpus_id,))
+        owner_row = cur.fetchone()
 
-    # Cannot revoke owner permission
-    cur = conn.execute("SELECT owner_id FROM corpuses WHERE id = ?", (corpus_id,))
-    owner_row = cur.fetchone()
+        if owner_row and owner_row[0] == target_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot revoke owner permission",
+            )
 
-    if owner_row and owner_row[0] == target_user_id:
-        conn.close()
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot revoke owner permission",
+        # Delete permission
+        conn.execute(
+            "DELETE FROM corpus_permissions WHERE corpus_id = ? AND user_id = ?",
+            (corpus_id, target_user_id),
         )
 
-    # Delete permission
-    conn.execute(
-        "DELETE FROM corpus_permissions WHERE corpus_id = ? AND user_id = ?",
-        (corpus_id, target_user_id),
-    )
-    conn.commit()
-    conn.close()
-
     logger.info(
         f"Revoked permission on corpus {corpus_id} from user {username} "
         f"by {current_user['username']}"
@@ -561,36 +534,32 @@ async def subscribe_to_corpus(
     Creates a subscription record and grants read permission.
     Corpus must be approved by admin to subscribe.
     """
-    conn = _get_conn()
-
-    # Check corpus exists and is approved
-    cur = conn.execute(
-        "SELECT id, is_approved, name FROM corpuses WHERE id = ?",
-        (corpus_id,),
-    )
-    corpus_row = cur.fetchone()
-
-    if not corpus_row:
-        conn.close()
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Corpus {corpus_id} not found",
+    with _get_pool().writer() as conn:
+        # Check corpus exists and is approved
+        cur = conn.execute(
+            "SELECT id, is_approved, name FROM corpuses WHERE id = ?",
+            (corpus_id,),
         )
+        corpus_row = cur.fetchone()
 
-    if not corpus_row[1]:
-        conn.close()
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Cannot subscribe to unapproved corpus. Please wait for admin approval.",
-        )
+        if not corpus_row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Corpus {corpus_id} not found",
+            )
 
-    timestamp = _current_timestamp()
-    expires_at = None
+        if not corpus_row[1]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Cannot subscribe to unapproved corpus. Please wait for admin approval.",
+            )
 
-    if subscription_request.duration_days:
-        expires_at = timestamp + (subscription_request.duration_days * 24 * 60 * 60)
+        timestamp = _current_timestamp()
+        expires_at = None
+
+        if subscription_request.duration_days:
+            expires_at = timestamp + (subscription_request.duration_days * 24 * 60 * 60)
 
-    try:
         # Create or update subscription
         conn.execute(
             """
@@ -627,29 +596,24 @@ async def subscribe_to_corpus(
         except sqlite3.IntegrityError:
             pass  # Permission already exists
 
-        conn.commit()
-
-        logger.info(
-            f"User {current_user['username']} subscribed to corpus {corpus_id} "
-            f"(tier: {subscription_request.tier})"
-        )
-
-        subscription = SubscriptionInfo(
-            user_id=current_user["id"],
-            corpus_id=corpus_id,
-            status="active",
-            tier=subscription_request.tier,
-            started_at=timestamp,
-            expires_at=expires_at,
-        )
+    logger.info(
+        f"User {current_user['username']} subscribed to corpus {corpus_id} "
+        f"(tier: {subscription_request.tier})"
+    )
 
-        return SubscriptionResponse(
-            message=f"Successfully subscribed to corpus '{corpus_row[2]}'",
-            subscription=subscription,
-        )
+    subscription = SubscriptionInfo(
+        user_id=current_user["id"],
+        corpus_id=corpus_id,
+        status="active",
+        tier=subscription_request.tier,
+        started_at=timestamp,
+        expires_at=expires_at,
+    )
 
-    finally:
-        conn.close()
+    return SubscriptionResponse(
+        message=f"Successfully subscribed to corpus '{corpus_row[2]}'",
+        subscription=subscription,
+    )
 
 
 @router.delete("/{corpus_id}/subscribe")
@@ -664,36 +628,31 @@ async def unsubscribe_from_corpus(
     Updates subscription status to 'cancelled'.
     Note: Does not automatically revoke read permission - admin must do that separately.
     """
-    conn = _get_conn()
-
-    # Check subscription exists
-    cur = conn.execute(
-        """
-        SELECT id FROM subscriptions
-        WHERE user_id = ? AND corpus_id = ? AND status = 'active'
-        """,
-        (current_user["id"], corpus_id),
-    )
-
-    if not cur.fetchone():
-        conn.close()
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No active subscription found for corpus {corpus_id}",
+    with _get_pool().writer() as conn:
+        # Check subscription exists
+        cur = conn.execute(
+            """
+            SELECT id FROM subscriptions
+            WHERE user_id = ? AND corpus_id = ? AND status = 'active'
+            """,
+            (current_user["id"], corpus_id),
         )
 
-    # Update subscription status
-    conn.execute(
-        """
-        UPDATE subscriptions
-        SET status = 'cancelled'
-        WHERE user_id = ? AND corpus_id = ?
-        """,
-        (current_user["id"], corpus_id),
-    )
+        if not cur.fetchone():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No active subscription found for corpus {corpus_id}",
+            )
 
-    conn.commit()
-    conn.close()
+        # Update subscription status
+        conn.execute(
+            """
+            UPDATE subscriptions
+            SET status = 'cancelled'
+            WHERE user_id = ? AND corpus_id = ?
+            """,
+            (current_user["id"], corpus_id),
+        )
 
     logger.info(f"User {current_user['username']} unsubscribed from corpus {corpus_id}")
 
@@ -719,10 +678,9 @@ async def query_corpus(
     # Get corpus database path and name
     corpus_path = get_corpus_db_path(corpus_id)
 
-    conn = _get_conn()
-    cur = conn.execute("SELECT name FROM corpuses WHERE id = ?", (corpus_id,))
-    row = cur.fetchone()
-    conn.close()
+    with _get_pool().reader() as conn:
+        cur = conn.execute("SELECT name FROM corpuses WHERE id = ?", (corpus_id,))
+        row = cur.fetchone()
 
     if not row:
         raise HTTPException(
@@ -735,9 +693,13 @@ async def query_corpus(
     # Query the corpus using ChromaDB
     # Note: corpus_name is used as the collection name in ChromaDB
     try:
-        results = query_index(
+        # Embed through the shared async client (throttled and cached), then
+        # search in a thread
+        embedding = (await embeddings_with_retry([query_request.query]))[0]
+        results = await asyncio.to_thread(
+            query_index_vec,
             corpus_name,
-            query_request.query,
+            embedding,
             corpus_path,
             n_results=query_request.n_results,
         )
@@ -797,18 +759,16 @@ async def create_corpus_version(
     # Check admin permission (required to create versions)
     check_corpus_permission(corpus_id, current_user["id"], required_permission="admin")
 
-    conn = _get_conn()
-
     try:
         # Get current corpus metadata
-        cur = conn.execute(
-            "SELECT name, version FROM corpuses WHERE id = ?",
-            (corpus_id,)
-        )
-        row = cur.fetchone()
+        with _get_pool().reader() as conn:
+            cur = conn.execute(
+                "SELECT name, version FROM corpuses WHERE id = ?",
+                (corpus_id,)
+            )
+            row = cur.fetchone()
 
         if not row:
-            conn.close()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Corpus {corpus_id} not found"
@@ -836,32 +796,31 @@ async def create_corpus_version(
             logger.warning(f"Could not get collection stats for corpus {corpus_id}: {e}")
             # Continue with chunk_count=0, file_count=0
 
-        # Insert version record
-        conn.execute(
-            """
-            INSERT INTO corpus_versions (
-                corpus_id, version, description, created_by, created_at,
-                chunk_count, file_count
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                corpus_id,
-                new_version,
-                version_request.description,
-                current_user["id"],
-                _current_timestamp(),
-                chunk_count,
-                file_count,
-            ),
-        )
-
-        # Update corpus version number
-        conn.execute(
-            "UPDATE corpuses SET version = ?, updated_at = ? WHERE id = ?",
-            (new_version, _current_timestamp(), corpus_id),
-        )
+        # Insert the version record and bump the corpus version together
+        with _get_pool().writer() as conn:
+            conn.execute(
+                """
+                INSERT INTO corpus_versions (
+                    corpus_id, version, description, created_by, created_at,
+                    chunk_count, file_count
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    corpus_id,
+                    new_version,
+                    version_request.description,
+                    current_user["id"],
+                    _current_timestamp(),
+                    chunk_count,
+                    file_count,
+                ),
+            )
 
-        conn.commit()
+            # Update corpus version number
+            conn.execute(
+                "UPDATE corpuses SET version = ?, updated_at = ? WHERE id = ?",
+                (new_version, _current_timestamp(), corpus_id),
+            )
 
         logger.info(
             f"User {current_user['username']} created version {new_version} "
@@ -879,17 +838,13 @@ async def create_corpus_version(
         )
 
     except HTTPException:
-        conn.close()
         raise
     except Exception as e:
-        conn.close()
         logger.error(f"Error creating corpus version: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating version: {str(e)}",
         )
-    finally:
-        conn.close()
 
 
 @router.get("/{corpus_id}/versions", response_model=List[CorpusVersionInfo])
@@ -917,42 +872,41 @@ async def list_corpus_versions(
     # Check read permission
     check_corpus_permission(corpus_id, current_user["id"], required_permission="read")
 
-    conn = _get_conn()
-
     try:
-        cur = conn.execute(
-            """
-            SELECT
-                cv.corpus_id, cv.version, cv.description, cv.created_at,
-                cv.chunk_count, cv.file_count, u.username
-            FROM corpus_versions cv
-            JOIN users u ON cv.created_by = u.id
-            WHERE cv.corpus_id = ?
-            ORDER BY cv.version DESC
-            """,
-            (corpus_id,),
-        )
+        with _get_pool().reader() as conn:
+            cur = conn.execute(
+                """
+                SELECT
+                    cv.corpus_id, cv.version, cv.description, cv.created_at,
+                    cv.chunk_count, cv.file_count, u.username
+                FROM corpus_versions cv
+                JOIN users u ON cv.created_by = u.id
+                WHERE cv.corpus_id = ?
+                ORDER BY cv.version DESC
+                """,
+                (corpus_id,),
+            )
 
-        versions = []
-        for row in cur.fetchall():
-            versions.append(
-                CorpusVersionInfo(
-                    corpus_id=row[0],
-                    version=row[1],
-                    description=row[2],
-                    created_at=row[3],
-                    chunk_count=row[4],
-                    file_count=row[5],
-                    created_by_username=row[6],
+            versions = []
+            for row in cur.fetchall():
+                versions.append(
+                    CorpusVersionInfo(
+                        corpus_id=row[0],
+                        version=row[1],
+                        description=row[2],
+                        created_at=row[3],
+                        chunk_count=row[4],
+                        file_count=row[5],
+                        created_by_username=row[6],
+                    )
                 )
-            )
 
-        logger.debug(
-            f"User {current_user['username']} listed {len(versions)} versions "
-            f"for corpus {corpus_id}"
-        )
+            logger.debug(
+                f"User {current_user['username']} listed {len(versions)} versions "
+                f"for corpus {corpus_id}"
+            )
 
-        return versions
+            return versions
 
     except Exception as e:
         logger.error(f"Error listing corpus versions: {e}")
@@ -960,5 +914,3 @@ async def list_corpus_versions(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error listing versions: {str(e)}",
         )
-    finally:
-        conn.close()
@@ -2,18 +2,21 @@
 
 import asyncio
 import os
-import tempfile
-import uuid
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Iterable, List, Optional
 
+import numpy as np
+
 try:
     import magic
+    # One libmagic cookie, loaded at import rather than on the first upload;
+    # Magic serializes access with its own lock
+    _MAGIC_MIME = magic.Magic(mime=True)
     MAGIC_AVAILABLE = True
 except ImportError:
     MAGIC_AVAILABLE = False
 
-from openai import RateLimitError as OpenAIRateLimitError
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
 from fastapi.responses import JSONResponse
 from starlette.status import (
@@ -25,29 +28,37 @@ from starlette.status import (
 from config import (
     ALLOWED_FILE_EXTENSIONS,
     ALLOWED_MIME_TYPES,
-    EMBEDDING_CONCURRENCY,
+    EXTRACTION_INLINE_MAX_BYTES,
     MANAGEMENT_RATE_LIMIT,
-    MAX_EMBEDDING_RETRIES,
     MAX_FILE_SIZE_MB,
     MIME_VALIDATION_BYTES,
     QUERY_RATE_LIMIT,
     UPLOAD_RATE_LIMIT,
 )
 from ingestion.chunker import token_text_chunker
-from ingestion.file_loader import extract_text_from_file
+from ingestion.file_loader import (
+    discard_extraction_pool,
+    extract_and_chunk,
+    get_extraction_pool,
+    spool_to_disk,
+)
 from logging_config import get_logger
-from vector_store.embedder import get_openai_embedding
+from vector_store.query_cache import query_cache
 from vector_store.vector_index import (
     add_documents_to_index,
     compile_context,
     delete_collection,
+    is_literal_query,
     list_collection_names,
     list_collections_with_metadata,
-    query_index,
-    query_multiple_indexes,
+    literal_lookup,
+    query_index_vec,
+    query_multiple_indexes_vec,
+    remove_documents_from_index,
 )
 
 from ..auth import get_current_user
+from ..openai_client import EmbeddingDeduper, embeddings_with_retry
 from ..rate_limiting import limiter
 from ..validation import validate_collection_name, validate_filename
 from ..models.requests import QueryRequest
@@ -64,29 +75,10 @@ logger = get_logger(__name__)
 
 router = APIRouter()
 
-# Semaphore to limit concurrent OpenAI embedding API calls
-_embedding_semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
 
-
-async def _generate_embedding_with_retry(chunk: str, max_retries: int = MAX_EMBEDDING_RETRIES) -> List[float]:
-    """Generate embedding for a chunk with exponential backoff retry logic."""
-    for attempt in range(max_retries):
-        try:
-            async with _embedding_semaphore:
-                return await asyncio.to_thread(get_openai_embedding, chunk)
-        except OpenAIRateLimitError as e:
-            if attempt == max_retries - 1:
-                logger.error(f"Rate limit exceeded after {max_retries} attempts: {e}")
-                raise
-            wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-            logger.warning(f"Rate limit hit, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-            await asyncio.sleep(wait_time)
-        except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
-            raise
-
-
-def validate_upload_files(files: Iterable[UploadFile]) -> Optional[tuple[str, int]]:
+async def validate_upload_files(
+    files: Iterable[UploadFile], max_file_size_mb: int = MAX_FILE_SIZE_MB
+) -> Optional[tuple[str, int]]:
     """Return (error_message, status_code) tuple if any file is invalid."""
     for file in files:
         try:
@@ -101,22 +93,30 @@ def validate_upload_files(files: Iterable[UploadFile]) -> Optional[tuple[str, in
                 HTTP_415_UNSUPPORTED_MEDIA_TYPE
             )
 
-        file.file.seek(0, os.SEEK_END)
-        size_mb = file.file.tell() / (1024 * 1024)
-        file.file.seek(0)
-        if size_mb > MAX_FILE_SIZE_MB:
+        # Starlette records UploadFile.size while parsing the form; only seek to the
+        # end of the spooled file when it is unavailable
+        size = file.size
+        if size is None:
+            file.file.seek(0, os.SEEK_END)
+            size = file.file.tell()
+            file.file.seek(0)
+        size_mb = size / (1024 * 1024)
+        if size_mb > max_file_size_mb:
             return (
-                f"File too large: {safe_filename} ({size_mb:.1f}MB > {MAX_FILE_SIZE_MB}MB)",
+                f"File too large: {safe_filename} ({size_mb:.1f}MB > {max_file_size_mb}MB)",
                 HTTP_413_REQUEST_ENTITY_TOO_LARGE
             )
 
         try:
-            header = file.file.read(MIME_VALIDATION_BYTES)
-            file.file.seek(0)
             if MAGIC_AVAILABLE:
-                detected_mime = magic.from_buffer(header, mime=True) if header else ""
+                # One header read per file, off the event loop once the upload has
+                # rolled over to disk; rewind so extraction starts at the beginning
+                await file.seek(0)
+                header = await file.read(MIME_VALIDATION_BYTES)
+                await file.seek(0)
+                detected_mime = _MAGIC_MIME.from_buffer(header) if header else ""
             else:
-                # Skip MIME validation if libmagic is not available
+                # Skip MIME validation (and the header read) if libmagic is not available
                 detected_mime = ""
         except Exception as exc:  # pragma: no cover - defensive
             return (
@@ -137,31 +137,61 @@ def validate_upload_files(files: Iterable[UploadFile]) -> Optional[tuple[str, in
 
 
 async def _process_single_file(
-    file: UploadFile, chunker
-) -> tuple[List[str], List, List[dict], List[str]]:
+    file: UploadFile, chunker, deduper: EmbeddingDeduper
+) -> tuple[List[str], np.ndarray, List[dict], List[str]]:
     """Extract text, chunk it and generate embeddings for one file."""
     safe_filename = validate_filename(file.filename)
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(safe_filename).suffix) as tmp:
-        tmp.write(file.file.read())
-        tmp_path = tmp.name
-
-    content = await asyncio.to_thread(extract_text_from_file, Path(tmp_path))
-    os.remove(tmp_path)
+    pool = get_extraction_pool()
+    if pool is None:
+        # Extract straight from the upload's spooled file; no temp file round trip
+        file.file.seek(0)
+        chunks = await asyncio.to_thread(extract_and_chunk, file.file, safe_filename, chunker)
+    else:
+        # Parsing and chunking are CPU-bound, so hand the file to a worker process:
+        # concurrent uploads then run on separate cores instead of contending for the GIL
+        loop = asyncio.get_running_loop()
+        try:
+            if file.size is not None and file.size < EXTRACTION_INLINE_MAX_BYTES:
+                # Small files travel as bytes, skipping the temp file's write and re-read
+                await file.seek(0)
+                data = await file.read()
+                chunks = await loop.run_in_executor(
+                    pool, extract_and_chunk, data, safe_filename, chunker
+                )
+            else:
+                # Large files are streamed to disk and passed by path, so neither process
+                # holds the whole file in memory
+                path = await asyncio.to_thread(spool_to_disk, file.file, safe_filename)
+                try:
+                    chunks = await loop.run_in_executor(
+                        pool, extract_and_chunk, path, safe_filename, chunker
+                    )
+                finally:
+                    os.remove(path)
+        except BrokenProcessPool:
+            # A worker died mid-parse; replace the pool so later uploads still work
+            discard_extraction_pool(pool)
+            raise HTTPException(
+                status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Could not extract text from {safe_filename}",
+            )
 
-    if not content:
+    if not chunks:
         logger.warning(f"Skipped file with no extractable content: {safe_filename}")
-        return [], [], [], []
+        return [], np.empty((0, 0), dtype=np.float32), [], []
 
-    chunks = list(chunker(content))
-
-    # Parallelize embedding generation with concurrency control and retry logic
-    embeddings = await asyncio.gather(
-        *[_generate_embedding_with_retry(chunk) for chunk in chunks]
-    )
+    # One batched request per file, skipping chunks already embedded for another
+    # file (or earlier in this one) in the same upload
+    embeddings = await deduper.embed(chunks)
 
     metas = [{"source": safe_filename, "chunk_index": i} for i in range(len(chunks))]
-    ids = [str(uuid.uuid4()) for _ in chunks]
+    # One random 64-bit prefix per file plus a counter: unique like per-chunk uuid4s,
+    # far cheaper, and keeps a file's chunks clustered in id order. The prefix is
+    # random rather than derived from the filename so re-uploading a file never
+    # collides with the ids already in the collection
+    prefix = os.urandom(8).hex()
+    ids = [f"{prefix}-{i}" for i in range(len(chunks))]
 
     return chunks, embeddings, metas, ids
 
@@ -174,32 +204,95 @@ async def process_files(
 ) -> int:
     """Process and index multiple uploaded files asynchronously."""
 
-    tasks = [asyncio.create_task(_process_single_file(file, chunker)) for file in files]
-    results = await asyncio.gather(*tasks)
-
-    all_chunks: List[str] = []
-    all_embeddings: List = []
-    all_metas: List[dict] = []
-    all_ids: List[str] = []
-
-    for chunks, embeddings, metas, ids in results:
-        all_chunks.extend(chunks)
-        all_embeddings.extend(embeddings)
-        all_metas.extend(metas)
-        all_ids.extend(ids)
-
-    if all_chunks:
-        await asyncio.to_thread(
-            add_documents_to_index,
-            collection,
-            all_chunks,
-            all_embeddings,
-            all_metas,
-            all_ids,
+    deduper = EmbeddingDeduper()
+    tasks = [
+        asyncio.create_task(_process_single_file(file, chunker, deduper)) for file in files
+    ]
+    # Index each file as soon as its embeddings are back, so Chroma inserts overlap
+    # with the embedding requests still in flight for the other files. Inserts run
+    # one at a time; each file's vectors stay a single float32 array
+    total = 0
+    indexed_ids: List[str] = []
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            chunks, embeddings, metas, ids = await next_result
+            if not chunks:
+                continue
+            # Recorded first so a failed insert is cleaned up too
+            indexed_ids.extend(ids)
+            await asyncio.to_thread(
+                add_documents_to_index,
+                collection,
+                chunks,
+                embeddings,
+                metas,
+                ids,
+                db_path,
+            )
+            total += len(chunks)
+    except BaseException:
+        # One file failed: stop the rest and remove the files already indexed, so
+        # an upload is still all or nothing
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if indexed_ids:
+            await asyncio.to_thread(
+                remove_documents_from_index, collection, indexed_ids, db_path
+            )
+        raise
+    return total
+
+
+async def search_collections(
+    query_text: str,
+    db_path: str,
+    collection: Optional[str] = None,
+    collections: Optional[List[str]] = None,
+) -> dict:
+    """Return raw results for ``query_text`` from one, several or all of a user's collections.
+
+    Literal lookups and the query cache are tried before embedding the query.
+    """
+    if collection:
+        collection = validate_collection_name(collection)
+        scope = (db_path, collection)
+    else:
+        if collections:
+            collections = [validate_collection_name(c) for c in collections]
+            scope = (db_path, tuple(sorted(collections)))
+        else:
+            collections = list_collection_names(db_path)
+            scope = (db_path, None)
+
+    results = None
+    # Quoted phrases and filenames are answered by a direct lookup, falling back to
+    # semantic search when nothing matches
+    if is_literal_query(query_text):
+        results = await asyncio.to_thread(
+            literal_lookup,
+            [collection] if collection else collections,
+            query_text,
             db_path,
         )
-        return len(all_chunks)
-    return 0
+    # Exact repeat of a recent query: skip both the embedding and the search
+    if results is None:
+        results = query_cache.get(scope, query_text)
+    if results is None:
+        # Read before searching so a concurrent upload or delete keeps these results out
+        generation = query_cache.generation(db_path)
+        embedding = (await embeddings_with_retry([query_text]))[0]
+        # Differently worded but semantically equivalent query: reuse its results
+        results = query_cache.get_similar(scope, embedding)
+        if results is None:
+            if collection:
+                results = await asyncio.to_thread(
+                    query_index_vec, collection, embedding, db_path
+                )
+            else:
+                results = await query_multiple_indexes_vec(collections, embedding, db_path)
+            query_cache.put(scope, query_text, embedding, results, generation)
+    return results
 
 
 @router.get("/status/", response_model=StatusResponse)
@@ -220,7 +313,7 @@ async def create_index(
     """Create a new collection and ingest the given files."""
     collection = validate_collection_name(collection)
 
-    validation_result = validate_upload_files(files)
+    validation_result = await validate_upload_files(files)
     if validation_result:
         error_msg, status_code = validation_result
         raise HTTPException(status_code=status_code, detail=error_msg)
@@ -246,7 +339,7 @@ async def update_index(
     """Append new files to an existing collection."""
     collection = validate_collection_name(collection)
 
-    validation_result = validate_upload_files(files)
+    validation_result = await validate_upload_files(files)
     if validation_result:
         error_msg, status_code = validation_result
         raise HTTPException(status_code=status_code, detail=error_msg)
@@ -292,17 +385,9 @@ async def query(
     current_user: dict = Depends(get_current_user),
 ) -> QueryResponse:
     """Return context for a query across one or many collections."""
-    if payload.collection:
-        collection = validate_collection_name(payload.collection)
-        results = query_index(collection, payload.query, current_user["db_path"])
-    else:
-        if payload.collections:
-            collections = [validate_collection_name(c) for c in payload.collections]
-        else:
-            collections = list_collection_names(current_user["db_path"])
-        results = await query_multiple_indexes(
-            collections, payload.query, current_user["db_path"]
-        )
+    results = await search_collections(
+        payload.query, current_user["db_path"], payload.collection, payload.collections
+    )
     context = compile_context(results)
     return QueryResponse(context=context, raw_results=results)
 
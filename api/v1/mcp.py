@@ -14,6 +14,7 @@ from sse_starlette.sse import EventSourceResponse
 
 from api.auth import get_current_user
 from api.models.mcp_errors import to_mcp_error_code
+from api.openai_client import embeddings_with_retry
 from api.models.requests import QueryRequest
 from api.rate_limiting import limiter
 from config import QUERY_RATE_LIMIT
@@ -24,7 +25,7 @@ from mcp.handlers import (
     handle_tools_call,
     handle_tools_list,
 )
-from vector_store.vector_index import list_collection_names, stream_query_results
+from vector_store.vector_index import list_collection_names, stream_query_results_vec
 
 logger = get_logger(__name__)
 
@@ -312,11 +313,14 @@ async def stream_query(
                 }),
             }
 
+            # Embed once through the shared limiter, retry and embedding cache
+            embedding = (await embeddings_with_retry([payload.query]))[0]
+
             # Stream results as they come
             total_results = 0
-            async for result in stream_query_results(
+            async for result in stream_query_results_vec(
                 collection_names=collections,
-                query_text=payload.query,
+                query_embedding=embedding,
                 db_path=current_user["db_path"],
                 n_results=payload.n_results,
             ):
@@ -1,5 +1,6 @@
 """User management endpoints for API v1."""
 
+import asyncio
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Request
@@ -60,8 +61,9 @@ class MessageResponse(BaseModel):
 @limiter.limit(AUTH_RATE_LIMIT)
 async def register(request: Request, credentials: UserCredentials) -> AuthResponse:
     """Register a new user and return an API key."""
+    # bcrypt runs in a worker thread so it never stalls the event loop
     try:
-        api_key = register_user(credentials.username, credentials.password)
+        api_key = await asyncio.to_thread(register_user, credentials.username, credentials.password)
         return AuthResponse(api_key=api_key)
     except HTTPException:
         raise
@@ -74,7 +76,7 @@ async def register(request: Request, credentials: UserCredentials) -> AuthRespon
 async def login(request: Request, credentials: UserCredentials) -> AuthResponse:
     """Login and return an API key."""
     try:
-        api_key = login_user(credentials.username, credentials.password)
+        api_key = await asyncio.to_thread(login_user, credentials.username, credentials.password)
         return AuthResponse(api_key=api_key)
     except HTTPException:
         raise
@@ -87,7 +89,7 @@ async def login(request: Request, credentials: UserCredentials) -> AuthResponse:
 async def create_api_key_endpoint(request: Request, credentials: UserCredentials) -> AuthResponse:
     """Create a new API key for an existing user (legacy endpoint using credentials)."""
     try:
-        api_key = create_api_key_for_user(credentials.username, credentials.password)
+        api_key = await asyncio.to_thread(create_api_key_for_user, credentials.username, credentials.password)
         return AuthResponse(api_key=api_key)
     except HTTPException:
         raise
@@ -1,10 +1,16 @@
 """Input validation utilities for API endpoints."""
 
 import re
+from functools import lru_cache
 from pathlib import Path
 from fastapi import HTTPException
 from starlette.status import HTTP_422_UNPROCESSABLE_ENTITY
 
+# \A and \Z anchor to the whole string; '$' would also accept a trailing newline
+_USERNAME_PATTERN = re.compile(r'\A[a-zA-Z0-9][a-zA-Z0-9_-]*\Z')
+_COLLECTION_NAME_PATTERN = re.compile(r'\A[a-zA-Z0-9_-]+\Z')
+_RESERVED_USERNAMES = frozenset({'admin', 'root', 'system', 'api', 'test', 'user'})
+
 
 def validate_username(username: str) -> str:
     """
@@ -37,15 +43,14 @@ def validate_username(username: str) -> str:
             detail="Username must be 3-32 characters"
         )
 
-    if not re.match(r'^[a-zA-Z0-9][a-zA-Z0-9_-]*$', username):
+    if not _USERNAME_PATTERN.match(username):
         raise HTTPException(
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Username must start with letter/number and contain only letters, numbers, hyphens, underscores"
         )
 
     # Block reserved system names
-    reserved = {'admin', 'root', 'system', 'api', 'test', 'user'}
-    if username.lower() in reserved:
+    if username.lower() in _RESERVED_USERNAMES:
         raise HTTPException(
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Username is reserved"
@@ -54,10 +59,14 @@ def validate_username(username: str) -> str:
     return username
 
 
+@lru_cache(maxsize=4096)
 def validate_collection_name(name: str) -> str:
     """
     Validate collection name to prevent path traversal attacks.
 
+    Memoized: names are checked on every request, and only valid names are
+    cached since failures raise.
+
     Rules:
     - 1-64 characters
     - Only letters, numbers, hyphens, underscores
@@ -92,7 +101,7 @@ def validate_collection_name(name: str) -> str:
         )
 
     # Only allow alphanumeric characters, underscores, and hyphens
-    if not re.match(r'^[a-zA-Z0-9_-]+$', name):
+    if not _COLLECTION_NAME_PATTERN.match(name):
         raise HTTPException(
             status_code=HTTP_422_UNPROCESSABLE_ENTITY,
             detail="Collection name must contain only letters, numbers, hyphens, underscores"
@@ -101,10 +110,14 @@ def validate_collection_name(name: str) -> str:
     return name
 
 
+@lru_cache(maxsize=1024)
 def validate_filename(filename: str) -> str:
     """
     Validate and sanitize uploaded filenames.
 
+    Memoized like validate_collection_name; each upload validates a filename
+    more than once.
+
     Args:
         filename: Original filename from upload
 
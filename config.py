@@ -26,8 +26,13 @@ VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", str(BASE_DIR / "data" / "vector_ind
 # === User DB Settings ===
 USER_DB_PATH = os.getenv("USER_DB_PATH", Path(BASE_DIR) / "users.db")
 API_KEY_TTL_DAYS = int(os.getenv("API_KEY_TTL_DAYS", "90"))
+# How often expired API keys are deleted (lookups already ignore them)
+API_KEY_PURGE_INTERVAL_SECONDS = int(os.getenv("API_KEY_PURGE_INTERVAL_SECONDS", "300"))
 PASSWORD_MIN_LENGTH = int(os.getenv("PASSWORD_MIN_LENGTH", "12"))
 REQUIRE_COMPLEX_PASSWORD = os.getenv("REQUIRE_COMPLEX_PASSWORD", "true").lower() == "true"
+# bcrypt cost factor: each step doubles hashing time. Keep 12 in production;
+# test and dev runs can drop to the minimum of 4
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
 # === Admin Settings ===
 ADMIN_USERS = _as_list(os.getenv("ADMIN_USERS", ""))  # Comma-separated list of admin usernames
@@ -38,6 +43,11 @@ UPLOAD_RATE_LIMIT = os.getenv("UPLOAD_RATE_LIMIT", "10/minute")
 QUERY_RATE_LIMIT = os.getenv("QUERY_RATE_LIMIT", "60/minute")
 MANAGEMENT_RATE_LIMIT = os.getenv("MANAGEMENT_RATE_LIMIT", "30/minute")
 AUTH_RATE_LIMIT = os.getenv("AUTH_RATE_LIMIT", "10/minute")
+# Where rate limit counters live. The default keeps them per process; with several
+# workers point this at a shared store, e.g. redis://localhost:6379/0 (needs the redis package)
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+# fixed-window is the cheapest check; moving-window is stricter at window edges
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "fixed-window")
 
 # MCP-specific rate limits (defaults to QUERY_RATE_LIMIT if not set)
 MCP_QUERY_RATE_LIMIT = os.getenv("MCP_QUERY_RATE_LIMIT", QUERY_RATE_LIMIT)
@@ -45,8 +55,35 @@ MCP_LIST_RATE_LIMIT = os.getenv("MCP_LIST_RATE_LIMIT", QUERY_RATE_LIMIT)
 MCP_RESOURCE_RATE_LIMIT = os.getenv("MCP_RESOURCE_RATE_LIMIT", QUERY_RATE_LIMIT)
 
 # === Performance Settings ===
-EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "10"))
+# Cap on embedding requests in flight at once; OPENAI_RPM below sets the sustained rate
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "32"))
 MAX_EMBEDDING_RETRIES = int(os.getenv("MAX_EMBEDDING_RETRIES", "3"))
+# Requests per minute allowed against the OpenAI API (keep just below your account limit)
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "3000"))
+# Maximum number of inputs sent in a single embeddings request (OpenAI limit: 2048)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "2048"))
+# Character budget per embeddings request, keeping batches of long chunks under the token limit
+EMBEDDING_BATCH_MAX_CHARS = int(os.getenv("EMBEDDING_BATCH_MAX_CHARS", "200000"))
+# Persistent embedding cache keyed by content hash (set EMBED_CACHE_MAX_ENTRIES=0 to disable)
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", str(BASE_DIR / "data" / "embed_cache.db"))
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "200000"))
+# Worker processes for PDF/DOCX text extraction (0 = extract in threads instead)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+# Uploads smaller than this go to extraction workers as bytes; larger ones via a temp file
+EXTRACTION_INLINE_MAX_BYTES = int(os.getenv("EXTRACTION_INLINE_MAX_BYTES", str(8 * 1024 * 1024)))
+# Read-only SQLite connections kept open for the corpus tables (writes share one connection).
+# Clamped to at least one, since reads wait for a free connection
+SQLITE_READERS = max(1, int(os.getenv("SQLITE_READERS", str(os.cpu_count() or 4))))
+# Usage log rows are queued and written in batches of up to USAGE_LOG_BATCH_SIZE rows,
+# at most USAGE_LOG_FLUSH_MS after the first one arrives (rows beyond the queue size are dropped)
+USAGE_LOG_QUEUE_SIZE = int(os.getenv("USAGE_LOG_QUEUE_SIZE", "10000"))
+USAGE_LOG_BATCH_SIZE = int(os.getenv("USAGE_LOG_BATCH_SIZE", "500"))
+USAGE_LOG_FLUSH_MS = int(os.getenv("USAGE_LOG_FLUSH_MS", "100"))
+# Query result cache (set QUERY_CACHE_SIZE=0 to disable)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+# Minimum cosine similarity for a cached query to answer a new, differently worded one
+QUERY_CACHE_SIMILARITY = float(os.getenv("QUERY_CACHE_SIMILARITY", "0.95"))
 
 # === FastAPI Settings ===
 _cors_env = os.getenv("CORS_ORIGINS", "http://localhost:3000")
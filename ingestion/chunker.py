@@ -3,9 +3,12 @@
 import re
 from typing import Iterable, List
 
+# Sentence boundaries for simple_text_chunker, compiled once for every call
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?]) +')
+
 def simple_text_chunker(text: str, max_tokens: int = 500) -> list[str]:
     """Split *text* into roughly ``max_tokens`` sized chunks."""
-    sentences = re.split(r'(?<=[.!?]) +', text)
+    sentences = _SENTENCE_BOUNDARY.split(text)
     chunks: list[str] = []
     current = ""
     for sentence in sentences:
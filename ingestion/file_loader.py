@@ -1,16 +1,29 @@
 """Utility functions for gathering files and reading their contents."""
 
+import io
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Union
+from typing import BinaryIO, Callable, Iterable, List, Optional, Union
 import fitz  # PyMuPDF
 import docx
-from config import ALLOWED_FILE_EXTENSIONS
+from config import ALLOWED_FILE_EXTENSIONS, EXTRACTION_WORKERS
+from ingestion.chunker import token_text_chunker
 from logging_config import get_logger
 
 logger = get_logger(__name__)
 
 SUPPORTED_EXTENSIONS = ALLOWED_FILE_EXTENSIONS
 
+# Shared process pool for CPU-bound parsing; created on first use
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
 def collect_files_from_path(path: Union[Path, str]) -> List[Path]:
     """Return all files under *path* that match supported extensions."""
     files: List[Path] = []
@@ -25,40 +38,149 @@ def collect_files_from_path(path: Union[Path, str]) -> List[Path]:
 
 def extract_text_from_file(path: Path) -> str:
     """Read a file from disk and return its textual content."""
-    ext = path.suffix.lower()
-    logger.debug(f"Extracting text from {path.name} (type: {ext})")
+    path = Path(path)
+    return _extract_text(path, path.name)
+
+def extract_text_from_bytes(data: bytes, filename: str) -> str:
+    """Return the textual content of an in-memory file.
+
+    Top-level and bytes-based so it can be shipped to a worker process.
+    """
+    return extract_text_from_stream(io.BytesIO(data), filename)
+
+def extract_text_from_stream(fileobj: BinaryIO, filename: str) -> str:
+    """Return the textual content of an open binary stream, dispatching on *filename*'s suffix."""
+    return _extract_text(fileobj, filename)
+
+def _extract_text(source: Union[Path, BinaryIO], filename: str) -> str:
+    """Extract text from a path or binary stream, dispatching on *filename*'s suffix.
+
+    Paths are handed to the PDF/DOCX parsers as-is so they read from disk
+    instead of loading the whole file into memory first.
+    """
+    ext = Path(filename).suffix.lower()
+    logger.debug(f"Extracting text from {filename} (type: {ext})")
     try:
         if ext == ".txt" or ext == ".md":
-            content = path.read_text(encoding="utf-8", errors="ignore")
-            logger.debug(f"Extracted {len(content)} characters from {path.name}")
+            data = source.read_bytes() if isinstance(source, Path) else source.read()
+            content = data.decode("utf-8", errors="ignore")
+            logger.debug(f"Extracted {len(content)} characters from {filename}")
             return content
 
         elif ext == ".pdf":
-            content = extract_text_from_pdf(path)
-            logger.debug(f"Extracted {len(content)} characters from PDF {path.name}")
+            content = extract_text_from_pdf(source)
+            logger.debug(f"Extracted {len(content)} characters from PDF {filename}")
             return content
 
         elif ext == ".docx":
-            content = extract_text_from_docx(path)
-            logger.debug(f"Extracted {len(content)} characters from DOCX {path.name}")
+            content = extract_text_from_docx(source)
+            logger.debug(f"Extracted {len(content)} characters from DOCX {filename}")
             return content
 
         else:
-            logger.warning(f"Unsupported file extension: {ext} for {path.name}")
+            logger.warning(f"Unsupported file extension: {ext} for {filename}")
             return ""
     except Exception as e:
-        logger.error(f"Failed to read {path.name}: {e}", exc_info=True)
+        logger.error(f"Failed to read {filename}: {e}", exc_info=True)
         return ""
 
-def extract_text_from_pdf(path: Path) -> str:
-    """Extract text from a PDF file using PyMuPDF."""
-    doc = fitz.open(path)
+def spool_to_disk(fileobj: BinaryIO, filename: str) -> str:
+    """Copy *fileobj* to a named temporary file in 1MB pieces and return its path.
+
+    Memory use stays bounded by the copy buffer regardless of the upload's size.
+    The caller owns the file and must remove it.
+    """
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp:
+        try:
+            shutil.copyfileobj(fileobj, tmp, length=1024 * 1024)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    return tmp.name
+
+def extract_and_chunk(
+    source: Union[bytes, str, Path, BinaryIO],
+    filename: str,
+    chunker: Callable[[str], Iterable[str]] = token_text_chunker,
+) -> List[str]:
+    """Extract text from *source* (raw bytes, a file path or a binary stream) and chunk it.
+
+    Doing both steps in one call keeps chunking off the event loop and, in a worker
+    process, returns only the chunks. *chunker* must be a top-level function so it
+    can be pickled.
+    """
+    if isinstance(source, bytes):
+        content = extract_text_from_bytes(source, filename)
+    elif isinstance(source, (str, Path)):
+        content = _extract_text(Path(source), filename)
+    else:
+        content = extract_text_from_stream(source, filename)
+    return list(chunker(content)) if content else []
+
+def extract_text_from_pdf(source: Union[Path, BinaryIO]) -> str:
+    """Extract text from a PDF file or binary stream using PyMuPDF."""
+    if isinstance(source, (str, Path)):
+        doc = fitz.open(source)
+    else:
+        doc = fitz.open(stream=source.read(), filetype="pdf")
     text = ""
     for page in doc:
         text += page.get_text()
     return text
 
-def extract_text_from_docx(path: Path) -> str:
-    """Extract text from a Microsoft Word document."""
-    doc = docx.Document(path)
+def extract_text_from_docx(source: Union[Path, BinaryIO]) -> str:
+    """Extract text from a Microsoft Word document path or binary stream."""
+    doc = docx.Document(source)
     return "\n".join([para.text for para in doc.paragraphs])
+
+def _init_extraction_worker() -> None:
+    """Prepare a freshly spawned extraction worker.
+
+    Unpickling this function imports this module, so PyMuPDF and python-docx are
+    loaded while the worker starts rather than inside its first task. Workers
+    ignore Ctrl+C and leave shutdown to the server process.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared extraction process pool, or None when EXTRACTION_WORKERS is 0.
+
+    Workers are spawned rather than forked so they never inherit the server's
+    threads or open database handles.
+    """
+    global _extraction_pool
+    if EXTRACTION_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _extraction_pool is None:
+            _extraction_pool = ProcessPoolExecutor(
+                max_workers=EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_extraction_worker,
+            )
+            logger.info(f"Started text extraction pool with {EXTRACTION_WORKERS} workers")
+        return _extraction_pool
+
+def discard_extraction_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop ``pool`` after a worker died so the next upload starts a fresh one.
+
+    A pool whose worker exits abruptly (a parser crash, the OOM killer) is
+    broken for good. Only the pool that failed is discarded, in case another
+    request has already replaced it.
+    """
+    global _extraction_pool
+    with _pool_lock:
+        if _extraction_pool is pool:
+            _extraction_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+    logger.warning("Text extraction pool broke; it will be restarted on the next upload")
+
+def shutdown_extraction_pool() -> None:
+    """Stop the extraction process pool if it was started."""
+    global _extraction_pool
+    with _pool_lock:
+        if _extraction_pool is not None:
+            _extraction_pool.shutdown(wait=False, cancel_futures=True)
+            _extraction_pool = None
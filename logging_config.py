@@ -1,31 +1,26 @@
 """Centralized logging configuration for the Knowledge Manager application."""
 
+import atexit
 import logging
 import logging.handlers
+import queue
 import sys
 from pathlib import Path
+from typing import Optional
 
 from config import LOG_LEVEL, LOG_FILE
 
+# Loggers only enqueue records; a background listener thread does the actual I/O,
+# so request handlers never block on stdout or file writes
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
 
-def setup_logging(name: str = None) -> logging.Logger:
-    """
-    Configure and return a logger instance with structured formatting.
-
-    Args:
-        name: Logger name (typically __name__ from the calling module)
-
-    Returns:
-        Configured logger instance
-    """
-    # Create logger
-    logger = logging.getLogger(name or __name__)
-
-    # Avoid duplicate handlers if logger already configured
-    if logger.handlers:
-        return logger
 
-    logger.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
+def _start_listener() -> None:
+    """Create the output handlers once and start draining the log queue."""
+    global _listener
+    if _listener is not None:
+        return
 
     # Create formatters
     detailed_formatter = logging.Formatter(
@@ -42,7 +37,7 @@ def setup_logging(name: str = None) -> logging.Logger:
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.DEBUG if LOG_LEVEL.upper() == "DEBUG" else logging.INFO)
     console_handler.setFormatter(simple_formatter if LOG_LEVEL.upper() != "DEBUG" else detailed_formatter)
-    logger.addHandler(console_handler)
+    handlers: list[logging.Handler] = [console_handler]
 
     # File handler (optional, configured via LOG_FILE environment variable)
     if LOG_FILE:
@@ -57,7 +52,37 @@ def setup_logging(name: str = None) -> logging.Logger:
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(detailed_formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    _listener = logging.handlers.QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush anything still queued when the process exits
+    atexit.register(_listener.stop)
+
+
+def setup_logging(name: str = None) -> logging.Logger:
+    """
+    Configure and return a logger instance with structured formatting.
+
+    Records are handed to a queue and written by a background listener thread.
+
+    Args:
+        name: Logger name (typically __name__ from the calling module)
+
+    Returns:
+        Configured logger instance
+    """
+    # Create logger
+    logger = logging.getLogger(name or __name__)
+
+    # Avoid duplicate handlers if logger already configured
+    if logger.handlers:
+        return logger
+
+    logger.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
+
+    _start_listener()
+    logger.addHandler(logging.handlers.QueueHandler(_log_queue))
 
     # Prevent propagation to root logger to avoid duplicate logs
     logger.propagate = False
@@ -1,8 +1,12 @@
 """Shared test configuration and fixtures for pytest."""
 
+import os
 import sys
 from pathlib import Path
 
+# Minimum bcrypt cost: registrations and logins run throughout the suite
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
 # Add parent directory to Python path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
@@ -10,7 +14,9 @@ import pytest
 from fastapi.testclient import TestClient
 
 from api.app import app
-from api import users
+from api import corpus_db, users
+from vector_store import embed_cache
+from vector_store.query_cache import query_cache
 from vector_store.vector_index import clear_client_cache
 
 
@@ -27,10 +33,28 @@ def disable_rate_limiting():
 
 @pytest.fixture(scope="function", autouse=True)
 def cleanup_client_cache():
-    """Clear ChromaDB client cache before each test for isolation."""
+    """Clear ChromaDB client and query result caches before each test for isolation."""
     clear_client_cache()
+    query_cache.clear()
     yield
     clear_client_cache()
+    query_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def isolate_embed_cache(tmp_path, monkeypatch):
+    """Give each test its own persistent embedding cache."""
+    monkeypatch.setattr(embed_cache, "EMBED_CACHE_PATH", str(tmp_path / "embed_cache.db"))
+    yield
+    embed_cache.close()
+
+
+@pytest.fixture(scope="function")
+def corpus_pool(tmp_path, monkeypatch):
+    """Point the corpus tables at a fresh temporary database and return its pool."""
+    monkeypatch.setattr(corpus_db, "DB_PATH", str(tmp_path / "corpus.db"))
+    corpus_db.init_corpus_tables()
+    return corpus_db._get_pool()
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,47 @@
+"""Tests for corpus permission checks."""
+
+import sqlite3
+
+import pytest
+from fastapi import HTTPException
+
+from api import corpus_auth, corpus_db
+
+
+@pytest.fixture
+def corpus_tables(corpus_pool):
+    conn = sqlite3.connect(corpus_db.DB_PATH)
+    conn.executemany(
+        "INSERT INTO corpuses (id, name, display_name, is_public, is_approved, owner_id, "
+        "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, 0, 0)",
+        [(1, "private", "Private", 0, 1, 10), (2, "public", "Public", 1, 1, 10)],
+    )
+    conn.execute(
+        "INSERT INTO corpus_permissions (corpus_id, user_id, permission_type, granted_by, "
+        "granted_at) VALUES (1, 20, 'write', 10, 0)"
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_permission_levels(corpus_tables):
+    assert corpus_auth.check_corpus_permission(1, 10, "owner")
+    assert corpus_auth.check_corpus_permission(1, 20, "write")
+    assert corpus_auth.check_corpus_permission(2, 30, "read")
+
+    with pytest.raises(HTTPException) as exc:
+        corpus_auth.check_corpus_permission(1, 20, "admin")
+    assert exc.value.status_code == 403
+    with pytest.raises(HTTPException) as exc:
+        corpus_auth.check_corpus_permission(1, 30, "read")
+    assert exc.value.status_code == 403
+    with pytest.raises(HTTPException) as exc:
+        corpus_auth.check_corpus_permission(99, 10, "read")
+    assert exc.value.status_code == 404
+
+
+def test_user_permission_lookup(corpus_tables):
+    assert corpus_auth.get_user_corpus_permission(1, 10) == "owner"
+    assert corpus_auth.get_user_corpus_permission(1, 20) == "write"
+    assert corpus_auth.get_user_corpus_permission(1, 30) is None
+    assert corpus_auth.get_user_corpus_permission(99, 10) is None
@@ -0,0 +1,124 @@
+"""Tests for the corpus database connection pool."""
+
+import sqlite3
+
+import pytest
+
+from api import corpus_db
+
+
+def test_writer_commits_or_rolls_back(corpus_pool):
+    insert = (
+        "INSERT INTO corpuses (name, display_name, owner_id, created_at, updated_at) "
+        "VALUES (?, ?, 1, 0, 0)"
+    )
+    with corpus_pool.writer() as conn:
+        conn.execute(insert, ("kept", "Kept"))
+    with pytest.raises(sqlite3.IntegrityError):
+        with corpus_pool.writer() as conn:
+            conn.execute(insert, ("dropped", "Dropped"))
+            conn.execute(insert, ("kept", "Duplicate"))
+
+    with corpus_pool.reader() as conn:
+        assert conn.execute("SELECT name FROM corpuses").fetchall() == [("kept",)]
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute(insert, ("readonly", "Read only"))
+    assert corpus_db._get_pool() is corpus_pool
+
+
+def test_writer_recovers_from_a_failed_commit(corpus_pool):
+    # A deferred foreign key violation only surfaces at COMMIT
+    with corpus_pool.writer() as conn:
+        conn.execute(
+            "CREATE TABLE child (parent INTEGER REFERENCES corpuses(id) DEFERRABLE INITIALLY DEFERRED)"
+        )
+    corpus_pool._writer.execute("PRAGMA foreign_keys=ON")
+    with pytest.raises(sqlite3.IntegrityError):
+        with corpus_pool.writer() as conn:
+            conn.execute("INSERT INTO child VALUES (42)")
+    corpus_pool._writer.execute("PRAGMA foreign_keys=OFF")
+
+    # The writer is usable again and the failed transaction left nothing behind
+    with corpus_pool.writer() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM child").fetchone() == (0,)
+
+
+def test_schema_is_skipped_on_warm_databases(corpus_pool, monkeypatch):
+    with corpus_pool.reader() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == corpus_db.SCHEMA_VERSION
+
+    monkeypatch.setattr(corpus_pool, "executescript", lambda sql: pytest.fail("schema ran on a warm database"))
+    corpus_db.init_corpus_tables()
+
+
+def test_indexes_can_be_dropped_for_bulk_loads(corpus_pool):
+    list_indexes = (
+        "SELECT name FROM sqlite_master "
+        "WHERE type = 'index' AND tbl_name = 'usage_logs' AND sql IS NOT NULL"
+    )
+
+    with corpus_pool.writer() as conn:
+        corpus_db.drop_indexes(conn, "usage_logs")
+        assert conn.execute(list_indexes).fetchall() == []
+        corpus_db.create_indexes(conn, "usage_logs")
+
+    with corpus_pool.reader() as conn:
+        assert {row[0] for row in conn.execute(list_indexes)} == set(corpus_db._INDEX_DDL["usage_logs"])
+
+
+def test_corpus_usage_stats_use_covering_index(corpus_pool):
+    with corpus_pool.reader() as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*), SUM(query_count), MAX(timestamp) "
+            "FROM usage_logs WHERE corpus_id = ?",
+            (1,),
+        ).fetchall()
+    assert "COVERING INDEX idx_usage_logs_corpus_ts" in " ".join(row[3] for row in plan)
+
+
+def test_user_usage_queries_are_index_only(corpus_pool):
+    queries = {
+        "SELECT COUNT(*), SUM(query_count), MAX(timestamp) FROM usage_logs "
+        "WHERE user_id = ? AND corpus_id = ?": "COVERING INDEX idx_usage_logs_user_corpus",
+        "SELECT id FROM usage_logs WHERE user_id = ? "
+        "ORDER BY timestamp DESC LIMIT 10": "COVERING INDEX idx_usage_logs_user_ts",
+    }
+
+    with corpus_pool.reader() as conn:
+        for sql, index in queries.items():
+            params = (1, 2)[: sql.count("?")]
+            plan = " ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+            assert index in plan
+            assert "TEMP B-TREE" not in plan
+
+
+def test_close_all_discards_pools(corpus_pool):
+    corpus_db._close_all()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        with corpus_pool.writer():
+            pass
+    assert corpus_db._get_pool() is not corpus_pool
+
+
+def test_writer_takes_the_write_lock_up_front(corpus_pool):
+    other = sqlite3.connect(corpus_db.DB_PATH, timeout=0)
+
+    # BEGIN IMMEDIATE holds the write lock before the block has written anything
+    with corpus_pool.writer():
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            other.execute("BEGIN IMMEDIATE")
+    other.execute("BEGIN IMMEDIATE")
+    other.rollback()
+    other.close()
+
+
+def test_timestamps_are_returned_as_integers(corpus_pool):
+    with corpus_pool.writer() as conn:
+        conn.execute(
+            "INSERT INTO usage_logs (user_id, corpus_id, action, timestamp) VALUES (1, 1, 'query', ?)",
+            (1704067200,),
+        )
+    with corpus_pool.reader() as conn:
+        (timestamp,) = conn.execute("SELECT timestamp FROM usage_logs").fetchone()
+    assert type(timestamp) is int
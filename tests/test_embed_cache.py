@@ -0,0 +1,53 @@
+"""Tests for the persistent embedding cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from api import openai_client
+from vector_store import embed_cache
+
+
+def test_round_trip_and_miss():
+    vectors = np.array([[1.0, 2.0], [3.0, 4.0]], dtype=np.float32)
+    embed_cache.store_embeddings(["alpha", "beta"], vectors, model="m")
+
+    cached = embed_cache.get_cached_embeddings(["beta", "gamma", "alpha"], model="m")
+
+    assert cached[0].tolist() == [3.0, 4.0]
+    assert cached[1] is None
+    assert cached[2].dtype == np.float32
+    assert embed_cache.get_cached_embeddings(["alpha"], model="other") == [None]
+
+
+def test_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(embed_cache, "EMBED_CACHE_MAX_ENTRIES", 10)
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(embed_cache, "time", SimpleNamespace(time=lambda: next(clock)))
+
+    for i in range(10):
+        embed_cache.store_embeddings([f"t{i}"], np.ones((1, 2), dtype=np.float32), model="m")
+    embed_cache.get_cached_embeddings(["t0"], model="m")
+    embed_cache.store_embeddings(["t10"], np.ones((1, 2), dtype=np.float32), model="m")
+
+    cached = embed_cache.get_cached_embeddings([f"t{i}" for i in range(11)], model="m")
+    assert cached[0] is not None and cached[10] is not None
+    assert cached[1] is None and cached[2] is None
+
+
+def test_embeddings_with_retry_only_sends_misses(monkeypatch):
+    requested = []
+
+    async def fake_batch(texts):
+        requested.append(list(texts))
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(openai_client, "aget_openai_embeddings_batch", fake_batch)
+
+    first = asyncio.run(openai_client.embeddings_with_retry(["one", "three"]))
+    second = asyncio.run(openai_client.embeddings_with_retry(["three", "sixsix", "one"]))
+
+    assert requested == [["one", "three"], ["sixsix"]]
+    assert first[:, 0].tolist() == [3.0, 5.0]
+    assert second[:, 0].tolist() == [5.0, 6.0, 3.0]
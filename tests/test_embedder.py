@@ -0,0 +1,75 @@
+"""Tests for batched embedding generation."""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from vector_store import embedder
+
+
+class FakeEmbeddings:
+    """Stand-in for ``client.embeddings`` that records each request."""
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, input, model):
+        self.calls.append(list(input))
+        # Return items out of order to make sure callers sort by index
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text)), float(i)])
+            for i, text in enumerate(input)
+        ]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+class AsyncFakeEmbeddings(FakeEmbeddings):
+    """Async stand-in for ``async_client.embeddings``."""
+
+    async def create(self, input, model):
+        return super().create(input, model)
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    fake = FakeEmbeddings()
+    monkeypatch.setattr(embedder, "client", SimpleNamespace(embeddings=fake))
+    return fake
+
+
+def test_batch_uses_single_request(fake_embeddings):
+    vectors = embedder.get_openai_embeddings_batch(["a", "bb", "ccc"])
+
+    assert len(fake_embeddings.calls) == 1
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (3, 2)
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0]
+
+
+def test_batch_splits_above_limit(fake_embeddings, monkeypatch):
+    monkeypatch.setattr(embedder, "EMBEDDING_BATCH_SIZE", 2)
+
+    vectors = embedder.get_openai_embeddings_batch(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert [len(call) for call in fake_embeddings.calls] == [2, 2, 1]
+    assert [v[0] for v in vectors] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_batch_empty_input(fake_embeddings):
+    vectors = embedder.get_openai_embeddings_batch([])
+
+    assert fake_embeddings.calls == []
+    assert len(vectors) == 0
+
+
+def test_async_batch_returns_ordered_float32(monkeypatch):
+    fake = AsyncFakeEmbeddings()
+    monkeypatch.setattr(embedder, "async_client", SimpleNamespace(embeddings=fake))
+
+    vectors = asyncio.run(embedder.aget_openai_embeddings_batch(["a", "bb"]))
+
+    assert len(fake.calls) == 1
+    assert vectors.dtype == np.float32
+    assert vectors[:, 0].tolist() == [1.0, 2.0]
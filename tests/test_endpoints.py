@@ -0,0 +1,68 @@
+"""Tests for upload processing in the v1 document endpoints."""
+
+import asyncio
+import io
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from api.v1 import endpoints
+from ingestion import file_loader
+
+
+def test_failed_upload_removes_files_already_indexed(monkeypatch):
+    finished = []
+
+    async def fake_process(file, chunker, deduper):
+        if file == "bad":
+            await asyncio.sleep(0.01)
+            raise RuntimeError("extraction failed")
+        if file == "slow":
+            await asyncio.sleep(10)
+        finished.append(file)
+        return [file], np.zeros((1, 3), dtype=np.float32), [{"source": file}], [f"{file}-0"]
+
+    indexed = []
+    monkeypatch.setattr(endpoints, "_process_single_file", fake_process)
+    monkeypatch.setattr(
+        endpoints, "add_documents_to_index", lambda collection, chunks, emb, metas, ids, db_path: indexed.extend(ids)
+    )
+    monkeypatch.setattr(
+        endpoints,
+        "remove_documents_from_index",
+        lambda collection, ids, db_path: [indexed.remove(i) for i in ids],
+    )
+
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        asyncio.run(endpoints.process_files(["good", "bad", "slow"], "notes", "db"))
+
+    # The good file was indexed and then removed; the slow one was cancelled
+    assert finished == ["good"]
+    assert indexed == []
+
+
+class _BrokenPool(Executor):
+    """Stands in for a process pool whose worker has died."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+
+def test_broken_extraction_pool_is_replaced(monkeypatch):
+    pool = _BrokenPool()
+    monkeypatch.setattr(file_loader, "EXTRACTION_WORKERS", 1)
+    monkeypatch.setattr(file_loader, "_extraction_pool", pool)
+    upload = UploadFile(io.BytesIO(b"hello"), size=5, filename="notes.txt")
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(endpoints._process_single_file(upload, None, None))
+
+    assert excinfo.value.status_code == 422
+    assert "notes.txt" in excinfo.value.detail
+    # The next upload gets a fresh pool instead of the broken one
+    assert file_loader._extraction_pool is None
@@ -0,0 +1,65 @@
+"""Tests for text extraction from files and streams."""
+
+import io
+import os
+
+import docx
+
+from ingestion.file_loader import (
+    extract_and_chunk,
+    extract_text_from_bytes,
+    extract_text_from_file,
+    extract_text_from_stream,
+    spool_to_disk,
+)
+
+
+def test_stream_text_matches_file(tmp_path):
+    path = tmp_path / "notes.md"
+    path.write_text("# Title\nbody text", encoding="utf-8")
+
+    with path.open("rb") as fileobj:
+        assert extract_text_from_stream(fileobj, "notes.md") == extract_text_from_file(path)
+
+
+def test_stream_docx():
+    buffer = io.BytesIO()
+    document = docx.Document()
+    document.add_paragraph("first")
+    document.add_paragraph("second")
+    document.save(buffer)
+    buffer.seek(0)
+
+    assert extract_text_from_stream(buffer, "report.docx") == "first\nsecond"
+
+
+def test_stream_unsupported_extension_returns_empty():
+    assert extract_text_from_stream(io.BytesIO(b"data"), "archive.zip") == ""
+
+
+def test_bytes_matches_stream():
+    data = "caf\u00e9 notes".encode("utf-8")
+
+    assert extract_text_from_bytes(data, "notes.txt") == extract_text_from_stream(io.BytesIO(data), "notes.txt")
+
+
+def test_extract_and_chunk_bytes_and_stream_agree():
+    data = " ".join(f"word{i}" for i in range(1200)).encode("utf-8")
+
+    from_bytes = extract_and_chunk(data, "long.txt")
+    from_stream = extract_and_chunk(io.BytesIO(data), "long.txt")
+
+    assert from_bytes == from_stream
+    assert [len(chunk.split()) for chunk in from_bytes] == [500, 500, 200]
+    assert extract_and_chunk(b"", "empty.txt") == []
+
+
+def test_spooled_path_matches_bytes():
+    data = " ".join(f"word{i}" for i in range(700)).encode("utf-8")
+
+    path = spool_to_disk(io.BytesIO(data), "upload.txt")
+    try:
+        assert path.endswith(".txt")
+        assert extract_and_chunk(path, "upload.txt") == extract_and_chunk(data, "upload.txt")
+    finally:
+        os.remove(path)
@@ -0,0 +1,47 @@
+"""Tests for the literal (quoted phrase / filename) query shortcut."""
+
+import numpy as np
+import pytest
+
+from vector_store import vector_index
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "vectors")
+    monkeypatch.setattr(vector_index, "VECTOR_DB_PATH", db_path)
+    vector_index.add_documents_to_index(
+        "notes",
+        ["the quick brown fox", "lazy dogs sleep", "a quick recap"],
+        np.eye(3, dtype=np.float32),
+        [{"source": "fox.txt"}, {"source": "dogs.md"}, {"source": "fox.txt"}],
+        ["a-0", "b-0", "a-1"],
+        db_path,
+    )
+    return db_path
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [('"quick brown"', True), ("report.PDF", True), ("what do foxes eat?", False), ('say "hi" twice', False)],
+)
+def test_is_literal_query(query, expected):
+    assert vector_index.is_literal_query(query) is expected
+
+
+def test_quoted_phrase_matches_documents(store):
+    results = vector_index.literal_lookup(["notes"], '"quick"', store)
+
+    assert sorted(results["ids"][0]) == ["a-0", "a-1"]
+    assert results["distances"][0] == [0.0, 0.0]
+
+
+def test_filename_matches_source(store):
+    results = vector_index.literal_lookup(["notes"], "dogs.md", store)
+
+    assert results["documents"][0] == ["lazy dogs sleep"]
+
+
+def test_no_match_falls_back(store):
+    assert vector_index.literal_lookup(["notes"], '"zebra"', store) is None
+    assert vector_index.literal_lookup(["notes"], "plain question", store) is None
@@ -0,0 +1,106 @@
+"""Tests for the ASGI observability middleware."""
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api.middleware.mcp_error_handler import mcp_http_exception_handler
+from api.middleware.observability import ObservabilityMiddleware
+from api.models import mcp_errors
+
+
+def _client():
+    app = FastAPI()
+    app.add_middleware(ObservabilityMiddleware)
+    app.add_exception_handler(HTTPException, mcp_http_exception_handler)
+
+    @app.get("/ok")
+    async def ok():
+        return {"status": "ok"}
+
+    @app.get("/missing")
+    async def missing():
+        raise HTTPException(status_code=404, detail="Corpus 7 not found")
+
+    @app.get("/unavailable")
+    async def unavailable():
+        raise HTTPException(status_code=503, detail="Index is rebuilding")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_error_responses_get_mcp_code():
+    client = _client()
+
+    ok = client.get("/ok")
+    assert ok.status_code == 200
+    assert "x-mcp-error-code" not in ok.headers
+
+    missing = client.get("/missing")
+    assert missing.status_code == 404
+    assert missing.json() == {"detail": "Corpus 7 not found"}
+    assert missing.headers["x-mcp-error-code"] == "resource.corpus_not_found"
+
+    boom = client.get("/boom")
+    assert boom.status_code == 500
+    assert boom.headers["x-mcp-error-code"] == "server.internal_error"
+    assert boom.headers["content-type"] == "application/json"
+    assert boom.json() == {"detail": "Internal server error", "error_code": "server.internal_error"}
+
+
+def test_request_log_masks_api_key(caplog):
+    client = _client()
+
+    with caplog.at_level("INFO", logger="api.middleware.observability"):
+        client.get("/missing", headers={"X-API-Key": "km_secret_1234"})
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("API Key: ***1234" in message for message in messages)
+    assert any("← GET /missing | Status: 404" in message for message in messages)
+    assert not any("km_secret" in message for message in messages)
+
+
+def test_responses_without_detail_use_status_code():
+    client = _client()
+
+    response = client.get("/does-not-exist")
+
+    assert response.status_code == 404
+    assert response.headers["x-mcp-error-code"] == "resource.collection_not_found"
+
+
+def test_error_codes_are_added_when_logging_is_quiet(caplog):
+    client = _client()
+
+    with caplog.at_level("ERROR", logger="api.middleware.observability"):
+        response = client.get("/missing", headers={"X-API-Key": "km_secret_1234"})
+
+    assert response.headers["x-mcp-error-code"] == "resource.corpus_not_found"
+    assert not caplog.records
+
+    # Handled server errors are still logged at ERROR
+    with caplog.at_level("ERROR", logger="api.middleware.observability"):
+        client.get("/unavailable")
+
+    assert len(caplog.records) == 1
+    assert caplog.records[0].getMessage().startswith("Server error: GET /unavailable | Status: 503")
+
+
+def test_long_error_details_bypass_the_code_cache():
+    mcp_errors._classify_error_cached.cache_clear()
+    long_detail = "Corpus " + "x" * 300 + " not found"
+
+    assert mcp_errors.to_mcp_error_code(404, long_detail) == mcp_errors.MCPErrorCode.CORPUS_NOT_FOUND
+    assert mcp_errors.to_mcp_error_code(404, "Corpus 7 not found") == mcp_errors.MCPErrorCode.CORPUS_NOT_FOUND
+    assert mcp_errors._classify_error_cached.cache_info().currsize == 1
+
+
+def test_retry_guidance_accepts_members_and_header_values():
+    by_member = mcp_errors.get_retry_guidance(mcp_errors.MCPErrorCode.RATE_LIMIT_EXCEEDED)
+
+    assert mcp_errors.get_retry_guidance("rate_limit.exceeded") is by_member
+    assert by_member["backoff_strategy"] == "exponential"
+    assert mcp_errors.get_retry_guidance("no.such_code")["guidance"] == "Retry with caution"
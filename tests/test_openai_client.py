@@ -0,0 +1,174 @@
+"""Tests for the throttled, retrying OpenAI embeddings wrapper."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+from openai import BadRequestError, RateLimitError
+
+from api import openai_client
+
+
+def _rate_limit_error(headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiter(monkeypatch):
+    # Rate-limit errors slow the shared limiter down; keep that from leaking across tests
+    monkeypatch.setattr(openai_client, "limiter", openai_client.AsyncLimiter(openai_client.OPENAI_RPM, 60))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(openai_client.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def test_retry_honors_retry_after(monkeypatch, sleeps):
+    calls = []
+
+    async def flaky_batch(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise _rate_limit_error({"retry-after": "7"})
+        return np.ones((len(texts), 1), dtype=np.float32)
+
+    monkeypatch.setattr(openai_client, "aget_openai_embeddings_batch", flaky_batch)
+
+    result = asyncio.run(openai_client.embeddings_with_retry(["a", "b"]))
+
+    assert result.tolist() == [[1.0], [1.0]]
+    assert len(calls) == 2
+    assert sleeps == [7.0]
+
+
+def test_retry_gives_up_after_attempts(monkeypatch, sleeps):
+    async def always_limited(texts):
+        raise _rate_limit_error()
+
+    monkeypatch.setattr(openai_client, "aget_openai_embeddings_batch", always_limited)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(openai_client.embeddings_with_retry(["a"], attempts=3))
+    assert len(sleeps) == 2
+
+
+def test_limiter_waits_when_bucket_is_empty(monkeypatch):
+    clock = [1000.0]
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        clock[0] += delay
+
+    monkeypatch.setattr(openai_client, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(openai_client.asyncio, "sleep", fake_sleep)
+    limiter = openai_client.AsyncLimiter(2, 60)
+
+    async def take(n):
+        for _ in range(n):
+            async with limiter:
+                pass
+
+    asyncio.run(take(2))
+    assert sleeps == []
+    asyncio.run(take(1))
+    assert sleeps == [pytest.approx(30.0)]
+
+
+def test_limiter_backs_off_and_recovers():
+    limiter = openai_client.AsyncLimiter(64, 60)
+
+    limiter.backoff()
+    assert limiter.rate == 32
+    for _ in range(10):
+        limiter.backoff()
+    assert limiter.rate == 4
+
+    limiter.recover()
+    assert limiter.rate == pytest.approx(10.0)
+    for _ in range(200):
+        limiter.recover()
+    assert limiter.rate == pytest.approx(64)
+
+
+def test_deduper_embeds_shared_chunks_once(monkeypatch):
+    requested = []
+
+    async def fake_batch(texts):
+        requested.append(list(texts))
+        await asyncio.sleep(0)
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(openai_client, "aget_openai_embeddings_batch", fake_batch)
+
+    async def run():
+        deduper = openai_client.EmbeddingDeduper()
+        return await asyncio.gather(
+            deduper.embed(["header", "alpha", "header"]),
+            deduper.embed(["header", "beta!"]),
+        )
+
+    first, second = asyncio.run(run())
+
+    assert sorted(text for call in requested for text in call) == ["alpha", "beta!", "header"]
+    assert first[:, 0].tolist() == [6.0, 5.0, 6.0]
+    assert second[:, 0].tolist() == [6.0, 5.0]
+
+
+def test_batches_respect_count_and_char_limits(monkeypatch):
+    monkeypatch.setattr(openai_client, "EMBEDDING_BATCH_SIZE", 3)
+    monkeypatch.setattr(openai_client, "EMBEDDING_BATCH_MAX_CHARS", 10)
+
+    batches = openai_client._batches(["aaaa", "bbbb", "ccc", "d", "e", "f", "g" * 20, "h"])
+
+    assert batches == [["aaaa", "bbbb"], ["ccc", "d", "e"], ["f"], ["g" * 20], ["h"]]
+
+
+def test_oversized_batch_is_split(monkeypatch):
+    requested = []
+
+    async def token_limited(texts):
+        requested.append(len(texts))
+        if len(texts) > 2:
+            request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+            response = httpx.Response(400, request=request)
+            raise BadRequestError("Requested 400000 tokens, max 300000 tokens per request", response=response, body=None)
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(openai_client, "aget_openai_embeddings_batch", token_limited)
+
+    result = asyncio.run(openai_client.embeddings_with_retry(["a", "bb", "ccc", "dddd", "eeeee"]))
+
+    assert result[:, 0].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert requested == [5, 2, 3, 1, 2]
+
+
+def test_sub_batches_are_in_flight_together(monkeypatch):
+    monkeypatch.setattr(openai_client, "EMBEDDING_BATCH_SIZE", 2)
+    in_flight = []
+    peak = []
+
+    async def slow_batch(texts):
+        in_flight.append(texts)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(texts)
+        return np.array([[float(len(text))] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(openai_client, "aget_openai_embeddings_batch", slow_batch)
+
+    result = asyncio.run(openai_client.embeddings_with_retry(["a", "bb", "ccc", "dddd", "eeeee"]))
+
+    assert result[:, 0].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert max(peak) == 3
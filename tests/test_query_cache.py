@@ -0,0 +1,108 @@
+"""Tests for the in-memory semantic query cache."""
+
+import time
+
+import numpy as np
+import pytest
+
+from vector_store.query_cache import SemanticCache
+
+SCOPE = ("/tmp/vectors/alice", "docs")
+
+
+def _unit(*values):
+    vec = np.array(values, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def test_exact_hit_ignores_case_and_whitespace():
+    cache = SemanticCache(maxsize=4, ttl=60, threshold=0.95)
+    cache.put(SCOPE, "What is RAG?", _unit(1, 0, 0), {"ids": [["a"]]})
+
+    assert cache.get(SCOPE, "  what   is rag? ") == {"ids": [["a"]]}
+    assert cache.get(("/tmp/vectors/bob", "docs"), "What is RAG?") is None
+
+
+def test_semantic_hit_respects_threshold():
+    cache = SemanticCache(maxsize=4, ttl=60, threshold=0.95)
+    cache.put(SCOPE, "first", _unit(1, 0, 0), {"ids": [["a"]]})
+    cache.put(SCOPE, "second", _unit(0, 1, 0), {"ids": [["b"]]})
+
+    assert cache.get_similar(SCOPE, _unit(0.05, 1, 0)) == {"ids": [["b"]]}
+    assert cache.get_similar(SCOPE, _unit(1, 1, 0)) is None
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    cache = SemanticCache(maxsize=2, ttl=10, threshold=0.95)
+    cache.put(SCOPE, "one", _unit(1, 0, 0), {"n": 1})
+    cache.put(SCOPE, "two", _unit(0, 1, 0), {"n": 2})
+    cache.get(SCOPE, "one")
+    cache.put(SCOPE, "three", _unit(0, 0, 1), {"n": 3})
+
+    assert cache.get(SCOPE, "two") is None
+    assert cache.get(SCOPE, "one") == {"n": 1}
+
+    now = time.monotonic()
+    monkeypatch.setattr("vector_store.query_cache.time.monotonic", lambda: now + 11)
+    assert cache.get(SCOPE, "one") is None
+    assert cache.get_similar(SCOPE, _unit(0, 0, 1)) is None
+
+
+def test_invalidate_drops_only_matching_store():
+    cache = SemanticCache(maxsize=4, ttl=60, threshold=0.95)
+    other = ("/tmp/vectors/bob", None)
+    cache.put(SCOPE, "q", _unit(1, 0, 0), {"n": 1})
+    cache.put(other, "q", _unit(1, 0, 0), {"n": 2})
+
+    cache.invalidate("/tmp/vectors/alice")
+
+    assert cache.get(SCOPE, "q") is None
+    assert cache.get(other, "q") == {"n": 2}
+
+
+def test_put_after_invalidate_is_dropped():
+    cache = SemanticCache(maxsize=4, ttl=60, threshold=0.95)
+    generation = cache.generation(SCOPE[0])
+    assert cache.get_similar(SCOPE, _unit(1, 0, 0)) is None
+
+    # An upload lands while the search is still running
+    cache.invalidate(SCOPE[0])
+    cache.put(SCOPE, "q", _unit(1, 0, 0), {"n": 1}, generation)
+
+    assert cache.get(SCOPE, "q") is None
+    assert cache.get_similar(SCOPE, _unit(1, 0, 0)) is None
+
+    cache.put(SCOPE, "q", _unit(1, 0, 0), {"n": 2}, cache.generation(SCOPE[0]))
+    assert cache.get(SCOPE, "q") == {"n": 2}
+
+
+def test_matrix_compacts_after_evictions():
+    cache = SemanticCache(maxsize=8, ttl=60, threshold=0.95)
+    rng = np.random.default_rng(0)
+    vectors = [_unit(*rng.standard_normal(16)) for _ in range(100)]
+    for i, vec in enumerate(vectors):
+        cache.put(SCOPE, f"query {i}", vec, {"n": i})
+
+    index = cache._scopes[SCOPE]
+    assert index.matrix.dtype == np.float32
+    assert index.matrix.shape[0] < 100
+    assert len(index.rows) == 8
+    assert cache.get_similar(SCOPE, vectors[-1]) == {"n": 99}
+    assert cache.get_similar(SCOPE, vectors[0]) is None
+
+
+def test_numba_kernel_matches_blas():
+    from vector_store import query_cache as module
+
+    if not module.NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+
+    rng = np.random.default_rng(1)
+    matrix = rng.standard_normal((2000, 32)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = matrix[1234].copy()
+
+    row, sim = module._best_match(matrix, query, module._NUMBA_TILE_ROWS)
+
+    assert row == int((matrix @ query).argmax()) == 1234
+    assert sim == pytest.approx(1.0, abs=1e-4)
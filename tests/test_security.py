@@ -9,6 +9,7 @@ from fastapi.testclient import TestClient
 
 from api.app import app
 from api import users
+from api.models.requests import UserCredentials
 from api.validation import validate_username, validate_collection_name, sanitize_path_component
 from config import AUTH_RATE_LIMIT
 
@@ -62,6 +63,17 @@ def test_strong_password_accepted(client, test_db):
     assert "api_key" in response.json()
 
 
+def test_password_truncated_to_bcrypt_limit():
+    """Passwords are cut to bcrypt's 72 bytes without splitting a character."""
+    ascii_creds = UserCredentials(username="alice", password="A" * 100)
+    assert ascii_creds.password == "A" * 72
+
+    # 1 + 35 * 2 bytes = 71; the next two-byte character would straddle the limit
+    unicode_creds = UserCredentials(username="alice", password="A" + "é" * 40)
+    assert unicode_creds.password == "A" + "é" * 35
+    assert len(unicode_creds.password.encode("utf-8")) == 71
+
+
 # === Collection Name Validation Tests ===
 
 
@@ -331,6 +343,13 @@ class TestUsernameValidation:
         with pytest.raises(HTTPException):
             validate_username("user\x00admin")
 
+    def test_trailing_newline_blocked(self):
+        """A trailing newline must not slip past the pattern's end anchor."""
+        with pytest.raises(HTTPException):
+            validate_username("alice\n")
+        with pytest.raises(HTTPException):
+            validate_collection_name("research\n")
+
     def test_reserved_names_blocked(self):
         """Reserved system names should be blocked."""
         reserved = ["admin", "root", "system", "api", "ADMIN", "Root"]
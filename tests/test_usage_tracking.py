@@ -0,0 +1,49 @@
+"""Tests for batched usage logging."""
+
+from api import usage_tracking
+
+
+def test_queued_usage_is_written_in_batches(corpus_pool):
+    for _ in range(5):
+        usage_tracking.log_corpus_usage(user_id=1, corpus_id=2, action="query", metadata={"n": 3})
+    usage_tracking.log_corpus_usage(user_id=1, corpus_id=2, action="upload", query_count=0)
+    usage_tracking.flush_usage_logs()
+
+    stats = usage_tracking.get_corpus_usage_stats(2)
+    assert stats["total_actions"] == 6
+    assert stats["total_queries"] == 5
+    assert stats["unique_users"] == 1
+
+
+def test_full_queue_drops_rows_without_raising(monkeypatch, caplog):
+    monkeypatch.setattr(usage_tracking, "_ensure_flusher", lambda: None)
+    monkeypatch.setattr(usage_tracking, "_usage_queue", usage_tracking.queue.Queue(maxsize=1))
+
+    usage_tracking.log_corpus_usage(user_id=1, corpus_id=2, action="query")
+    with caplog.at_level("WARNING", logger="api.usage_tracking"):
+        usage_tracking.log_corpus_usage(user_id=1, corpus_id=2, action="query")
+
+    assert usage_tracking._usage_queue.qsize() == 1
+    assert any("queue full" in record.getMessage() for record in caplog.records)
+
+
+def test_recent_logs_round_trip_metadata(corpus_pool):
+    with corpus_pool.writer() as conn:
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT)")
+        conn.execute("INSERT INTO users (id, username) VALUES (1, 'alice')")
+        conn.execute(
+            "INSERT INTO corpuses (id, name, display_name, owner_id, created_at, updated_at) "
+            "VALUES (2, 'legal', 'Legal', 1, 0, 0)"
+        )
+
+    usage_tracking.log_corpus_usage(user_id=1, corpus_id=2, action="query", metadata={"query_length": 12})
+    usage_tracking.flush_usage_logs()
+
+    (log,) = usage_tracking.get_recent_usage_logs(user_id=1)
+    assert log["metadata"] == {"query_length": 12}
+    assert (log["username"], log["corpus_name"]) == ("alice", "legal")
+
+    assert usage_tracking.get_recent_usage_logs() == [log]
+    assert usage_tracking.get_recent_usage_logs(corpus_id=2) == [log]
+    assert usage_tracking.get_recent_usage_logs(user_id=1, corpus_id=2) == [log]
+    assert usage_tracking.get_recent_usage_logs(user_id=1, corpus_id=3) == []
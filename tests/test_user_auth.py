@@ -1,5 +1,6 @@
 """Tests for user registration and API key generation."""
 
+import hashlib
 import sqlite3
 import pytest
 from fastapi.testclient import TestClient
@@ -113,3 +114,88 @@ def test_expired_api_keys_are_rejected(setup_test_db):
     conn.close()
 
     assert users.get_user_by_api_key(api_key) is None
+
+    # Expired keys are left for the periodic purge
+    users.purge_expired_api_keys()
+    conn = sqlite3.connect(users.DB_PATH)
+    assert conn.execute("SELECT COUNT(*) FROM api_keys").fetchone()[0] == 0
+    conn.close()
+
+
+def test_api_key_lookup_is_cached_until_revoked(setup_test_db, monkeypatch):
+    client = TestClient(app)
+    password = "CachedPass!67"
+    api_key = client.post(
+        "/api/user/register", json={"username": "dave", "password": password}
+    ).json()["api_key"]
+
+    user = users.get_user_by_api_key(api_key)
+    assert user["username"] == "dave"
+
+    # Served from the cache without touching the database
+    with monkeypatch.context() as patched:
+        patched.setattr(users, "_pool", lambda: pytest.fail("cached lookup hit the database"))
+        assert users.get_user_by_api_key(api_key) == user
+
+    conn = sqlite3.connect(users.DB_PATH)
+    key_id = conn.execute("SELECT id FROM api_keys").fetchone()[0]
+    conn.close()
+    assert users.revoke_api_key_for_user(user["id"], key_id)
+    assert users.get_user_by_api_key(api_key) is None
+
+
+def test_api_key_lookup_creates_user_dir_once(setup_test_db, monkeypatch):
+    client = TestClient(app)
+    api_key = client.post(
+        "/api/user/register", json={"username": "erin", "password": "DirOncePass!89"}
+    ).json()["api_key"]
+
+    # Even after the lookup cache expires, the directory is not re-created
+    users._api_key_cache.clear()
+    with monkeypatch.context() as patched:
+        patched.setattr(users.Path, "mkdir", lambda *a, **k: pytest.fail("directory re-created"))
+        user = users.get_user_by_api_key(api_key)
+    assert user["username"] == "erin"
+
+
+def test_init_db_migrates_legacy_api_keys(tmp_path, monkeypatch):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "username TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE api_keys (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "key_hash TEXT UNIQUE NOT NULL, user_id INTEGER NOT NULL)"
+    )
+    conn.execute("INSERT INTO users (username, password_hash) VALUES ('old', 'x')")
+    conn.execute(
+        "INSERT INTO api_keys (key_hash, user_id) VALUES (?, 1)",
+        (hashlib.sha256(b"legacy-key").hexdigest(),),
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(users, "DB_PATH", str(db_path))
+    users.init_db()
+
+    conn = sqlite3.connect(db_path)
+    key_hash, created_at, expires_at = conn.execute(
+        "SELECT key_hash, created_at, expires_at FROM api_keys"
+    ).fetchone()
+    user_columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+    conn.close()
+    assert key_hash == users._hash_api_key("legacy-key")
+    assert expires_at - int(created_at) == users.API_KEY_TTL_SECONDS
+    assert {"cognito_sub", "email"} <= user_columns
+
+
+def test_cognito_user_gets_next_free_username(setup_test_db):
+    for sub, name in [("sub-a", "carol"), ("sub-b", "carol"), ("sub-c", "carol_x")]:
+        users.get_or_create_cognito_user(sub, name)
+
+    user = users.get_or_create_cognito_user("sub-d", "carol")
+    assert user["username"] == "carol_2"
+    # The same Cognito account maps back to the same user
+    assert users._get_or_create_cognito_user("sub-d", "carol", "") == user
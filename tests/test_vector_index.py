@@ -0,0 +1,33 @@
+"""Tests for multi-collection query aggregation."""
+
+import asyncio
+
+import numpy as np
+
+from vector_store import vector_index
+
+
+def test_multiple_indexes_merge_by_distance(monkeypatch):
+    per_collection = {
+        "alpha": {"ids": [["a1", "a2"]], "documents": [["A1", "A2"]], "metadatas": [[{"c": "a"}, {"c": "a"}]], "distances": [[0.3, 0.9]]},
+        "beta": {"ids": [["b1"]], "documents": [["B1"]], "metadatas": [[{"c": "b"}]], "distances": [[0.1]]},
+        "empty": {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]},
+    }
+    monkeypatch.setattr(
+        vector_index, "query_index_vec", lambda name, *args, **kwargs: per_collection[name]
+    )
+
+    merged = asyncio.run(
+        vector_index.query_multiple_indexes_vec(list(per_collection), np.zeros(3, dtype=np.float32))
+    )
+
+    assert merged == {
+        "ids": [["b1", "a1", "a2"]],
+        "documents": [["B1", "A1", "A2"]],
+        "metadatas": [[{"c": "b"}, {"c": "a"}, {"c": "a"}]],
+        "distances": [[0.1, 0.3, 0.9]],
+    }
+
+    monkeypatch.setattr(vector_index, "query_index_vec", lambda *args, **kwargs: per_collection["empty"])
+    empty = asyncio.run(vector_index.query_multiple_indexes_vec(["empty"], np.zeros(3)))
+    assert empty == {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
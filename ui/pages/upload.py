@@ -21,18 +21,13 @@ if uploaded_files:
         size_kb = len(uf.getvalue()) / 1024
         with st.expander(f"{uf.name} ({size_kb:.1f} KB)"):
             try:
-                import tempfile
-                from pathlib import Path
                 import sys
 
                 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-                from ingestion.file_loader import extract_text_from_file
+                from ingestion.file_loader import extract_text_from_bytes
 
-                with tempfile.NamedTemporaryFile(delete=False, suffix=uf.name) as tmp:
-                    tmp.write(uf.getvalue())
-                    tmp_path = Path(tmp.name)
-                text = extract_text_from_file(tmp_path)
-                os.remove(tmp_path)
+                # The upload is already in memory; no temp file round trip
+                text = extract_text_from_bytes(uf.getvalue(), uf.name)
                 preview = text[:500]
                 if preview:
                     st.text_area("Preview", preview, height=200)
@@ -0,0 +1,143 @@
+"""Persistent SQLite cache of embedding vectors keyed by content hash.
+
+Re-uploaded documents and corpora that share text skip the embeddings API
+entirely. Vectors are stored as raw float32 bytes; the least recently used rows
+are evicted once the table grows past ``EMBED_CACHE_MAX_ENTRIES``.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from config import EMBED_CACHE_MAX_ENTRIES, EMBED_CACHE_PATH, OPENAI_EMBEDDING_MODEL
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Stay under SQLite's bound-parameter limit on older builds (999)
+_SQL_BATCH_SIZE = 500
+
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_row_count = 0
+_lock = threading.Lock()
+
+
+def _content_key(text: str, model: str) -> bytes:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Return the shared connection for the current ``EMBED_CACHE_PATH``, creating it if needed."""
+    global _conn, _conn_path, _row_count
+    path = str(EMBED_CACHE_PATH)
+    if _conn is None or _conn_path != path:
+        _close_locked()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                h BLOB PRIMARY KEY,
+                vec BLOB NOT NULL,
+                last_used INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_used ON cache(last_used)")
+        conn.commit()
+        _row_count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        _conn, _conn_path = conn, path
+    return _conn
+
+
+def get_cached_embeddings(
+    texts: Sequence[str], model: str = OPENAI_EMBEDDING_MODEL
+) -> List[Optional[np.ndarray]]:
+    """Return a cached float32 vector for each text, or None where there is none."""
+    if EMBED_CACHE_MAX_ENTRIES <= 0 or not texts:
+        return [None] * len(texts)
+
+    keys = [_content_key(text, model) for text in texts]
+    found: dict[bytes, bytes] = {}
+    try:
+        with _lock:
+            conn = _get_conn()
+            for start in range(0, len(keys), _SQL_BATCH_SIZE):
+                batch = keys[start : start + _SQL_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                found.update(
+                    conn.execute(
+                        f"SELECT h, vec FROM cache WHERE h IN ({placeholders})", batch
+                    ).fetchall()
+                )
+            if found:
+                now = int(time.time())
+                conn.executemany(
+                    "UPDATE cache SET last_used = ? WHERE h = ?", [(now, h) for h in found]
+                )
+                conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Embedding cache lookup failed, embedding everything: {e}")
+        return [None] * len(texts)
+
+    if found:
+        logger.debug(f"Embedding cache hit for {len(found)}/{len(keys)} texts")
+    return [np.frombuffer(found[key], dtype=np.float32) if key in found else None for key in keys]
+
+
+def store_embeddings(
+    texts: Sequence[str], vectors: np.ndarray, model: str = OPENAI_EMBEDDING_MODEL
+) -> None:
+    """Persist ``vectors`` for ``texts`` and evict the least recently used overflow."""
+    global _row_count
+    if EMBED_CACHE_MAX_ENTRIES <= 0 or not texts:
+        return
+
+    now = int(time.time())
+    rows = [
+        (_content_key(text, model), np.asarray(vec, dtype=np.float32).tobytes(), now)
+        for text, vec in zip(texts, vectors)
+    ]
+    try:
+        with _lock:
+            conn = _get_conn()
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache (h, vec, last_used) VALUES (?, ?, ?)", rows
+            )
+            _row_count += conn.total_changes - before
+
+            if _row_count > EMBED_CACHE_MAX_ENTRIES:
+                # Evict down to 90% so eviction runs once per batch of inserts, not every time
+                excess = _row_count - int(EMBED_CACHE_MAX_ENTRIES * 0.9)
+                cur = conn.execute(
+                    "DELETE FROM cache WHERE h IN "
+                    "(SELECT h FROM cache ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+                _row_count -= cur.rowcount
+            conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to store embeddings in cache: {e}")
+
+
+def _close_locked() -> None:
+    global _conn, _conn_path
+    if _conn is not None:
+        _conn.close()
+    _conn = None
+    _conn_path = None
+
+
+def close() -> None:
+    """Close the cache connection (it is reopened on next use)."""
+    with _lock:
+        _close_locked()
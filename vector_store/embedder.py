@@ -1,28 +1,81 @@
 """Utilities for generating text embeddings using OpenAI."""
 
 from typing import List
-from openai import OpenAI
 
-from config import OPENAI_API_KEY, OPENAI_EMBEDDING_MODEL
+import numpy as np
+from openai import AsyncOpenAI, OpenAI
+
+from config import EMBEDDING_BATCH_SIZE, OPENAI_API_KEY, OPENAI_EMBEDDING_MODEL
 from logging_config import get_logger
 
 logger = get_logger(__name__)
 
 # Initialize OpenAI client (v1.x pattern)
 client = OpenAI(api_key=OPENAI_API_KEY)
+# Native async client so the event loop drives HTTP without a thread hand-off
+async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
 
-def get_openai_embedding(text: str, model: str = OPENAI_EMBEDDING_MODEL) -> List[float]:
-    """Return the embedding vector for ``text`` from the OpenAI API."""
+def get_openai_embedding(text: str, model: str = OPENAI_EMBEDDING_MODEL) -> np.ndarray:
+    """Return the float32 embedding vector for ``text`` from the OpenAI API."""
     text_preview = text[:50] + "..." if len(text) > 50 else text
     logger.debug(f"Generating embedding for text: {text_preview} (model: {model})")
 
     try:
         response = client.embeddings.create(input=text, model=model)
-        embedding = response.data[0].embedding
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
         logger.debug(f"Successfully generated embedding (dimension: {len(embedding)})")
         return embedding
     except Exception as e:
         # Catch all OpenAI errors (RateLimitError, APIError, etc.)
         logger.error(f"Error generating embedding: {e}", exc_info=True)
         raise
+
+
+def get_openai_embeddings_batch(
+    texts: List[str], model: str = OPENAI_EMBEDDING_MODEL
+) -> np.ndarray:
+    """Return an ``(len(texts), D)`` float32 array of embeddings for ``texts``.
+
+    Inputs are sent in sub-batches of ``EMBEDDING_BATCH_SIZE`` so a large document
+    costs one round-trip per batch instead of one per chunk. Rows are returned
+    in the same order as ``texts``.
+    """
+    embeddings = np.empty((0, 0), dtype=np.float32)
+    for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        batch = texts[start : start + EMBEDDING_BATCH_SIZE]
+        logger.debug(f"Generating {len(batch)} embeddings in one request (model: {model})")
+
+        try:
+            response = client.embeddings.create(input=batch, model=model)
+        except Exception as e:
+            logger.error(f"Error generating batch embeddings: {e}", exc_info=True)
+            raise
+
+        rows = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        if start == 0:
+            # Allocate once, sized from the first response, and fill by slice
+            embeddings = np.empty((len(texts), len(rows[0])), dtype=np.float32)
+        embeddings[start : start + len(rows)] = rows
+
+    logger.debug(f"Successfully generated {len(embeddings)} embeddings")
+    return embeddings
+
+
+async def aget_openai_embeddings_batch(
+    texts: List[str], model: str = OPENAI_EMBEDDING_MODEL
+) -> np.ndarray:
+    """Async variant of :func:`get_openai_embeddings_batch` for a single request.
+
+    ``texts`` must fit in one request (at most ``EMBEDDING_BATCH_SIZE`` inputs);
+    callers that need splitting do it themselves.
+    """
+    logger.debug(f"Generating {len(texts)} embeddings in one async request (model: {model})")
+    try:
+        response = await async_client.embeddings.create(input=texts, model=model)
+    except Exception as e:
+        logger.error(f"Error generating batch embeddings: {e}", exc_info=True)
+        raise
+
+    rows = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+    return np.asarray(rows, dtype=np.float32)
@@ -0,0 +1,239 @@
+"""In-memory LRU cache for query results with an exact and a semantic tier."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+from config import QUERY_CACHE_SIMILARITY, QUERY_CACHE_SIZE, QUERY_CACHE_TTL_SECONDS
+
+# Rebuild a scope's matrix once at least this many rows are dead and they outnumber live rows
+_COMPACT_MIN_DEAD_ROWS = 32
+
+# Below this many rows a single BLAS matvec beats the Numba kernel's dispatch overhead
+_NUMBA_MIN_ROWS = 1024
+_NUMBA_TILE_ROWS = 256
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _best_match(matrix, query, tile_rows):
+        """Return ``(row, similarity)`` of the best row, scanning tiles in parallel.
+
+        Each thread reduces its own tile to a single best row, so misses never
+        materialize the full similarity vector.
+        """
+        n_rows, dim = matrix.shape
+        n_tiles = (n_rows + tile_rows - 1) // tile_rows
+        tile_best = np.full(n_tiles, -2.0, dtype=np.float32)
+        tile_row = np.zeros(n_tiles, dtype=np.int64)
+        for tile in prange(n_tiles):
+            start = tile * tile_rows
+            stop = min(start + tile_rows, n_rows)
+            for row in range(start, stop):
+                sim = np.float32(0.0)
+                for col in range(dim):
+                    sim += matrix[row, col] * query[col]
+                if sim > tile_best[tile]:
+                    tile_best[tile] = sim
+                    tile_row[tile] = row
+        best = np.argmax(tile_best)
+        return tile_row[best], tile_best[best]
+
+
+def normalize_query(query_text: str) -> str:
+    """Return ``query_text`` lowercased with whitespace collapsed."""
+    return " ".join(query_text.lower().split())
+
+
+def _unit_vector(embedding: Sequence[float]) -> np.ndarray:
+    vec = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+class _ScopeMatrix:
+    """L2-normalized float32 embeddings of the cached queries in one scope.
+
+    Rows are appended on insert; removed rows are zeroed and compacted away in bulk
+    so a lookup is a single ``matrix @ query`` product.
+    """
+
+    def __init__(self):
+        self.matrix: Optional[np.ndarray] = None
+        self.keys: List[Optional[str]] = []
+        self.rows: Dict[str, int] = {}
+        self.dead = 0
+
+    def add(self, key: str, vec: np.ndarray) -> None:
+        if key in self.rows:
+            self.remove(key)
+        self.rows[key] = len(self.keys)
+        self.keys.append(key)
+        row = vec[np.newaxis, :]
+        self.matrix = row if self.matrix is None else np.vstack([self.matrix, row])
+
+    def remove(self, key: str) -> None:
+        row = self.rows.pop(key)
+        self.keys[row] = None
+        self.matrix[row] = 0.0
+        self.dead += 1
+        if self.dead >= _COMPACT_MIN_DEAD_ROWS and self.dead * 2 > len(self.keys):
+            self._compact()
+
+    def similarities(self, query: np.ndarray) -> np.ndarray:
+        return self.matrix @ query
+
+    def _compact(self) -> None:
+        live = [row for row, key in enumerate(self.keys) if key is not None]
+        self.matrix = np.ascontiguousarray(self.matrix[live])
+        self.keys = [self.keys[row] for row in live]
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.dead = 0
+
+
+class SemanticCache:
+    """LRU + TTL cache mapping queries to vector search results.
+
+    Entries live in a *scope*, a tuple whose first element is the vector store
+    ``db_path`` (e.g. ``(db_path, collections)``), so results are never shared
+    between users or collection sets and can be invalidated per store. Lookups
+    first try an exact match on the normalized query text; on a miss, callers
+    embed the query and try :meth:`get_similar`, which returns the results of the
+    most similar cached query whose cosine similarity is at least ``threshold``.
+
+    Each ``db_path`` also has a generation counter that :meth:`invalidate` bumps.
+    Callers read it with :meth:`generation` before searching and hand it to
+    :meth:`put`, so results computed before a concurrent write are not cached.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = QUERY_CACHE_SIZE,
+        ttl: float = QUERY_CACHE_TTL_SECONDS,
+        threshold: float = QUERY_CACHE_SIMILARITY,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        # (scope, normalized query) -> (results, expires_at)
+        self._entries: "OrderedDict[tuple, tuple[dict, float]]" = OrderedDict()
+        self._scopes: Dict[tuple, _ScopeMatrix] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, scope: tuple, query_text: str) -> Optional[dict]:
+        """Return cached results for an exact (normalized) query match."""
+        key = (scope, normalize_query(query_text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def get_similar(self, scope: tuple, embedding: Sequence[float]) -> Optional[dict]:
+        """Return cached results for the closest query in ``scope`` above the threshold."""
+        query = _unit_vector(embedding)
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None:
+                return None
+
+            if NUMBA_AVAILABLE and len(index.keys) >= _NUMBA_MIN_ROWS:
+                row, sim = _best_match(index.matrix, query, _NUMBA_TILE_ROWS)
+                if sim < self.threshold:
+                    return None
+                results = self._live_results(scope, index.keys[row])
+                if results is not None:
+                    return results
+                # Best row was dead or expired; rank the remaining candidates below
+
+            sims = index.similarities(query)
+            candidates = np.flatnonzero(sims >= self.threshold)
+            for row in candidates[np.argsort(-sims[candidates])]:
+                results = self._live_results(scope, index.keys[row])
+                if results is not None:
+                    return results
+            return None
+
+    def generation(self, db_path: str) -> int:
+        """Return the invalidation counter for ``db_path``."""
+        with self._lock:
+            return self._generations.get(db_path, 0)
+
+    def put(
+        self,
+        scope: tuple,
+        query_text: str,
+        embedding: Sequence[float],
+        results: dict,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Store ``results`` for ``query_text`` in ``scope``, evicting the oldest entries.
+
+        If ``generation`` is given and ``scope``'s store has been invalidated since
+        it was read, the results may predate that write and are dropped.
+        """
+        if self.maxsize <= 0:
+            return
+        query_key = normalize_query(query_text)
+        key = (scope, query_key)
+        with self._lock:
+            if generation is not None and generation != self._generations.get(scope[0], 0):
+                return
+            self._entries[key] = (results, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._scopes.setdefault(scope, _ScopeMatrix()).add(query_key, _unit_vector(embedding))
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, db_path: str) -> None:
+        """Drop every entry whose scope belongs to ``db_path``."""
+        with self._lock:
+            self._generations[db_path] = self._generations.get(db_path, 0) + 1
+            for scope in [scope for scope in self._scopes if scope[0] == db_path]:
+                for query_key in self._scopes.pop(scope).rows:
+                    del self._entries[(scope, query_key)]
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+            self._generations.clear()
+
+    def _live_results(self, scope: tuple, query_key: Optional[str]) -> Optional[dict]:
+        """Return and touch the entry for ``query_key``, dropping it if expired."""
+        if query_key is None:
+            return None
+        key = (scope, query_key)
+        results, expires_at = self._entries[key]
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return results
+
+    def _remove(self, key: tuple) -> None:
+        scope, query_key = key
+        del self._entries[key]
+        index = self._scopes[scope]
+        index.remove(query_key)
+        if not index.rows:
+            del self._scopes[scope]
+
+
+# Process-wide cache shared by the query endpoints
+query_cache = SemanticCache()
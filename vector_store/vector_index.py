@@ -1,12 +1,24 @@
 """Wrapper functions around ChromaDB for simple vector operations."""
 
 import asyncio
+import re
 import threading
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
-from typing import AsyncGenerator, Dict, Optional
+from typing import AsyncGenerator, Dict, Optional, Union
 
 import chromadb
-from config import VECTOR_DB_PATH
+import numpy as np
+from config import ALLOWED_FILE_EXTENSIONS, VECTOR_DB_PATH
+from vector_store.query_cache import query_cache
+
+# Queries that name a literal phrase or an uploaded file don't need embeddings
+_QUOTED_QUERY = re.compile(r'^\s*"([^"]+)"\s*$')
+_FILENAME_QUERY = re.compile(
+    r"^\s*([\w\-. ]+(?:%s))\s*$" % "|".join(re.escape(ext) for ext in sorted(ALLOWED_FILE_EXTENSIONS)),
+    re.IGNORECASE,
+)
 
 # Thread-safe client cache to avoid recreating clients for the same db_path
 _client_cache: Dict[str, chromadb.PersistentClient] = {}
@@ -163,22 +175,46 @@ def get_or_create_collection(name: str = "default", db_path: str = VECTOR_DB_PAT
     )
 
 
+def _to_chroma_embeddings(embedding: Union[np.ndarray, list]) -> list:
+    """Convert float32 arrays to nested lists at the Chroma boundary.
+
+    Embeddings stay NumPy arrays everywhere else; older Chroma releases only
+    accept plain lists.
+    """
+    if isinstance(embedding, np.ndarray):
+        return embedding.tolist()
+    return embedding
+
+
 def add_documents_to_index(
     collection_name: str,
     documents: list[str],
-    embeddings: list[list[float]],
+    embeddings: np.ndarray,
     metadatas: list[dict],
     ids: list[str],
     db_path: str = VECTOR_DB_PATH,
 ) -> None:
-    """Add new documents and embeddings to the specified collection."""
+    """Add new documents and their ``(N, D)`` float32 embeddings to the specified collection."""
     collection = get_or_create_collection(collection_name, db_path)
     collection.add(
         documents=documents,
-        embeddings=embeddings,
+        embeddings=_to_chroma_embeddings(embeddings),
         metadatas=metadatas,
         ids=ids,
     )
+    # Cached query results for this store may now be missing relevant chunks
+    query_cache.invalidate(db_path)
+
+
+def remove_documents_from_index(
+    collection_name: str,
+    ids: list[str],
+    db_path: str = VECTOR_DB_PATH,
+) -> None:
+    """Delete the documents with the given ids from the specified collection."""
+    collection = get_or_create_collection(collection_name, db_path)
+    collection.delete(ids=ids)
+    query_cache.invalidate(db_path)
 
 
 def list_collection_names(db_path: str = VECTOR_DB_PATH) -> list[str]:
@@ -187,80 +223,127 @@ def list_collection_names(db_path: str = VECTOR_DB_PATH) -> list[str]:
     return [col.name for col in client.list_collections()]
 
 
-def query_index(
+def query_index_vec(
     collection_name: str,
-    query_text: str,
+    query_embedding: np.ndarray,
     db_path: str = VECTOR_DB_PATH,
     n_results: int = 5,
 ) -> dict:
-    """Query ``collection_name`` using the embedding of ``query_text``."""
-    from vector_store.embedder import get_openai_embedding
-
+    """Query ``collection_name`` with a precomputed query embedding."""
     collection = get_or_create_collection(collection_name, db_path)
-    embedding = get_openai_embedding(query_text)
-
-    results = collection.query(
-        query_embeddings=[embedding],
+    return collection.query(
+        query_embeddings=[_to_chroma_embeddings(query_embedding)],
         n_results=n_results,
     )
-    return results
 
 
-async def query_multiple_indexes(
-    collection_names: list[str],
+def query_index(
+    collection_name: str,
     query_text: str,
     db_path: str = VECTOR_DB_PATH,
     n_results: int = 5,
 ) -> dict:
-    """Query several indexes in parallel and return aggregated results sorted by distance."""
+    """Query ``collection_name`` using the embedding of ``query_text``."""
     from vector_store.embedder import get_openai_embedding
 
-    # Generate embedding once for all collections
-    embedding = await asyncio.to_thread(get_openai_embedding, query_text)
+    return query_index_vec(
+        collection_name, get_openai_embedding(query_text), db_path, n_results
+    )
+
 
-    # Query collections in parallel
-    async def _query_collection(name: str):
-        """Query a single collection and return results."""
-        def _query():
-            collection = get_or_create_collection(name, db_path)
-            return collection.query(query_embeddings=[embedding], n_results=n_results)
-        return await asyncio.to_thread(_query)
+async def query_multiple_indexes_vec(
+    collection_names: list[str],
+    query_embedding: np.ndarray,
+    db_path: str = VECTOR_DB_PATH,
+    n_results: int = 5,
+) -> dict:
+    """Query several indexes in parallel with one precomputed embedding.
 
-    # Execute all queries in parallel
+    Results are aggregated and sorted by distance.
+    """
+    # Fan out one ANN lookup per collection concurrently, all sharing the embedding
     results = await asyncio.gather(
-        *[_query_collection(name) for name in collection_names]
+        *[
+            asyncio.to_thread(query_index_vec, name, query_embedding, db_path, n_results)
+            for name in collection_names
+        ]
     )
 
-    # Aggregate results from all collections
-    aggregated = []
-    for res in results:
-        ids = res.get("ids", [[]])[0]
-        docs = res.get("documents", [[]])[0]
-        metas = res.get("metadatas", [[]])[0]
-        dists = res.get("distances", [[]])[0]
+    # Aggregate results from all collections in one pass: chain every collection's
+    # (distance, id, document, metadata) rows, sort by distance (lower is more
+    # relevant; ties keep collection order), then split the columns with one zip
+    aggregated = sorted(
+        chain.from_iterable(
+            zip(
+                res.get("distances", [[]])[0],
+                res.get("ids", [[]])[0],
+                res.get("documents", [[]])[0],
+                res.get("metadatas", [[]])[0],
+            )
+            for res in results
+        ),
+        key=itemgetter(0),
+    )
+    dists, ids, docs, metas = (
+        (list(column) for column in zip(*aggregated)) if aggregated else ([], [], [], [])
+    )
 
-        for doc_id, doc, meta, dist in zip(ids, docs, metas, dists):
-            aggregated.append((dist, doc_id, doc, meta))
+    return {
+        "ids": [ids],
+        "documents": [docs],
+        "metadatas": [metas],
+        "distances": [dists],
+    }
+
+
+def is_literal_query(query_text: str) -> bool:
+    """Return True for quoted-phrase or filename queries handled by :func:`literal_lookup`."""
+    return bool(_QUOTED_QUERY.match(query_text) or _FILENAME_QUERY.match(query_text))
 
-    # sort by distance (lower is more relevant)
-    aggregated.sort(key=lambda x: x[0])
 
-    ids = [a[1] for a in aggregated]
-    docs = [a[2] for a in aggregated]
-    metas = [a[3] for a in aggregated]
-    dists = [a[0] for a in aggregated]
+def literal_lookup(
+    collection_names: list[str],
+    query_text: str,
+    db_path: str = VECTOR_DB_PATH,
+    n_results: int = 5,
+) -> Optional[dict]:
+    """Answer quoted-phrase and filename queries without embeddings or ANN search.
 
+    ``"exact phrase"`` matches chunks containing the phrase; a bare filename such as
+    ``report.pdf`` returns chunks whose ``source`` is that file. Returns ``None`` when
+    the query is not literal or nothing matched, so callers can fall back to
+    semantic search. Results use the aggregated query shape with distance 0.
+    """
+    quoted = _QUOTED_QUERY.match(query_text)
+    filename = None if quoted else _FILENAME_QUERY.match(query_text)
+    if quoted:
+        filters = {"where_document": {"$contains": quoted.group(1)}}
+    elif filename:
+        filters = {"where": {"source": filename.group(1)}}
+    else:
+        return None
+
+    ids, docs, metas = [], [], []
+    for name in collection_names:
+        collection = get_or_create_collection(name, db_path)
+        res = collection.get(limit=n_results, include=["documents", "metadatas"], **filters)
+        ids.extend(res["ids"])
+        docs.extend(res["documents"])
+        metas.extend(res["metadatas"])
+
+    if not ids:
+        return None
     return {
         "ids": [ids],
         "documents": [docs],
         "metadatas": [metas],
-        "distances": [dists],
+        "distances": [[0.0] * len(ids)],
     }
 
 
-async def stream_query_results(
+async def stream_query_results_vec(
     collection_names: list[str],
-    query_text: str,
+    query_embedding: np.ndarray,
     db_path: str = VECTOR_DB_PATH,
     n_results: int = 5,
 ) -> AsyncGenerator[dict, None]:
@@ -272,7 +355,7 @@ async def stream_query_results(
 
     Args:
         collection_names: List of collection names to query
-        query_text: Natural language query
+        query_embedding: Precomputed embedding of the query, shared by every collection
         db_path: Path to ChromaDB persistent directory
         n_results: Number of results per collection
 
@@ -282,10 +365,7 @@ async def stream_query_results(
             - type="collection_complete": A collection finished processing
             - type="collection_error": A collection failed to query
     """
-    from vector_store.embedder import get_openai_embedding
-
-    # Generate embedding once for all collections
-    embedding = await asyncio.to_thread(get_openai_embedding, query_text)
+    query_vector = _to_chroma_embeddings(query_embedding)
 
     # Stream results from each collection as they complete
     for collection_name in collection_names:
@@ -293,7 +373,7 @@ async def stream_query_results(
             # Query single collection
             def _query():
                 collection = get_or_create_collection(collection_name, db_path)
-                return collection.query(query_embeddings=[embedding], n_results=n_results)
+                return collection.query(query_embeddings=[query_vector], n_results=n_results)
 
             result = await asyncio.to_thread(_query)
 
@@ -339,7 +419,7 @@ def compile_context(query_results: dict) -> str:
     metas = query_results.get("metadatas", [[]])[0]
     dists = query_results.get("distances", [[]])[0]
 
-    # Results are already sorted by distance from query_multiple_indexes() or query_index()
+    # Results are already sorted by distance from query_multiple_indexes_vec() or query_index_vec()
     # No need to re-sort here
     combined = list(zip(dists, ids, docs, metas))
 
@@ -387,6 +467,7 @@ def delete_collection(collection_name: str, db_path: str = VECTOR_DB_PATH) -> di
     client = get_client(db_path)
     try:
         client.delete_collection(name=collection_name)
+        query_cache.invalidate(db_path)
         return {"message": f"Collection '{collection_name}' deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))